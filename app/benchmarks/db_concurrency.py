@@ -0,0 +1,96 @@
+"""
+Concurrent-update throughput: blocking psycopg2 sessions vs. the async engine.
+
+Simulates a burst of Telegram updates handled on one event loop. Each update
+does the database work of a typical handler (a per-user transaction query,
+optionally slowed down with ``pg_sleep`` to mimic a heavy analytics query)
+followed by a non-database await standing in for the Telegram reply.
+
+With the sync ``SessionLocal`` every round trip blocks the loop, so updates
+are effectively processed one at a time. With ``AsyncSessionLocal`` the round
+trips overlap up to the pool size.
+
+Usage:
+    uv run python -m app.benchmarks.db_concurrency --updates 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import func, select, text
+
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine, engine
+from app.models.expense_tracker import Transaction
+
+
+def _query(user_id: uuid.UUID):
+    return (
+        select(func.count())
+        .select_from(Transaction)
+        .where(
+            Transaction.user_id == user_id,
+            ~Transaction.is_deleted,
+        )
+    )
+
+
+async def _sync_update(query_delay: float, reply_delay: float) -> None:
+    # Blocking: the whole loop waits for each round trip.
+    with SessionLocal() as db:
+        db.execute(_query(uuid.uuid4()))
+        if query_delay:
+            db.execute(text("SELECT pg_sleep(:d)"), {"d": query_delay})
+    await asyncio.sleep(reply_delay)
+
+
+async def _async_update(query_delay: float, reply_delay: float) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(_query(uuid.uuid4()))
+        if query_delay:
+            await db.execute(text("SELECT pg_sleep(:d)"), {"d": query_delay})
+    await asyncio.sleep(reply_delay)
+
+
+async def _run(update_fn, updates: int, concurrency: int, query_delay: float, reply_delay: float) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await update_fn(query_delay, reply_delay)
+
+    # Warm up the pool so connection setup is not measured.
+    await asyncio.gather(*(update_fn(0, 0) for _ in range(min(concurrency, 5))))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(updates)))
+    return time.perf_counter() - started
+
+
+async def main(args: argparse.Namespace) -> None:
+    results = {}
+    for label, fn in (("sync (psycopg2)", _sync_update), ("async (asyncpg)", _async_update)):
+        elapsed = await _run(fn, args.updates, args.concurrency, args.query_delay, args.reply_delay)
+        results[label] = elapsed
+
+    print(
+        f"{args.updates} updates, concurrency={args.concurrency}, "
+        f"query_delay={args.query_delay}s, reply_delay={args.reply_delay}s"
+    )
+    print(f"{'mode':<18}{'seconds':>10}{'updates/s':>12}")
+    for label, elapsed in results.items():
+        print(f"{label:<18}{elapsed:>10.2f}{args.updates / elapsed:>12.1f}")
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--query-delay", type=float, default=0.02,
+                        help="Extra server-side time per update (pg_sleep), seconds.")
+    parser.add_argument("--reply-delay", type=float, default=0.05,
+                        help="Non-database await per update (Telegram reply), seconds.")
+    asyncio.run(main(parser.parse_args()))
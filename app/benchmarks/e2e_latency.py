@@ -0,0 +1,176 @@
+"""
+End-to-end message latency: NLURouter -> FunctionRouter -> controllers -> Postgres.
+
+Pushes a corpus of user messages through the real NLU pipeline, with the
+model replaced by the replaying stub server (``app.benchmarks.llm_stub``), so
+every stage except model inference runs as in production. Messages are spread
+over a set of throwaway users created in the configured database (and deleted
+afterwards) and sent with bounded concurrency. Reports p50/p95/p99 latency and
+throughput.
+
+Usage:
+    uv run python -m app.benchmarks.e2e_latency --messages 500 --concurrency 20 --llm-latency 0.3
+
+    # Measure only the non-model path (fast path, tool cache, DB)
+    uv run python -m app.benchmarks.e2e_latency --llm-latency 0
+
+    # Against an already running stub or a real endpoint
+    uv run python -m app.benchmarks.e2e_latency --url http://127.0.0.1:8089/v1
+"""
+import argparse
+import asyncio
+import contextlib
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import delete, select
+
+from app.benchmarks.llm_stub import DEFAULT_CASSETTE, Cassette, StubLLMServer
+from app.core.config import settings
+from app.core.metrics import Histogram, metrics
+from app.db.session import AsyncSessionLocal, async_engine
+from app.models.currency import Currency
+from app.models.expense_tracker import Transaction
+from app.models.user import User
+from app.nl_router.nlu import NLURouter
+
+
+class _NullStream:
+    """Accepts streamed text and discards it, so the streaming path is measured."""
+
+    async def start(self) -> None:
+        pass
+
+    async def update(self, text: str) -> None:
+        pass
+
+
+async def _create_users(count: int, currency_code: str) -> List[uuid.UUID]:
+    async with AsyncSessionLocal() as db:
+        currency = await db.scalar(select(Currency).where(Currency.code == currency_code))
+        if currency is None:
+            raise SystemExit(f"Currency {currency_code} not found; run the currency data migration first.")
+        users = [
+            User(username=f"bench_{uuid.uuid4().hex[:12]}", currency_id=currency.id)
+            for _ in range(count)
+        ]
+        db.add_all(users)
+        await db.commit()
+        return [user.id for user in users]
+
+
+async def _delete_users(user_ids: List[uuid.UUID]) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Transaction).where(Transaction.user_id.in_(user_ids)))
+        await db.execute(delete(User).where(User.id.in_(user_ids)))
+        await db.commit()
+
+
+def _configure(url: str, args: argparse.Namespace) -> None:
+    settings.MODEL_TYPE = "open_ai"
+    settings.OPEN_AI_MODEL_ENDPOINTS = [{"url": url, "name": "bench", "api_key": "bench"}]
+    settings.NLU_FAST_PATH_ENABLED = not args.no_fast_path
+    settings.LLM_STREAMING = args.stream
+    settings.CONVERSATION_PERSIST = False
+    settings.LLM_MAX_CONCURRENCY = max(settings.LLM_MAX_CONCURRENCY, args.concurrency)
+    # The benchmark is one client sending far faster than any person would.
+    settings.USER_RATE_LIMIT_PER_MINUTE = 1e9
+    settings.USER_RATE_LIMIT_BURST = 10 ** 9
+    if args.no_tool_cache:
+        settings.TOOL_CALL_CACHE_SIZE = 0
+
+
+async def _run(router: NLURouter, corpus: List[str], user_ids: List[uuid.UUID], args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latency = Histogram(window=args.messages)
+    errors = 0
+
+    async def one(message: str, user_id: uuid.UUID) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            reply = await router.parse_user_message(
+                message, str(user_id), stream=_NullStream() if args.stream else None
+            )
+            latency.observe(time.perf_counter() - started)
+            if str(reply).startswith("Error:"):
+                errors += 1
+
+    jobs = [(corpus[i % len(corpus)], rng.choice(user_ids)) for i in range(args.messages)]
+    rng.shuffle(jobs)
+    started = time.perf_counter()
+    await asyncio.gather(*(one(message, user_id) for message, user_id in jobs))
+    return latency, errors, time.perf_counter() - started
+
+
+async def main(args: argparse.Namespace) -> None:
+    cassette = Cassette.load(args.cassette)
+    corpus = cassette.messages
+    if args.corpus:
+        corpus = [line.strip() for line in args.corpus.read_text().splitlines() if line.strip()]
+
+    async with contextlib.AsyncExitStack() as stack:
+        stub: Optional[StubLLMServer] = None
+        url = args.url
+        if url is None:
+            stub = await stack.enter_async_context(
+                StubLLMServer(cassette, latency=args.llm_latency, jitter=args.llm_jitter)
+            )
+            url = stub.url
+        _configure(url, args)
+
+        router = NLURouter()
+        stack.push_async_callback(router.aclose)
+        user_ids = await _create_users(args.users, args.currency)
+        stack.push_async_callback(_delete_users, user_ids)
+
+        # Warm up the DB and HTTP pools so connection setup is not measured.
+        await asyncio.gather(*(
+            router.parse_user_message(corpus[0], str(user_id)) for user_id in user_ids[:args.concurrency]
+        ))
+        latency, errors, elapsed = await _run(router, corpus, user_ids, args)
+
+    await async_engine.dispose()
+
+    summary = latency.summary()
+    print(
+        f"{args.messages} messages ({len(corpus)} distinct), {args.users} users, "
+        f"concurrency={args.concurrency}, stream={args.stream}, "
+        f"llm_latency={'recorded' if args.llm_latency is None else f'{args.llm_latency}s'}"
+    )
+    print(f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'avg ms':>10}{'msgs/s':>10}{'errors':>8}")
+    print(
+        f"{summary['p50'] * 1000:>10.1f}{summary['p95'] * 1000:>10.1f}{summary['p99'] * 1000:>10.1f}"
+        f"{summary['avg'] * 1000:>10.1f}{args.messages / elapsed:>10.1f}{errors:>8}"
+    )
+    paths = {
+        name: value for name, value in metrics.snapshot().items()
+        if name.startswith(("nlu.fast_path", "nlu.tool_cache")) and not isinstance(value, dict)
+    }
+    if paths:
+        print("  " + ", ".join(f"{name}={value}" for name, value in sorted(paths.items())))
+    if stub is not None:
+        print(f"  LLM requests={stub.requests}, cassette misses={stub.misses}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--currency", default="USD", help="Default currency of the benchmark users.")
+    parser.add_argument("--cassette", type=Path, default=DEFAULT_CASSETTE)
+    parser.add_argument("--corpus", type=Path, help="Messages to send, one per line (default: the cassette's).")
+    parser.add_argument("--url", help="Use this OpenAI-compatible endpoint instead of starting the stub.")
+    parser.add_argument("--llm-latency", type=float, default=None,
+                        help="Stub seconds per completion (default: the recorded latency).")
+    parser.add_argument("--llm-jitter", type=float, default=0.0)
+    parser.add_argument("--stream", action="store_true", help="Use the streaming completion path.")
+    parser.add_argument("--no-fast-path", action="store_true")
+    parser.add_argument("--no-tool-cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
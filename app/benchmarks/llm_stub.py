@@ -0,0 +1,376 @@
+"""
+OpenAI-compatible stub server that replays recorded chat completions.
+
+Completions are looked up by the (normalized) last user message in a JSONL
+cassette and served after a configurable delay, streamed or not, exactly as
+``/v1/chat/completions`` would. Tool calls are only replayed if the request
+offered that tool, so tool selection behaves as it would with a real model.
+Messages missing from the cassette get a short text reply and are counted.
+
+In record mode every request is forwarded (non-streaming) to a real
+endpoint and its answer and latency are appended to the cassette.
+
+Usage:
+    # Replay the bundled cassette, 300 ms +- 100 ms per completion
+    uv run python -m app.benchmarks.llm_stub --latency 0.3 --jitter 0.1
+
+    # Record a cassette against a real model
+    uv run python -m app.benchmarks.llm_stub --cassette my.jsonl \\
+        --upstream http://localhost:12434/engines/v1 --upstream-model ai/qwen2.5:7B-Q4_0
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.nl_router.tool_cache import normalize_message
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CASSETTE = Path(__file__).resolve().parent / "data" / "llm_cassette.jsonl"
+
+MISS_REPLY = "Sorry, I didn't get that. Could you rephrase?"
+
+_STREAM_PIECE = 24
+
+
+@dataclass
+class Recording:
+    """One recorded completion: text and/or ``{"name", "arguments"}`` tool calls."""
+    message: str
+    content: Optional[str] = None
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    latency: float = 0.0
+
+
+class Cassette:
+    """Recordings keyed by normalized user message, optionally backed by a JSONL file."""
+
+    def __init__(self, recordings: Optional[List[Recording]] = None, path: Optional[Path] = None):
+        self.path = path
+        self._recordings: Dict[str, Recording] = {}
+        for recording in recordings or []:
+            self._recordings[normalize_message(recording.message)] = recording
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        path = Path(path)
+        recordings = []
+        if path.exists():
+            for line in path.read_text().splitlines():
+                if line.strip():
+                    recordings.append(Recording(**json.loads(line)))
+        return cls(recordings, path)
+
+    @property
+    def messages(self) -> List[str]:
+        return [recording.message for recording in self._recordings.values()]
+
+    def find(self, message: str) -> Optional[Recording]:
+        return self._recordings.get(normalize_message(message))
+
+    def add(self, recording: Recording) -> None:
+        self._recordings[normalize_message(recording.message)] = recording
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as f:
+                f.write(json.dumps(asdict(recording)) + "\n")
+
+
+def _last_user_message(messages: List[Dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            content = message.get("content")
+            return content if isinstance(content, str) else json.dumps(content)
+    return ""
+
+
+def _offered_tools(body: Dict[str, Any]) -> set:
+    return {tool["function"]["name"] for tool in body.get("tools") or []}
+
+
+class StubLLMServer:
+    """
+    Serves ``POST /v1/chat/completions`` from a cassette.
+
+    Args:
+        cassette (Cassette): Recorded completions.
+        latency (Optional[float]): Seconds per completion; None replays the
+            recorded latency.
+        jitter (float): Uniform +- seconds added to each delay.
+        upstream (Optional[str]): Base URL of a real endpoint to record from.
+        upstream_model (Optional[str]): Model name sent upstream (default: the request's).
+        upstream_api_key (str): API key sent upstream.
+        host (str): Interface to listen on.
+        port (int): Port to listen on; 0 picks a free one.
+    """
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: Optional[float] = None,
+        jitter: float = 0.0,
+        upstream: Optional[str] = None,
+        upstream_model: Optional[str] = None,
+        upstream_api_key: str = "none",
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.cassette = cassette
+        self.latency = latency
+        self.jitter = jitter
+        self.upstream = upstream
+        self.upstream_model = upstream_model
+        self.upstream_api_key = upstream_api_key
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.misses = 0
+        self._ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._upstream_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as an OpenAI ``base_url``."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.upstream:
+            self._upstream_client = httpx.AsyncClient(base_url=self.upstream, timeout=120.0)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._upstream_client is not None:
+            await self._upstream_client.aclose()
+            self._upstream_client = None
+
+    async def __aenter__(self) -> "StubLLMServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Minimal HTTP/1.1 with keep-alive: enough for httpx's connection pool.
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                if method == "POST" and path.rstrip("/").endswith("/chat/completions"):
+                    await self._chat_completion(json.loads(body or b"{}"), writer)
+                else:
+                    self._write_response(writer, 404, {"error": {"message": f"{method} {path} not found"}})
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _chat_completion(self, body: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        self.requests += 1
+        message = _last_user_message(body.get("messages", []))
+        if self._upstream_client is not None:
+            recording = await self._record(body, message)
+            delay = 0.0
+        else:
+            recording = self.cassette.find(message)
+            if recording is None:
+                self.misses += 1
+                logger.info("No recording for %r", message)
+                recording = Recording(message=message, content=MISS_REPLY)
+            delay = recording.latency if self.latency is None else self.latency
+            delay = max(0.0, delay + random.uniform(-self.jitter, self.jitter))
+
+        content, tool_calls = self._reply(recording, _offered_tools(body))
+        model = body.get("model", "stub")
+        if body.get("stream"):
+            await self._stream(writer, model, content, tool_calls, delay)
+        else:
+            await asyncio.sleep(delay)
+            self._write_response(writer, 200, self._completion(model, content, tool_calls))
+
+    async def _record(self, body: Dict[str, Any], message: str) -> Recording:
+        upstream_body = dict(body, stream=False)
+        upstream_body.pop("stream_options", None)
+        if self.upstream_model:
+            upstream_body["model"] = self.upstream_model
+        started = time.monotonic()
+        response = await self._upstream_client.post(
+            "chat/completions",
+            json=upstream_body,
+            headers={"Authorization": f"Bearer {self.upstream_api_key}"},
+        )
+        response.raise_for_status()
+        latency = time.monotonic() - started
+        answer = response.json()["choices"][0]["message"]
+        recording = Recording(
+            message=message,
+            content=answer.get("content"),
+            tool_calls=[
+                {
+                    "name": call["function"]["name"],
+                    "arguments": json.loads(call["function"].get("arguments") or "{}"),
+                }
+                for call in answer.get("tool_calls") or []
+            ],
+            latency=round(latency, 3),
+        )
+        self.cassette.add(recording)
+        return recording
+
+    @staticmethod
+    def _reply(recording: Recording, offered: set) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        # A model cannot call a tool it was not given.
+        tool_calls = [call for call in recording.tool_calls if call["name"] in offered]
+        content = recording.content
+        if not tool_calls and not content:
+            content = MISS_REPLY
+        return content, tool_calls
+
+    def _completion(self, model: str, content: Optional[str], tool_calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        message: Dict[str, Any] = {"role": "assistant", "content": content}
+        if tool_calls:
+            message["tool_calls"] = [
+                {
+                    "id": f"call_{index}",
+                    "type": "function",
+                    "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])},
+                }
+                for index, call in enumerate(tool_calls)
+            ]
+        return {
+            "id": f"chatcmpl-stub-{next(self._ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }],
+        }
+
+    async def _stream(
+        self,
+        writer: asyncio.StreamWriter,
+        model: str,
+        content: Optional[str],
+        tool_calls: List[Dict[str, Any]],
+        delay: float,
+    ) -> None:
+        completion_id = f"chatcmpl-stub-{next(self._ids)}"
+        created = int(time.time())
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+
+        deltas = [{"role": "assistant", "content": ""}]
+        text = content or ""
+        deltas.extend({"content": text[i:i + _STREAM_PIECE]} for i in range(0, len(text), _STREAM_PIECE))
+        for index, call in enumerate(tool_calls):
+            arguments = json.dumps(call["arguments"])
+            half = len(arguments) // 2
+            deltas.append({"tool_calls": [{
+                "index": index, "id": f"call_{index}", "type": "function",
+                "function": {"name": call["name"], "arguments": arguments[:half]},
+            }]})
+            deltas.append({"tool_calls": [{"index": index, "function": {"arguments": arguments[half:]}}]})
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        # Half the delay before the first token, the rest spread over the stream.
+        await asyncio.sleep(delay / 2)
+        step = delay / 2 / len(deltas)
+        events = [chunk(delta) for delta in deltas]
+        events.append(chunk({}, "tool_calls" if tool_calls else "stop"))
+        for event in events:
+            self._write_chunk(writer, f"data: {json.dumps(event)}\n\n".encode())
+            await writer.drain()
+            await asyncio.sleep(step)
+        self._write_chunk(writer, b"data: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        reason = {200: "OK", 404: "Not Found"}.get(status, "Error")
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    cassette = Cassette.load(args.cassette)
+    server = StubLLMServer(
+        cassette,
+        latency=args.latency,
+        jitter=args.jitter,
+        upstream=args.upstream,
+        upstream_model=args.upstream_model,
+        upstream_api_key=args.upstream_api_key,
+        host=args.host,
+        port=args.port,
+    )
+    async with server:
+        mode = f"recording from {args.upstream}" if args.upstream else f"replaying {len(cassette.messages)} recordings"
+        print(f"LLM stub on {server.url} ({mode}); Ctrl+C to stop")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            print(f"{server.requests} requests, {server.misses} misses")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette", type=Path, default=DEFAULT_CASSETTE)
+    parser.add_argument("--latency", type=float, default=None,
+                        help="Seconds per completion (default: the recorded latency).")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +- seconds added to each delay.")
+    parser.add_argument("--upstream", help="Record from this OpenAI-compatible base URL instead of replaying.")
+    parser.add_argument("--upstream-model", help="Model name to request upstream.")
+    parser.add_argument("--upstream-api-key", default="none")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
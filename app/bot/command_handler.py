@@ -1,34 +1,75 @@
 
-from app.nl_router.nlu import NLURouter
-from app.bot.controller.user.create_user import CreateUser
+from typing import Any, Optional
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
+
+from app.core.config import settings
+from app.nl_router.nlu import get_nlu_router
+from app.bot.streaming import StreamingReply
+from app.bot.controller.expense.transaction_controller import TransactionController
+from app.bot.controller.user.identity_resolver import identity_resolver
 
 import logging
 logger = logging.getLogger(__name__)
 
 class Handler:
 
-    def __init__(self):
-        self.router = NLURouter()
+    @staticmethod
+    async def _get_user(update):
+        return await identity_resolver.resolve(update.message.from_user)
+
+    @staticmethod
+    def _reply(update, context, text):
+        """Queue a reply on the outbound sender; does not wait for delivery."""
+        return context.bot_data["sender"].send(update.effective_chat.id, text)
 
+    @staticmethod
+    def _keyboard(reply: Any) -> Optional[InlineKeyboardMarkup]:
+        """Inline keyboard for a ``Reply``'s buttons (one row), if it has any."""
+        buttons = getattr(reply, "buttons", None)
+        if not buttons:
+            return None
+        return InlineKeyboardMarkup([[InlineKeyboardButton(label, callback_data=data) for label, data in buttons]])
+
+    @staticmethod
     async def echo(update, context):
-        user_details = update.message.from_user
-        user_obj = CreateUser(user_details).create_user()
-        response = await Handler().router.parse_user_message(update.message.text, str(user_obj.id))
-        await update.message.reply_text(response)
+        user_id = await Handler._get_user(update)
+        reply = StreamingReply(
+            context.bot,
+            context.bot_data["sender"],
+            update.effective_chat.id,
+            edit_interval=settings.BOT_STREAM_EDIT_INTERVAL,
+        )
+        response = await get_nlu_router().parse_user_message(update.message.text, str(user_id), stream=reply)
+        await reply.finish(response, reply_markup=Handler._keyboard(response))
+
+    @staticmethod
+    async def transactions_page(update, context):
+        """Older/Newer buttons under a transaction list: page in place, no LLM involved."""
+        query = update.callback_query
+        user_id = await identity_resolver.resolve(query.from_user)
+        async with TransactionController(user_id) as controller:
+            page = await controller.page_transactions(query.data)
+        await query.answer()
+        try:
+            await query.edit_message_text(page, reply_markup=Handler._keyboard(page))
+        except BadRequest as e:
+            # A double tap asks for the page already shown.
+            if "not modified" not in str(e).lower():
+                raise
 
     @staticmethod
     async def start(update, context):
-        user_details = update.message.from_user
-        user_obj = CreateUser(user_details).create_user()
-        await update.message.reply_text(
+        user_id = await Handler._get_user(update)
+        Handler._reply(update, context,
             "Hello! 👋\n\nI am your first Telegram bot."
         )
     
     @staticmethod
     async def help_command(update, context):
-        user_details = update.message.from_user
-        user_obj = CreateUser(user_details).create_user()
-        await update.message.reply_text(
+        user_id = await Handler._get_user(update)
+        Handler._reply(update, context,
             "Here are the commands you can use:\n"
             "/start - Start the bot\n"
             "/help - Show this help message\n"
@@ -37,16 +78,15 @@ class Handler:
 
     @staticmethod
     async def set_currency(update, context):
-        user_details = update.message.from_user
-        user_obj = CreateUser(user_details).create_user()
+        user_id = await Handler._get_user(update)
         
         if not context.args:
-            await update.message.reply_text("Please provide a currency code. Usage: /set_currency USD")
+            Handler._reply(update, context, "Please provide a currency code. Usage: /set_currency USD")
             return
 
         currency_code = context.args[0]
         from app.bot.controller.user.user_controller import UserController
-        controller = UserController(user_obj.id)
-        result = controller.set_default_currency(currency_code)
-        await update.message.reply_text(result)
+        async with UserController(user_id) as controller:
+            result = await controller.set_default_currency(currency_code)
+        Handler._reply(update, context, result)
     
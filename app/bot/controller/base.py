@@ -0,0 +1,34 @@
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import AsyncSessionLocal
+
+
+class BaseController:
+    """
+    Owns (or borrows) the AsyncSession a controller works with.
+
+    Controllers are used as async context managers so the session is returned
+    to the pool as soon as the work is done::
+
+        async with TransactionController(user_id) as controller:
+            await controller.list_transactions()
+
+    Args:
+        db (Optional[AsyncSession]): Session to reuse. When omitted the
+            controller opens its own session and closes it on exit.
+    """
+    def __init__(self, db: Optional[AsyncSession] = None):
+        self._owns_session = db is None
+        self.db: AsyncSession = db if db is not None else AsyncSessionLocal()
+
+    async def close(self) -> None:
+        if self._owns_session:
+            await self.db.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
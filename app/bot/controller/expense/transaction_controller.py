@@ -1,12 +1,18 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import StrEnum
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from app.db.session import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bot.controller.base import BaseController
+from app.bot.controller.reply import Reply
+from app.core import short_code
+from app.core.currencies import CurrencyInfo, currency_catalogue
+from app.models.expense_tracker import Transaction
 from app.models.user import User
-from app.models.currency import Currency
 from app.crud.transaction import transaction_crud
+from app.schemas.analytics import AnalyticsResult
 
 
 class TransactionType(StrEnum):
@@ -22,12 +28,131 @@ class TransactionCategory(StrEnum):
     OTHER = "other"
 
 
-class TransactionController:
-    def __init__(self, user_id: UUID):
-        self.db = SessionLocal()
-        self.user_id = user_id
+# Callback data of the history Older/Newer buttons: "tx:<o|n>:<limit>:<occurred_at>:<id>",
+# the key of the last row shown, in at most 64 bytes (Telegram's limit).
+PAGE_CALLBACK_PREFIX = "tx:"
+OLDER, NEWER = "o", "n"
+MAX_PAGE_SIZE = 50
+_EPOCH = datetime(1970, 1, 1)
+
+
+def encode_page_callback(direction: str, limit: int, tx: Transaction) -> str:
+    """
+    Args:
+        direction (str): ``OLDER`` or ``NEWER``.
+        limit (int): Page size.
+        tx (Transaction): Row to page from (last shown for older, first for newer).
+
+    Returns:
+        str: Button callback data.
+    """
+    micros = (tx.occurred_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{PAGE_CALLBACK_PREFIX}{direction}:{limit}:{_base36(micros)}:{tx.id.hex}"
+
+
+def decode_page_callback(data: str) -> Optional[Tuple[str, int, Tuple[datetime, UUID]]]:
+    """
+    Args:
+        data (str): Button callback data.
+
+    Returns:
+        Optional[Tuple[str, int, Tuple[datetime, UUID]]]: Direction, page size
+            and cursor, or None if ``data`` is not a valid page callback.
+    """
+    if not data or not data.startswith(PAGE_CALLBACK_PREFIX):
+        return None
+    try:
+        direction, limit, micros, tx_id = data[len(PAGE_CALLBACK_PREFIX):].split(":")
+        if direction not in (OLDER, NEWER):
+            return None
+        cursor = (_EPOCH + timedelta(microseconds=int(micros, 36)), UUID(hex=tx_id))
+        return direction, min(max(int(limit), 1), MAX_PAGE_SIZE), cursor
+    except (ValueError, OverflowError):
+        return None
+
+
+def _base36(value: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    sign, value = ("-", -value) if value < 0 else ("", value)
+    text = ""
+    while True:
+        value, digit = divmod(value, 36)
+        text = digits[digit] + text
+        if not value:
+            return sign + text
+
+
+def _to_naive(value: datetime) -> datetime:
+    # occurred_at is a naive (local time) column; asyncpg refuses aware values.
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def format_analytics(result: AnalyticsResult) -> str:
+    """
+    Render analytics as a chat message, one section per currency
+
+    Args:
+        result (AnalyticsResult): Totals to render.
+
+    Returns:
+        str: The message text.
+    """
+    start_str = result.start.strftime("%Y-%m-%d") if result.start else "..."
+    # The end is the exclusive query boundary, shown as is.
+    end_str = result.end.strftime("%Y-%m-%d") if result.end else "Now"
+    lines = [f"📊 Analytics ({result.label}):", f"📅 {start_str} - {end_str}"]
+    if not result.currencies:
+        lines.append("No transactions in this period.")
+
+    for totals in result.currencies:
+        code = totals.currency_code
+        if len(result.currencies) > 1:
+            lines.append(f"\n💱 {code}")
+        lines += [
+            f"Income: {totals.income} {code}",
+            f"Expense: {totals.expense} {code}",
+            f"Balance: {totals.balance} {code}",
+        ]
+        for category in totals.categories:
+            parts = []
+            if category.expense:
+                parts.append(f"-{category.expense}")
+            if category.income:
+                parts.append(f"+{category.income}")
+            lines.append(f"  • {category.category or 'uncategorized'}: {' / '.join(parts) or 0} {code}")
+    return "\n".join(lines)
+
+
+class TransactionController(BaseController):
+    """
+    Args:
+        user_id (UUID): User the transactions belong to.
+        db (Optional[AsyncSession]): Session to reuse.
+        autocommit (bool): Commit after each write. With False, writes are only
+            flushed and the caller commits (or rolls back) them together.
+    """
+    def __init__(self, user_id: UUID, db: Optional[AsyncSession] = None, autocommit: bool = True):
+        super().__init__(db)
+        self.user_id = user_id if isinstance(user_id, UUID) else UUID(str(user_id))
+        self.autocommit = autocommit
+
+    async def _commit(self) -> None:
+        if self.autocommit:
+            await self.db.commit()
+        else:
+            await self.db.flush()
+
+    async def _get_user(self) -> Optional[User]:
+        return await self.db.get(User, self.user_id, populate_existing=True)
 
-    def add_transaction(
+    @staticmethod
+    def _currency_code(currency_id: Optional[int]) -> str:
+        currency = currency_catalogue.by_id(currency_id)
+        return currency.code if currency else ""
+
+    async def add_transaction(
         self,
         amount: float,
         description: str,
@@ -37,19 +162,16 @@ class TransactionController:
         date: Optional[str] = None,
     ) -> str:
         # Resolve Currency
-        user = self.db.query(User).filter(User.id == self.user_id).first()
+        user = await self._get_user()
         if not user:
             return "User not found."
 
-        target_currency = None
+        await currency_catalogue.ensure_loaded()
+        target_currency: Optional[CurrencyInfo] = None
 
         # 1. Try to find currency from input
         if currency_code:
-            target_currency = (
-                self.db.query(Currency)
-                .filter(Currency.code == currency_code.upper())
-                .first()
-            )
+            target_currency = currency_catalogue.by_code(currency_code)
             if not target_currency:
                 return f"Currency {currency_code} not supported."
 
@@ -57,12 +179,11 @@ class TransactionController:
             if not user.currency_id:
                 user.currency_id = target_currency.id
                 self.db.add(user)
-                self.db.commit()
-                self.db.refresh(user)
+                await self._commit()
 
         # 2. If no input currency, use user default
-        elif user.currency:
-            target_currency = user.currency
+        elif currency_catalogue.by_id(user.currency_id):
+            target_currency = currency_catalogue.by_id(user.currency_id)
 
         # 3. If neither, fail and prompt user
         else:
@@ -73,12 +194,12 @@ class TransactionController:
         if date:
             try:
                 # Basic parsing, might need more robust handling
-                occurred_at = datetime.fromisoformat(date)
+                occurred_at = _to_naive(datetime.fromisoformat(date))
             except ValueError:
                 # Fallback to now
                 pass
 
-        transaction_crud.create_for_user(
+        await transaction_crud.create_for_user(
             db=self.db,
             user_id=self.user_id,
             currency_id=target_currency.id,
@@ -87,11 +208,96 @@ class TransactionController:
             category=category or TransactionCategory.OTHER,
             type=transaction_type,
             occurred_at=occurred_at,
+            commit=self.autocommit,
         )
 
         return f"Recorded {transaction_type}: {amount} {target_currency.code} for {description}."
 
-    def list_transactions(self, limit: Optional[int] = None) -> str:
+    async def add_transactions(self, items: List[Dict[str, Any]]) -> str:
+        """
+        Record several line items with one multi-row insert
+
+        Items that fail validation are reported and skipped; the rest are
+        stored together.
+
+        Args:
+            items (List[Dict[str, Any]]): ``add_transaction``-style arguments
+                (amount, description, optional type, currency_code, category, date).
+
+        Returns:
+            str: One summary of what was recorded and skipped.
+        """
+        user = await self._get_user()
+        if not user:
+            return "User not found."
+
+        await currency_catalogue.ensure_loaded()
+
+        rows, recorded, skipped = [], [], []
+        for item in items:
+            description = (item.get("description") or "").strip()
+            amount = item.get("amount")
+            label = description or "(no description)"
+            if not description:
+                skipped.append(f"{label}: missing description")
+                continue
+            if not isinstance(amount, (int, float)) or amount <= 0:
+                skipped.append(f"{label}: amount must be a positive number")
+                continue
+
+            code = (item.get("currency_code") or "").upper()
+            currency = currency_catalogue.by_code(code) if code else currency_catalogue.by_id(user.currency_id)
+            if code and currency is None:
+                skipped.append(f"{label}: currency {code} not supported")
+                continue
+            if currency is None:
+                skipped.append(f"{label}: no currency (set one with /set_currency <CODE>)")
+                continue
+            if not user.currency_id:
+                # Same as a single entry: the first currency used becomes the default.
+                user.currency_id = currency.id
+                self.db.add(user)
+
+            occurred_at = datetime.now()
+            if item.get("date"):
+                try:
+                    occurred_at = _to_naive(datetime.fromisoformat(item["date"]))
+                except ValueError:
+                    pass
+
+            transaction_type = TransactionType(item.get("type") or TransactionType.EXPENSE)
+            rows.append({
+                "currency_id": currency.id,
+                "amount": amount,
+                "description": description,
+                "category": item.get("category") or TransactionCategory.OTHER,
+                "type": transaction_type,
+                "occurred_at": occurred_at,
+            })
+            recorded.append((transaction_type, amount, currency.code, description))
+
+        await transaction_crud.create_many_for_user(
+            self.db,
+            user_id=self.user_id,
+            rows=rows,
+            commit=self.autocommit,
+        )
+
+        lines = []
+        if recorded:
+            lines.append(f"Recorded {len(recorded)} transaction{'s' if len(recorded) != 1 else ''}:")
+            totals: Dict[tuple, float] = {}
+            for transaction_type, amount, code, description in recorded:
+                lines.append(f"- {transaction_type}: {amount} {code} for {description}")
+                totals[(transaction_type, code)] = totals.get((transaction_type, code), 0) + amount
+            for (transaction_type, code), total in totals.items():
+                lines.append(f"Total {transaction_type}: {round(total, 2)} {code}")
+        if skipped:
+            lines.append(f"Skipped {len(skipped)}:")
+            lines.extend(f"- {reason}" for reason in skipped)
+        return "\n".join(lines) or "Nothing to record."
+
+    async def list_transactions(self, limit: Optional[int] = None) -> Reply:
         try:
             limit_value = int(limit) if limit is not None else 10
         except (TypeError, ValueError):
@@ -101,75 +307,124 @@ class TransactionController:
             limit_value = 10
 
         # Hard cap to avoid overly long responses
-        if limit_value > 50:
-            limit_value = 50
+        if limit_value > MAX_PAGE_SIZE:
+            limit_value = MAX_PAGE_SIZE
 
-        transactions = transaction_crud.list_recent_for_user(
+        transactions, has_older = await transaction_crud.list_page_for_user(
             db=self.db,
             user_id=self.user_id,
             limit=limit_value,
         )
 
         if not transactions:
-            return "You don't have any recorded transactions yet."
+            return Reply("You don't have any recorded transactions yet.")
+
+        buttons = [("◀ Older", encode_page_callback(OLDER, limit_value, transactions[-1]))] if has_older else []
+        return await self._history_page("Here are your most recent transactions:", transactions, buttons)
 
-        lines = ["Here are your most recent transactions:"]
+    async def page_transactions(self, callback_data: str) -> Reply:
+        """
+        Show the page before or after the one an Older/Newer button was on
+
+        Args:
+            callback_data (str): Data of the pressed button (see ``encode_page_callback``).
+
+        Returns:
+            Reply: The page, with buttons to keep paging.
+        """
+        page = decode_page_callback(callback_data)
+        if page is None:
+            return Reply("This page is no longer available. Ask for your transactions again.")
+        direction, limit, cursor = page
+
+        if direction == OLDER:
+            transactions, has_older = await transaction_crud.list_page_for_user(
+                self.db, user_id=self.user_id, limit=limit, before=cursor,
+            )
+            has_newer = True
+        else:
+            transactions, has_newer = await transaction_crud.list_page_for_user(
+                self.db, user_id=self.user_id, limit=limit, after=cursor,
+            )
+            has_older = True
+
+        if not transactions:
+            # Everything past the cursor was deleted meanwhile.
+            return Reply("No older transactions." if direction == OLDER else "No newer transactions.")
+
+        buttons = []
+        if has_older:
+            buttons.append(("◀ Older", encode_page_callback(OLDER, limit, transactions[-1])))
+        if has_newer:
+            buttons.append(("Newer ▶", encode_page_callback(NEWER, limit, transactions[0])))
+        return await self._history_page("Your transactions:", transactions, buttons)
+
+    async def _history_page(self, heading: str, transactions: List[Transaction], buttons: List[Tuple[str, str]]) -> Reply:
+        await currency_catalogue.ensure_loaded()
+        lines = [heading]
         for idx, tx in enumerate(transactions, start=1):
-            currency_code = tx.currency.code if tx.currency else ""
+            currency_code = self._currency_code(tx.currency_id)
             date_str = tx.occurred_at.strftime("%Y-%m-%d")
             category_str = tx.category or ""
             lines.append(
-                f"{idx}. {date_str} | {tx.type} | {tx.amount} {currency_code} | {tx.description} | {category_str} | id: {tx.id}"
+                f"{idx}. {date_str} | {tx.type} | {tx.amount} {currency_code} | {tx.description} | {category_str} | code: {short_code.encode(tx.seq)}"
             )
 
-        return "\n".join(lines)
+        return Reply("\n".join(lines), buttons)
 
-    def delete_transaction(self, transaction_id: str) -> str:
+    async def delete_transaction(self, transaction_id: str) -> str:
         if not transaction_id:
-            return "Please provide a transaction ID or prefix to delete."
+            return "Please provide a transaction code or ID to delete."
 
-        prefix = transaction_id.strip()
-        if not prefix:
-            return "Please provide a transaction ID or prefix to delete."
+        reference = transaction_id.strip()
+        if not reference:
+            return "Please provide a transaction code or ID to delete."
 
-        # Allow matching by UUID prefix as shown in the list output.
-        matches = transaction_crud.find_active_by_id_prefix(
-            db=self.db,
-            user_id=self.user_id,
-            prefix=prefix,
-        )
+        # Short codes as shown in the list output; longer input is a UUID (prefix).
+        seq = short_code.decode(reference)
+        if seq is not None:
+            transaction = await transaction_crud.get_active_by_seq(self.db, user_id=self.user_id, seq=seq)
+            matches = [transaction] if transaction else []
+        else:
+            matches = await transaction_crud.find_active_by_id_prefix(
+                db=self.db,
+                user_id=self.user_id,
+                prefix=reference,
+            )
 
         if not matches:
             return "Transaction not found for your account."
 
+        await currency_catalogue.ensure_loaded()
         if len(matches) > 1:
             # Show a few matching candidates to help the user refine.
-            lines = ["Multiple transactions match that ID prefix. Please enter more characters from the transaction ID to narrow it down."]
+            lines = ["Multiple transactions match that ID prefix. Please use one of these codes instead:"]
             for tx in matches[:5]:
-                currency_code = tx.currency.code if tx.currency else ""
+                currency_code = self._currency_code(tx.currency_id)
                 date_str = tx.occurred_at.strftime("%Y-%m-%d")
                 lines.append(
-                    f"- {tx.id} | {date_str} | {tx.amount} {currency_code} | {tx.description}"
+                    f"- {short_code.encode(tx.seq)} | {date_str} | {tx.amount} {currency_code} | {tx.description}"
                 )
             return "\n".join(lines)
 
         transaction = matches[0]
 
-        currency_code = transaction.currency.code if transaction.currency else ""
+        currency_code = self._currency_code(transaction.currency_id)
         date_str = transaction.occurred_at.strftime("%Y-%m-%d")
         summary = (
             f"{transaction.amount} {currency_code} on {date_str} - {transaction.description}"
         )
 
-        transaction_crud.soft_delete(self.db, tx=transaction)
+        await transaction_crud.soft_delete(self.db, tx=transaction, commit=self.autocommit)
 
-        return f"Deleted transaction {transaction.id}: {summary}."
+        return f"Deleted transaction {short_code.encode(transaction.seq)}: {summary}."
 
-    def get_analytics(
+    async def get_analytics(
         self,
         time_range: str = "current_month",
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
+        by_category: bool = False,
     ) -> str:
         query_start = None
         query_end = None
@@ -177,7 +432,7 @@ class TransactionController:
         # 1. Helper to parse date strings
         def parse_date(date_str: str) -> Optional[datetime]:
             try:
-                return datetime.fromisoformat(date_str)
+                return _to_naive(datetime.fromisoformat(date_str))
             except (ValueError, TypeError):
                 return None
 
@@ -257,47 +512,17 @@ class TransactionController:
                 )
                 display_range = time_range
 
-        # 3. Aggregate values via CRUD layer
-        income = transaction_crud.sum_amount_for_user_and_type(
+        # 3. Income/expense per currency (and per category) in one query
+        currencies = await transaction_crud.analytics_for_user(
             db=self.db,
             user_id=self.user_id,
-            tx_type=TransactionType.INCOME,
             start=query_start,
             end=query_end,
+            by_category=by_category,
         )
-        expense = transaction_crud.sum_amount_for_user_and_type(
-            db=self.db,
-            user_id=self.user_id,
-            tx_type=TransactionType.EXPENSE,
+        return format_analytics(AnalyticsResult(
+            label=display_range,
             start=query_start,
             end=query_end,
-        )
-        balance = income - expense
-
-        # We need to get the currency symbol/code. Assuming user has one if they have transactions.
-        user = self.db.query(User).filter(User.id == self.user_id).first()
-        currency_code = user.currency.code if user and user.currency else ""
-
-        # Format the actual date range applied
-        start_str = query_start.strftime("%Y-%m-%d") if query_start else "..."
-        end_str = "Now"
-        if query_end:
-            # If query_end is exactly midnight, it usually means "up to this date" (exclusive)
-            # For display, it might be clearer to show the previous day if it's a generated range like last_month
-            # But for custom ranges, user might expect what they typed.
-            # Let's just show the calculated query boundary for clarity.
-            end_str = query_end.strftime("%Y-%m-%d")
-
-        date_range_line = f"📅 {start_str} - {end_str}"
-
-        return (
-            f"📊 Analytics ({display_range}):\n"
-            f"{date_range_line}\n"
-            f"Income: {income} {currency_code}\n"
-            f"Expense: {expense} {currency_code}\n"
-            f"Balance: {balance} {currency_code}"
-        )
-
-    def __del__(self):
-        if self.db:
-            self.db.close()
+            currencies=currencies,
+        ))
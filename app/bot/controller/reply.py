@@ -0,0 +1,17 @@
+from typing import Sequence, Tuple
+
+
+class Reply(str):
+    """
+    Reply text with optional inline buttons, as ``(label, callback_data)`` pairs.
+
+    It is a ``str`` so it flows unchanged through code that only needs the
+    text (conversation memory, joining several tool results); the Telegram
+    handler turns ``buttons`` into an inline keyboard.
+    """
+    buttons: Tuple[Tuple[str, str], ...]
+
+    def __new__(cls, text: str, buttons: Sequence[Tuple[str, str]] = ()) -> "Reply":
+        reply = super().__new__(cls, text)
+        reply.buttons = tuple(buttons)
+        return reply
@@ -0,0 +1,58 @@
+import uuid
+
+import telegram
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.crud.telegram_user import telegram_user_crud
+from app.db.session import AsyncSessionLocal
+
+
+class IdentityResolver:
+    """
+    Resolve a Telegram account to its user id, creating the user on first contact.
+
+    Results are kept in an in-process LRU cache, so a returning user costs no
+    database round trip until the entry expires.
+
+    Args:
+        maxsize (int): Maximum number of cached Telegram accounts.
+        ttl (float): Seconds a cached entry stays valid.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.cache: TTLCache[int, uuid.UUID] = TTLCache(maxsize, ttl)
+
+    async def resolve(self, user_details: telegram.User) -> uuid.UUID:
+        """
+        Get the user id for a Telegram user
+
+        Args:
+            user_details (telegram.User): Sender of the update.
+
+        Returns:
+            uuid.UUID: The user's ID.
+        """
+        user_id = self.cache.get(user_details.id)
+        if user_id is not None:
+            metrics.counter("identity.cache.hit").inc()
+            return user_id
+
+        metrics.counter("identity.cache.miss").inc()
+        async with AsyncSessionLocal() as db:
+            user_id = await telegram_user_crud.get_or_create_user_id(
+                db,
+                telegram_id=str(user_details.id),
+                username=user_details.username,
+                first_name=user_details.first_name,
+                last_name=user_details.last_name,
+            )
+        self.cache.set(user_details.id, user_id)
+        return user_id
+
+    def forget(self, telegram_id: int) -> None:
+        """Drop a cached entry, e.g. after the user was deleted."""
+        self.cache.pop(telegram_id)
+
+
+identity_resolver = IdentityResolver(settings.IDENTITY_CACHE_SIZE, settings.IDENTITY_CACHE_TTL)
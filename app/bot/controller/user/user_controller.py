@@ -1,32 +1,33 @@
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.db.session import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bot.controller.base import BaseController
 from app.crud.user import user_crud
-from app.crud.currency import currency_crud
+from app.core.currencies import currency_catalogue
 
 
-class UserController:
-    def __init__(self, user_id: str):
-        self.db: Session = SessionLocal()
+class UserController(BaseController):
+    def __init__(self, user_id: str, db: Optional[AsyncSession] = None):
+        super().__init__(db)
         self.user_id = user_id
 
-    def get_user_currency(self):
-        user = user_crud.get_active(self.db, self.user_id)
-        if user and user.currency:
-            return user.currency.code
+    async def get_user_currency(self):
+        user = await user_crud.get_active(self.db, self.user_id)
+        if user and user.currency_id:
+            await currency_catalogue.ensure_loaded()
+            currency = currency_catalogue.by_id(user.currency_id)
+            return currency.code if currency else None
         return None
 
-    def set_default_currency(self, currency_code: str):
-        currency = currency_crud.get_by_code(self.db, currency_code)
+    async def set_default_currency(self, currency_code: str):
+        await currency_catalogue.ensure_loaded()
+        currency = currency_catalogue.by_code(currency_code)
         if not currency:
             return f"Currency {currency_code} not found."
 
-        user = user_crud.set_default_currency(self.db, self.user_id, currency.id)
+        user = await user_crud.set_default_currency(self.db, self.user_id, currency.id)
         if not user:
             return "User not found."
 
         return f"Currency set to {currency.code}"
-
-    def __del__(self):
-        if self.db:
-            self.db.close()
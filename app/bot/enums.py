@@ -0,0 +1,5 @@
+from enum import Enum
+
+class BotMode(Enum):
+    POLLING = "polling"
+    WEBHOOK = "webhook"
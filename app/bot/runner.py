@@ -1,20 +1,149 @@
+import asyncio
 import logging
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram import Update
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, MessageHandler, TypeHandler, filters
 
 from app.core.config import settings
+from app.core.currencies import currency_catalogue
+from app.core.metrics import log_periodically
+from app.db.session import async_engine
+from app.nl_router.nlu import close_nlu_router, get_nlu_router
 from app.bot.command_handler import Handler
+from app.bot.controller.expense.transaction_controller import PAGE_CALLBACK_PREFIX
+from app.bot.enums import BotMode
+from app.bot.sender import OutboundSender
+from app.bot.sharding import HashRing, WorkerSupervisor, shard_key
+from app.bot.update_processor import PerUserUpdateProcessor
 
 logger = logging.getLogger(__name__)
 
-def run_bot():
-    """Builds and runs the Telegram bot application."""
-    app = Application.builder().token(settings.BOT_TOKEN).build()
-    
+async def _post_init(app: Application) -> None:
+    # Build the NLU router (LLM client, HTTP pool, system prompt) once per process.
+    get_nlu_router()
+    await currency_catalogue.ensure_loaded()
+    # Telegram's global limit is per bot, so sharded workers split it.
+    sender = OutboundSender(
+        app.bot,
+        global_rate=settings.BOT_SEND_GLOBAL_RATE / max(1, settings.BOT_WORKERS),
+        chat_interval=settings.BOT_SEND_CHAT_INTERVAL,
+        max_retries=settings.BOT_SEND_MAX_RETRIES,
+    )
+    sender.start()
+    app.bot_data["sender"] = sender
+    if settings.METRICS_LOG_INTERVAL > 0:
+        app.bot_data["metrics_task"] = asyncio.create_task(
+            log_periodically(settings.METRICS_LOG_INTERVAL)
+        )
+
+async def _post_stop(app: Application) -> None:
+    # Flush queued replies while the bot's HTTP client is still open.
+    sender = app.bot_data.pop("sender", None)
+    if sender:
+        await sender.stop()
+
+async def _post_shutdown(app: Application) -> None:
+    task = app.bot_data.pop("metrics_task", None)
+    if task:
+        task.cancel()
+    await close_nlu_router()
+    await async_engine.dispose()
+
+def build_application(with_updater: bool = True) -> Application:
+    """
+    Builds the Telegram bot application with all handlers registered.
+
+    Args:
+        with_updater (bool): Fetch updates from Telegram. Sharded workers pass
+            False and are fed updates by the front process instead.
+    """
+    update_processor = PerUserUpdateProcessor(
+        max_concurrent_updates=settings.BOT_CONCURRENT_UPDATES,
+        max_queue_size=settings.BOT_USER_QUEUE_SIZE,
+        idle_timeout=settings.BOT_USER_QUEUE_IDLE_SECONDS,
+        max_pending_updates=settings.BOT_MAX_PENDING_UPDATES,
+    )
+    builder = (
+        Application.builder()
+        .token(settings.BOT_TOKEN)
+        .concurrent_updates(update_processor)
+        .post_init(_post_init)
+        .post_stop(_post_stop)
+        .post_shutdown(_post_shutdown)
+    )
+    if not with_updater:
+        builder = builder.updater(None)
+    app = builder.build()
+
     # Register handlers
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, Handler.echo))
     app.add_handler(CommandHandler("start", Handler.start))
     app.add_handler(CommandHandler("help", Handler.help_command))
     app.add_handler(CommandHandler("set_currency", Handler.set_currency))
-    
-    logger.info("Starting bot polling...")
-    app.run_polling()
+    app.add_handler(CallbackQueryHandler(Handler.transactions_page, pattern=f"^{PAGE_CALLBACK_PREFIX}"))
+    return app
+
+def build_front_application(supervisor: WorkerSupervisor) -> Application:
+    """
+    Builds the front application of a sharded deployment.
+
+    It only receives updates and forwards each one to the worker that owns its
+    chat, so one chat is always handled by the same process, in order.
+
+    Args:
+        supervisor (WorkerSupervisor): Supervisor owning the worker queues.
+    """
+    ring = HashRing(len(supervisor.queues))
+
+    async def forward(update: Update, context) -> None:
+        supervisor.submit(ring.node_for(shard_key(update)), update.to_dict())
+
+    async def post_init(app: Application) -> None:
+        supervisor.start()
+        app.bot_data["supervisor_task"] = asyncio.create_task(supervisor.watch())
+
+    async def post_shutdown(app: Application) -> None:
+        task = app.bot_data.pop("supervisor_task", None)
+        if task:
+            task.cancel()
+        supervisor.stop()
+
+    app = (
+        Application.builder()
+        .token(settings.BOT_TOKEN)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
+    app.add_handler(TypeHandler(Update, forward))
+    return app
+
+def run_bot():
+    """Builds and runs the Telegram bot application."""
+    if settings.BOT_WORKERS > 1:
+        logger.info("Starting %s sharded bot workers...", settings.BOT_WORKERS)
+        app = build_front_application(WorkerSupervisor(settings.BOT_WORKERS))
+    else:
+        app = build_application()
+    mode = settings.BOT_MODE
+
+    if mode == BotMode.POLLING.value:
+        logger.info("Starting bot polling...")
+        app.run_polling()
+    elif mode == BotMode.WEBHOOK.value:
+        if not settings.WEBHOOK_URL:
+            raise ValueError("WEBHOOK_URL must be set when BOT_MODE is 'webhook'")
+        url_path = settings.WEBHOOK_PATH.strip("/")
+        logger.info(
+            "Starting bot webhook on %s:%s/%s...",
+            settings.WEBHOOK_LISTEN, settings.WEBHOOK_PORT, url_path,
+        )
+        app.run_webhook(
+            listen=settings.WEBHOOK_LISTEN,
+            port=settings.WEBHOOK_PORT,
+            url_path=url_path,
+            webhook_url=f"{settings.WEBHOOK_URL.rstrip('/')}/{url_path}",
+            secret_token=settings.WEBHOOK_SECRET_TOKEN or None,
+            max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+        )
+    else:
+        raise ValueError(f"Unknown BOT_MODE: {mode}")
@@ -0,0 +1,255 @@
+"""
+Outbound message queue.
+
+Handlers hand replies to ``OutboundSender.send`` and return immediately; a
+background task delivers them while respecting Telegram's limits:
+
+* at most ``global_rate`` messages per second overall (~30/s for bots),
+* at most one message per ``chat_interval`` seconds to the same chat,
+* on ``429 RetryAfter`` the whole sender pauses for the server-provided delay
+  and the message is retried, so a spike delays replies instead of dropping them.
+
+Messages to the same chat stay in order. Texts queued for one chat while it is
+rate limited are coalesced into a single message when they fit (messages with
+a keyboard are never merged).
+"""
+import asyncio
+import datetime
+import logging
+import time
+import warnings
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from telegram import Bot, Message
+from telegram.constants import MessageLimit
+from telegram.error import BadRequest, NetworkError, RetryAfter
+from telegram.warnings import PTBDeprecationWarning
+
+from app.core.metrics import metrics
+from app.nl_router.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Outgoing:
+    chat_id: int
+    text: str
+    kwargs: Dict[str, Any]
+    enqueued_at: float = field(default_factory=time.monotonic)
+    futures: List["asyncio.Future[Message]"] = field(default_factory=list)
+    attempts: int = 0
+
+
+class OutboundSender:
+    """
+    Rate-limited, retrying queue for ``bot.send_message``.
+
+    Args:
+        bot (Bot): Bot used to send.
+        global_rate (float): Messages per second across all chats.
+        chat_interval (float): Minimum seconds between messages to one chat.
+        max_retries (int): Attempts per message before its future fails.
+        coalesce (bool): Merge queued texts for a chat into one message.
+    """
+    def __init__(
+        self,
+        bot: Bot,
+        global_rate: float = 30.0,
+        chat_interval: float = 1.0,
+        max_retries: int = 5,
+        coalesce: bool = True,
+    ):
+        self.bot = bot
+        self.chat_interval = chat_interval
+        self.max_retries = max_retries
+        self.coalesce = coalesce
+        self._bucket = TokenBucket(global_rate, max(1.0, global_rate))
+        self._pending: Dict[int, Deque[_Outgoing]] = {}
+        self._next_allowed: Dict[int, float] = {}
+        self._ready: "asyncio.Queue[int]" = asyncio.Queue()
+        # Chats that are queued in _ready, waiting on a timer, or sending.
+        self._scheduled: Set[int] = set()
+        self._paused_until = 0.0
+        self._sends: Set[asyncio.Task] = set()
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Deliver what is queued (for up to ``timeout`` seconds), then stop."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Outbound sender stopped with %s messages queued", self._depth())
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for task in list(self._sends):
+            task.cancel()
+        for items in self._pending.values():
+            for item in items:
+                for future in item.futures:
+                    future.cancel()
+        self._pending.clear()
+
+    def send(self, chat_id: int, text: str, **kwargs: Any) -> "asyncio.Future[Message]":
+        """
+        Queue a message
+
+        Args:
+            chat_id (int): Target chat.
+            text (str): Message text.
+            **kwargs: Extra ``bot.send_message`` arguments.
+
+        Returns:
+            asyncio.Future[Message]: Resolves to the sent message. Callers may
+                ignore it; failures are logged either way.
+        """
+        future: "asyncio.Future[Message]" = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._pending.setdefault(chat_id, deque()).append(
+            _Outgoing(chat_id, text, kwargs, futures=[future])
+        )
+        self._idle.clear()
+        metrics.gauge("bot.send.queue_depth").set(self._depth())
+        if chat_id not in self._scheduled:
+            self._scheduled.add(chat_id)
+            self._schedule(chat_id)
+        return future
+
+    def _depth(self) -> int:
+        return sum(len(items) for items in self._pending.values())
+
+    def _schedule(self, chat_id: int) -> None:
+        delay = self._next_allowed.get(chat_id, 0.0) - time.monotonic()
+        if delay <= 0:
+            self._ready.put_nowait(chat_id)
+            return
+        self._timers[chat_id] = asyncio.get_running_loop().call_later(delay, self._wake, chat_id)
+
+    def _wake(self, chat_id: int) -> None:
+        self._timers.pop(chat_id, None)
+        self._ready.put_nowait(chat_id)
+
+    def _take_batch(self, chat_id: int) -> _Outgoing:
+        items = self._pending[chat_id]
+        batch = items.popleft()
+        # A message with buttons stays its own message, so the buttons stay under it.
+        if not self.coalesce or batch.attempts or "reply_markup" in batch.kwargs:
+            return batch
+        while items and not items[0].attempts and items[0].kwargs == batch.kwargs:
+            merged = f"{batch.text}\n\n{items[0].text}"
+            if len(merged) > MessageLimit.MAX_TEXT_LENGTH:
+                break
+            item = items.popleft()
+            batch = _Outgoing(
+                chat_id, merged, batch.kwargs, min(batch.enqueued_at, item.enqueued_at),
+                batch.futures + item.futures,
+            )
+            metrics.counter("bot.send.coalesced").inc()
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            chat_id = await self._ready.get()
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if self._bucket.try_acquire(now):
+                    break
+                await asyncio.sleep(self._bucket.retry_after())
+            batch = self._take_batch(chat_id)
+            self._next_allowed[chat_id] = time.monotonic() + self.chat_interval
+            task = asyncio.create_task(self._deliver(batch))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def _deliver(self, batch: _Outgoing) -> None:
+        chat_id = batch.chat_id
+        try:
+            message = await self.bot.send_message(chat_id, batch.text, **batch.kwargs)
+        except RetryAfter as e:
+            delay = retry_after_seconds(e)
+            metrics.counter("bot.send.retry_after").inc()
+            logger.warning("Telegram flood control: pausing sends for %.1fs", delay)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._next_allowed[chat_id] = time.monotonic() + delay
+            self._retry(batch, e)
+        except BadRequest as e:
+            logger.error("Telegram rejected message to chat %s: %s", chat_id, e)
+            _fail(batch, e)
+        except NetworkError as e:
+            # Timeouts and connection errors; back off exponentially per message.
+            self._next_allowed[chat_id] = time.monotonic() + min(30.0, 2 ** batch.attempts)
+            self._retry(batch, e)
+        except Exception as e:
+            logger.error("Failed to send message to chat %s: %s", chat_id, e)
+            _fail(batch, e)
+        else:
+            metrics.counter("bot.send.sent").inc()
+            metrics.histogram("bot.send.latency_seconds").observe(time.monotonic() - batch.enqueued_at)
+            for future in batch.futures:
+                if not future.done():
+                    future.set_result(message)
+        finally:
+            self._after_send(chat_id)
+
+    def _retry(self, batch: _Outgoing, error: Exception) -> None:
+        batch.attempts += 1
+        if batch.attempts >= self.max_retries:
+            logger.error("Giving up on message to chat %s after %s attempts: %s",
+                         batch.chat_id, batch.attempts, error)
+            _fail(batch, error)
+            return
+        self._pending.setdefault(batch.chat_id, deque()).appendleft(batch)
+
+    def _after_send(self, chat_id: int) -> None:
+        if self._pending.get(chat_id):
+            self._schedule(chat_id)
+            return
+        self._pending.pop(chat_id, None)
+        self._scheduled.discard(chat_id)
+        if len(self._next_allowed) > 10000:
+            now = time.monotonic()
+            self._next_allowed = {chat: at for chat, at in self._next_allowed.items() if at > now}
+        depth = self._depth()
+        metrics.gauge("bot.send.queue_depth").set(depth)
+        if depth == 0 and not self._scheduled:
+            self._idle.set()
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    """Seconds Telegram asked us to wait, whether PTB reports an int or a timedelta."""
+    with warnings.catch_warnings():
+        # PTB is migrating retry_after from int to timedelta; both are handled.
+        warnings.simplefilter("ignore", PTBDeprecationWarning)
+        retry_after = error.retry_after
+    if isinstance(retry_after, datetime.timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+def _fail(batch: _Outgoing, error: Exception) -> None:
+    metrics.counter("bot.send.failed").inc()
+    for future in batch.futures:
+        if not future.done():
+            future.set_exception(error)
+
+
+def _consume_exception(future: "asyncio.Future[Message]") -> None:
+    # Fire-and-forget callers never await the future; failures are already logged.
+    if not future.cancelled():
+        future.exception()
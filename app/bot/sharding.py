@@ -0,0 +1,250 @@
+"""
+Multi-worker deployment.
+
+One front process receives updates (polling or webhook) and forwards each one
+to a worker process chosen by consistent-hashing its chat id, so every chat is
+always handled by the same worker and in order. Workers run the normal handler
+pipeline (``build_application``) without an updater. A supervisor restarts any
+worker that dies; its queue survives, so updates a worker has not taken yet
+are not lost. A worker takes at most ``BOT_MAX_PENDING_UPDATES`` updates off
+its queue at a time, which bounds what a crash can drop.
+"""
+import asyncio
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import signal
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from telegram import Update
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Sent on a worker queue to ask the worker to finish and exit.
+STOP = None
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to ``nodes`` worker indexes.
+
+    Each node owns ``replicas`` points on the ring, so keys spread evenly and
+    growing from N to N+1 nodes moves only about 1/(N+1) of the keys.
+
+    Args:
+        nodes (int): Number of workers.
+        replicas (int): Virtual points per worker.
+    """
+    def __init__(self, nodes: int, replicas: int = 100):
+        if nodes < 1:
+            raise ValueError("nodes must be at least 1")
+        points = sorted(
+            (self._hash(f"{node}:{replica}"), node)
+            for node in range(nodes)
+            for replica in range(replicas)
+        )
+        self._hashes = [h for h, _ in points]
+        self._nodes = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+    def node_for(self, key: Any) -> int:
+        index = bisect.bisect(self._hashes, self._hash(str(key)))
+        return self._nodes[index % len(self._nodes)]
+
+
+def shard_key(update: Update) -> Any:
+    """Chat id of an update, falling back to the user id and then the update id."""
+    if update.effective_chat is not None:
+        return update.effective_chat.id
+    if update.effective_user is not None:
+        return update.effective_user.id
+    return update.update_id
+
+
+def run_worker(index: int, updates: "multiprocessing.Queue") -> None:
+    """Entry point of a worker process: handle updates from ``updates`` until STOP."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s [%(levelname)s] worker-{index} %(name)s: %(message)s",
+    )
+    # Ctrl+C reaches the whole process group; let the front process stop us cleanly.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_worker_loop(index, updates))
+
+
+async def _worker_loop(index: int, updates: "multiprocessing.Queue") -> None:
+    from app.bot.runner import build_application
+
+    app = build_application(with_updater=False)
+    logger.info("Worker %s starting", index)
+    await run_worker_application(app, updates, settings.BOT_MAX_PENDING_UPDATES)
+
+
+async def run_worker_application(app: Any, updates: "multiprocessing.Queue", max_pending: int) -> None:
+    """
+    Run ``app`` on the updates from ``updates`` until STOP
+
+    PTB only calls the ``post_init``/``post_stop``/``post_shutdown`` hooks
+    from ``run_polling``/``run_webhook``, so they are called here in the same
+    order: without them a worker has no outbound sender, NLU router or
+    currency catalogue, and nothing is flushed or closed on exit.
+
+    Args:
+        app (Application): Application built without an updater.
+        updates (multiprocessing.Queue): This worker's queue.
+        max_pending (int): Updates taken but not yet processed.
+    """
+    try:
+        async with app:
+            await app.start()
+            try:
+                if app.post_init:
+                    await app.post_init(app)
+                await forward_updates(app, updates, max_pending)
+            finally:
+                if app.running:
+                    await app.stop()
+                if app.post_stop:
+                    await app.post_stop(app)
+    finally:
+        if app.post_shutdown:
+            await app.post_shutdown(app)
+
+
+async def forward_updates(app: Any, updates: "multiprocessing.Queue", max_pending: int) -> None:
+    """
+    Process updates from ``updates`` until STOP, at most ``max_pending`` at a time
+
+    An update is only taken off the process queue once one of the
+    ``max_pending`` slots is free, so a backlog stays on the queue (where a
+    restarted worker finds it) rather than in this process's memory.
+
+    Args:
+        app (Application): Started application whose handlers process the updates.
+        updates (multiprocessing.Queue): This worker's queue.
+        max_pending (int): Updates taken but not yet processed.
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(max_pending)
+    tasks = set()
+
+    def finished(task: asyncio.Task) -> None:
+        tasks.discard(task)
+        slots.release()
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Error processing update: %s", task.exception())
+
+    try:
+        while True:
+            await slots.acquire()
+            data = await loop.run_in_executor(None, updates.get)
+            if data is STOP:
+                break
+            update = Update.de_json(data, app.bot)
+            # What PTB's update fetcher does, minus its unbounded in-memory queue.
+            task = asyncio.create_task(app.update_processor.process_update(update, app.process_update(update)))
+            tasks.add(task)
+            task.add_done_callback(finished)
+    finally:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class WorkerSupervisor:
+    """
+    Start ``count`` worker processes and restart any that exit unexpectedly.
+
+    Each worker has its own queue, owned by the supervisor, so a restarted
+    worker picks up where the crashed one stopped.
+
+    Args:
+        count (int): Number of workers.
+        target (Callable): Worker entry point, called as ``target(index, queue)``.
+        restart_delay (float): Minimum seconds between restarts of one worker.
+    """
+    def __init__(
+        self,
+        count: int,
+        target: Callable[[int, "multiprocessing.Queue"], None] = run_worker,
+        restart_delay: float = 1.0,
+    ):
+        # "spawn" gives every worker a fresh interpreter: no inherited event
+        # loop, DB connections or HTTP pools from the front process.
+        self._ctx = multiprocessing.get_context("spawn")
+        self.target = target
+        self.restart_delay = restart_delay
+        self.queues: List["multiprocessing.Queue"] = [self._ctx.Queue() for _ in range(count)]
+        self.processes: List[Optional[multiprocessing.process.BaseProcess]] = [None] * count
+        self._started_at: Dict[int, float] = {}
+        self._stopping = False
+
+    def _spawn(self, index: int) -> None:
+        process = self._ctx.Process(
+            target=self.target,
+            args=(index, self.queues[index]),
+            name=f"bot-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[index] = process
+        self._started_at[index] = time.monotonic()
+
+    def start(self) -> None:
+        for index in range(len(self.queues)):
+            self._spawn(index)
+        logger.info("Started %s bot workers", len(self.queues))
+
+    def check(self) -> int:
+        """
+        Restart dead workers
+
+        Returns:
+            int: Number of workers restarted.
+        """
+        if self._stopping:
+            return 0
+        restarted = 0
+        for index, process in enumerate(self.processes):
+            if process is None or process.is_alive():
+                continue
+            if time.monotonic() - self._started_at[index] < self.restart_delay:
+                continue  # Crash loop; try again on a later check.
+            logger.error("Worker %s exited with code %s; restarting", index, process.exitcode)
+            metrics.counter("bot.worker.restarts").inc()
+            self._spawn(index)
+            restarted += 1
+        return restarted
+
+    async def watch(self, interval: float = 1.0) -> None:
+        """Call ``check`` every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            self.check()
+
+    def submit(self, index: int, data: Dict[str, Any]) -> None:
+        self.queues[index].put(data)
+        metrics.counter(f"bot.worker.{index}.forwarded").inc()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Ask every worker to finish its queue and exit; kill it after ``timeout``."""
+        self._stopping = True
+        for update_queue in self.queues:
+            update_queue.put(STOP)
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            if process is None:
+                continue
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for update_queue in self.queues:
+            update_queue.close()
+
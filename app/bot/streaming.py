@@ -0,0 +1,128 @@
+"""
+Progressive replies for streamed model output.
+
+``StreamingReply`` posts a placeholder as soon as the model is queried and
+edits it with the text generated so far, at most once per ``edit_interval``
+seconds, so the user sees output long before the completion is done.
+"""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from telegram import Bot, InlineKeyboardMarkup, Message
+from telegram.constants import MessageLimit
+from telegram.error import BadRequest, RetryAfter, TelegramError
+
+from app.bot.sender import OutboundSender, retry_after_seconds
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER = "…"
+
+
+class StreamingReply:
+    """
+    One reply message that is edited while the answer streams in.
+
+    Args:
+        bot (Bot): Bot used for edits.
+        sender (OutboundSender): Queue used for the placeholder and plain replies.
+        chat_id (int): Chat to reply in.
+        edit_interval (float): Minimum seconds between edits.
+    """
+    def __init__(self, bot: Bot, sender: OutboundSender, chat_id: int, edit_interval: float = 1.0):
+        self.bot = bot
+        self.sender = sender
+        self.chat_id = chat_id
+        self.edit_interval = edit_interval
+        self.message: Optional[Message] = None
+        self._latest = ""
+        self._shown = PLACEHOLDER
+        self._started_at = 0.0
+        self._editor: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Post the placeholder and start the periodic editor."""
+        self._started_at = time.monotonic()
+        self.message = await self.sender.send(self.chat_id, PLACEHOLDER)
+        self._editor = asyncio.create_task(self._edit_periodically())
+
+    async def update(self, text: str) -> None:
+        """Record the text so far; the editor picks it up on its next tick."""
+        self._latest = text
+
+    async def finish(self, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None) -> None:
+        """
+        Show the final reply
+
+        Replaces the placeholder if one was posted, otherwise sends ``text``
+        as a normal message (e.g. when no model call was needed).
+
+        Args:
+            text (str): The complete reply.
+            reply_markup (Optional[InlineKeyboardMarkup]): Buttons for the
+                reply, attached to its last message.
+        """
+        markup = {"reply_markup": reply_markup} if reply_markup is not None else {}
+        if self._editor is not None:
+            self._editor.cancel()
+            try:
+                await self._editor
+            except asyncio.CancelledError:
+                pass
+        if self.message is None:
+            self.sender.send(self.chat_id, text, **markup)
+            return
+
+        head, tail = text[:MessageLimit.MAX_TEXT_LENGTH], text[MessageLimit.MAX_TEXT_LENGTH:]
+        head_markup = {} if tail else markup
+        for _ in range(3):
+            try:
+                await self._edit(head, **head_markup)
+                break
+            except RetryAfter as e:
+                await asyncio.sleep(retry_after_seconds(e))
+            except TelegramError as e:
+                logger.warning("Could not edit streamed reply in chat %s: %s", self.chat_id, e)
+                self.sender.send(self.chat_id, text, **markup)
+                return
+        else:
+            self.sender.send(self.chat_id, head, **head_markup)
+        if tail:
+            self.sender.send(self.chat_id, tail, **markup)
+
+    async def _edit_periodically(self) -> None:
+        interval = self.edit_interval
+        while True:
+            await asyncio.sleep(interval)
+            text = self._latest[:MessageLimit.MAX_TEXT_LENGTH]
+            if not text or text == self._shown:
+                continue
+            try:
+                first = self._shown == PLACEHOLDER
+                await self._edit(text)
+                if first:
+                    metrics.histogram("bot.stream.first_text_seconds").observe(
+                        time.monotonic() - self._started_at
+                    )
+                interval = self.edit_interval
+            except RetryAfter as e:
+                # Intermediate edits are optional; just slow down.
+                interval = max(self.edit_interval, retry_after_seconds(e))
+            except TelegramError as e:
+                logger.debug("Skipping streamed edit in chat %s: %s", self.chat_id, e)
+
+    async def _edit(self, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None) -> None:
+        if text == self._shown and reply_markup is None:
+            return
+        try:
+            await self.bot.edit_message_text(
+                text, chat_id=self.chat_id, message_id=self.message.message_id, reply_markup=reply_markup,
+            )
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                raise
+        self._shown = text
+        metrics.counter("bot.stream.edits").inc()
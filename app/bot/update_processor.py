@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Dict, Hashable, Optional, Tuple
+
+from telegram.ext import BaseUpdateProcessor
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_QueueItem = Tuple[float, Awaitable[Any], asyncio.Future]
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes updates from one Telegram user in arrival order, and updates
+    from different users in parallel.
+
+    Each active user gets a bounded queue drained by its own worker task; the
+    worker exits (and the queue is evicted) after ``idle_timeout`` seconds
+    without updates. At most ``max_concurrent_updates`` handlers run at once;
+    up to ``max_pending_updates`` updates may be queued or running in total,
+    after which Telegram's update fetcher is back-pressured.
+
+    Metrics:
+        bot.update_queue.depth: updates waiting in per-user queues.
+        bot.update_queue.users: users with an active queue.
+        bot.update_queue.wait_seconds: time from arrival to handler start.
+
+    Args:
+        max_concurrent_updates (int): Handlers allowed to run concurrently.
+        max_queue_size (int): Per-user queue bound.
+        idle_timeout (float): Seconds before an idle user queue is evicted.
+        max_pending_updates (Optional[int]): Total queued + running updates.
+            Defaults to ``8 * max_concurrent_updates``.
+    """
+    def __init__(
+        self,
+        max_concurrent_updates: int,
+        max_queue_size: int = 20,
+        idle_timeout: float = 60.0,
+        max_pending_updates: Optional[int] = None,
+    ):
+        super().__init__(max_pending_updates or max_concurrent_updates * 8)
+        self._run_slots = asyncio.Semaphore(max_concurrent_updates)
+        self._max_queue_size = max_queue_size
+        self._idle_timeout = idle_timeout
+        self._queues: Dict[Hashable, asyncio.Queue] = {}
+        self._workers: Dict[Hashable, asyncio.Task] = {}
+        self._depth = metrics.gauge("bot.update_queue.depth")
+        self._users = metrics.gauge("bot.update_queue.users")
+        self._wait = metrics.histogram("bot.update_queue.wait_seconds")
+
+    @staticmethod
+    def _key(update: object) -> Optional[Hashable]:
+        user = getattr(update, "effective_user", None)
+        if user is not None:
+            return ("user", user.id)
+        chat = getattr(update, "effective_chat", None)
+        if chat is not None:
+            return ("chat", chat.id)
+        return None
+
+    def queue_depth(self, key: Hashable) -> int:
+        queue = self._queues.get(key)
+        return queue.qsize() if queue else 0
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self._key(update)
+        if key is None:
+            # Nothing to order against (e.g. poll updates): just cap concurrency.
+            async with self._run_slots:
+                await coroutine
+            return
+
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self._max_queue_size)
+            self._queues[key] = queue
+            self._workers[key] = asyncio.create_task(self._drain(key, queue))
+            self._users.set(len(self._queues))
+
+        done = asyncio.get_running_loop().create_future()
+        await queue.put((time.monotonic(), coroutine, done))
+        self._depth.inc()
+        await done
+
+    async def _drain(self, key: Hashable, queue: asyncio.Queue) -> None:
+        while True:
+            try:
+                enqueued_at, coroutine, done = await asyncio.wait_for(queue.get(), self._idle_timeout)
+            except TimeoutError:
+                if queue.empty():
+                    self._queues.pop(key, None)
+                    self._workers.pop(key, None)
+                    self._users.set(len(self._queues))
+                    return
+                continue
+
+            self._depth.dec()
+            async with self._run_slots:
+                self._wait.observe(time.monotonic() - enqueued_at)
+                try:
+                    await coroutine
+                except Exception as e:
+                    # PTB's own process_update already routes handler errors to
+                    # error handlers; anything reaching here is unexpected.
+                    logger.exception("Error processing update for %s: %s", key, e)
+                finally:
+                    if not done.done():
+                        done.set_result(None)
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        workers = list(self._workers.values())
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        for queue in self._queues.values():
+            while not queue.empty():
+                _, coroutine, done = queue.get_nowait()
+                if hasattr(coroutine, "close"):
+                    coroutine.close()
+                done.cancel()
+        self._queues.clear()
+        self._workers.clear()
+        self._depth.set(0)
+        self._users.set(0)
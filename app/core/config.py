@@ -1,5 +1,8 @@
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn, ValidationInfo, field_validator
+from sqlalchemy.engine import make_url
 
 
 
@@ -23,18 +26,119 @@ class Settings(BaseSettings):
             host=values.get("POSTGRES_SERVER"),
             path=f"{values.get('POSTGRES_DB') or ''}",
         ))
+
+    # Async (asyncpg) URI used by the bot; derived from the sync URI when unset.
+    SQLALCHEMY_ASYNC_DATABASE_URI: str | None = None
+    @field_validator("SQLALCHEMY_ASYNC_DATABASE_URI", mode="before")
+    def assemble_async_db_connection(cls, v: str | None, info: ValidationInfo) -> str:
+        if isinstance(v, str):
+            return v
+        sync_uri = info.data.get("SQLALCHEMY_DATABASE_URI")
+        return make_url(sync_uri).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
     
     DB_POOL_SIZE: int = 5
     DB_MAX_OVERFLOW: int = 10
     DB_POOL_TIMEOUT: int = 30
 
+    # TimescaleDB layout of `transactions`, applied by the hypertable migration
+    # when the extension is installed (ignored on plain Postgres). Chunks older
+    # than TIMESCALE_COMPRESS_AFTER are compressed; TIMESCALE_RETENTION drops
+    # chunks older than that interval and is off by default, since it deletes
+    # users' records.
+    TIMESCALE_CHUNK_INTERVAL: str = "1 month"
+    TIMESCALE_COMPRESS_AFTER: str = "3 months"
+    TIMESCALE_RETENTION: str = ""
+
+    BOT_MODE: str = "polling"  # "polling" or "webhook"
+    # Worker processes; above 1, a front process shards updates by chat id
+    # across workers (one event loop and DB pool per worker).
+    BOT_WORKERS: int = 1
+    # Max updates processed at the same time (1 = strictly sequential).
+    # Updates from the same user are always processed in order.
+    BOT_CONCURRENT_UPDATES: int = 16
+    # Updates queued or running in total before the fetcher is back-pressured.
+    BOT_MAX_PENDING_UPDATES: int = 256
+    BOT_USER_QUEUE_SIZE: int = 20
+    BOT_USER_QUEUE_IDLE_SECONDS: float = 60.0
+
+    # Outbound replies: Telegram allows ~30 messages/s per bot and about one
+    # per second per chat before answering 429 RetryAfter.
+    BOT_SEND_GLOBAL_RATE: float = 30.0
+    BOT_SEND_CHAT_INTERVAL: float = 1.0
+    BOT_SEND_MAX_RETRIES: int = 5
+
+    # telegram_id -> user_id cache in front of the users tables.
+    IDENTITY_CACHE_SIZE: int = 10000
+    IDENTITY_CACHE_TTL: float = 600.0
+
+    # Log a metrics snapshot every N seconds (0 = disabled).
+    METRICS_LOG_INTERVAL: int = 0
+
+    # Webhook mode: Telegram POSTs updates to WEBHOOK_URL/WEBHOOK_PATH, which
+    # must be routed (e.g. by a load balancer) to WEBHOOK_LISTEN:WEBHOOK_PORT.
+    WEBHOOK_URL: str = ""
+    WEBHOOK_PATH: str = "telegram"
+    WEBHOOK_LISTEN: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8000
+    WEBHOOK_SECRET_TOKEN: str = ""
+    WEBHOOK_MAX_CONNECTIONS: int = 40
+
     MODEL_TYPE: str = ""  # "open_ai" or "gen_ai"
+    # Record one-line entries like "coffee 3.5 EUR" without calling the LLM.
+    NLU_FAST_PATH_ENABLED: bool = True
+    # Attach only the tool schemas a message may need (none for small talk).
+    NLU_TOOL_SELECTION: bool = True
+    # Replay the model's tool call for repeated read-only questions such as
+    # "show my analytics" (0 = disabled).
+    TOOL_CALL_CACHE_SIZE: int = 2048
+    TOOL_CALL_CACHE_TTL: float = 3600.0
 
     OPEN_AI_MODEL_URL: str = ""
     OPEN_AI_MODEL_NAME: str = ""
     OPEN_AI_API_KEY: str = ""
+    # Optional pool of OpenAI-compatible endpoints, as JSON, e.g.
+    # [{"url": "http://llm-a:8000/v1"}, {"url": "http://llm-b:8000/v1", "model": "qwen2.5-7b"}]
+    # "model" and "api_key" default to OPEN_AI_MODEL_NAME / OPEN_AI_API_KEY.
+    # When empty, OPEN_AI_MODEL_URL is the only endpoint.
+    OPEN_AI_MODEL_ENDPOINTS: List[Dict[str, str]] = []
+    # Duplicate a request to a second endpoint once it is slower than this
+    # percentile of recent latencies (0 = never hedge).
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_DEFAULT_DELAY: float = 2.0
+    # Skip an endpoint for LLM_BREAKER_RESET_SECONDS after this many failures in a row.
+    LLM_BREAKER_FAILURES: int = 3
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
 
     GEN_AI_API_KEY: str = ""
     GEN_AI_MODEL_NAME: str = ""
 
-settings = Settings()
\ No newline at end of file
+    # Shared keep-alive HTTP pool for LLM calls (one per process).
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 120.0
+    LLM_HTTP_TIMEOUT: float = 120.0
+
+    # Stream model answers into a placeholder message, edited at most once
+    # per BOT_STREAM_EDIT_INTERVAL seconds (Telegram throttles frequent edits).
+    LLM_STREAMING: bool = True
+    BOT_STREAM_EDIT_INTERVAL: float = 1.0
+
+    # Per-user conversation memory sent with each model request: recent turns
+    # up to CONVERSATION_TOKEN_BUDGET (0 = no memory), older ones summarized.
+    CONVERSATION_TOKEN_BUDGET: int = 1000
+    CONVERSATION_MAX_TURNS: int = 20
+    CONVERSATION_SUMMARY_TOKENS: int = 200
+    CONVERSATION_CACHE_SIZE: int = 10000
+    CONVERSATION_IDLE_SECONDS: float = 3600.0
+    # Also keep conversations in Postgres (survives restarts and idle eviction).
+    CONVERSATION_PERSIST: bool = False
+
+    # In-flight LLM requests per process, and how long a message may wait for
+    # a free slot before the user is told to retry (0 = wait indefinitely).
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_QUEUE_TIMEOUT: float = 30.0
+    # Per-user token bucket in front of the LLM.
+    USER_RATE_LIMIT_PER_MINUTE: float = 20.0
+    USER_RATE_LIMIT_BURST: int = 5
+
+settings = Settings()
@@ -0,0 +1,107 @@
+import asyncio
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.currency import currency_crud
+from app.db.session import AsyncSessionLocal
+
+
+@dataclass(frozen=True)
+class CurrencyInfo:
+    id: int
+    code: str
+    name: str
+    symbol: str
+    numeric_code: int
+    minor_unit: int
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    by_code: Mapping[str, CurrencyInfo]
+    by_id: Mapping[int, CurrencyInfo]
+    by_numeric_code: Mapping[int, CurrencyInfo]
+
+
+class CurrencyCatalogue:
+    """
+    Process-wide, read-only copy of the ``currency`` reference table.
+
+    The table is seeded once (app/data_migrations) and never written by the
+    bot, so it is loaded at startup and lookups cost no database round trip.
+    A refresh builds a new snapshot and swaps it in whole; readers never see a
+    half-loaded catalogue. Call ``refresh`` after changing the table.
+    """
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    async def ensure_loaded(self) -> None:
+        """Load the catalogue unless it already is; concurrent callers share one load."""
+        if self._snapshot is not None:
+            return
+        async with self._lock:
+            if self._snapshot is None:
+                await self._load()
+
+    async def refresh(self, db: Optional[AsyncSession] = None) -> None:
+        """
+        Reload the catalogue from the database
+
+        Args:
+            db (Optional[AsyncSession]): Session to read with; a new one is
+                opened when omitted.
+        """
+        async with self._lock:
+            await self._load(db)
+
+    async def _load(self, db: Optional[AsyncSession] = None) -> None:
+        if db is None:
+            async with AsyncSessionLocal() as session:
+                rows = await currency_crud.list_all(session)
+        else:
+            rows = await currency_crud.list_all(db)
+        currencies = [
+            CurrencyInfo(
+                id=row.id,
+                code=row.code.upper(),
+                name=row.name,
+                symbol=row.symbol,
+                numeric_code=row.numeric_code,
+                minor_unit=row.minor_unit,
+            )
+            for row in rows
+        ]
+        self._snapshot = _Snapshot(
+            by_code=MappingProxyType({c.code: c for c in currencies}),
+            by_id=MappingProxyType({c.id: c for c in currencies}),
+            by_numeric_code=MappingProxyType({c.numeric_code: c for c in currencies}),
+        )
+
+    def _current(self) -> _Snapshot:
+        if self._snapshot is None:
+            raise RuntimeError("Currency catalogue is not loaded; await ensure_loaded() first.")
+        return self._snapshot
+
+    def by_code(self, code: str) -> Optional[CurrencyInfo]:
+        """Look up a currency by its ISO 4217 code (case-insensitive)."""
+        return self._current().by_code.get(code.strip().upper())
+
+    def by_id(self, currency_id: Optional[int]) -> Optional[CurrencyInfo]:
+        return self._current().by_id.get(currency_id) if currency_id is not None else None
+
+    def by_numeric_code(self, numeric_code: int) -> Optional[CurrencyInfo]:
+        return self._current().by_numeric_code.get(numeric_code)
+
+    def __len__(self) -> int:
+        return len(self._current().by_id)
+
+
+currency_catalogue = CurrencyCatalogue()
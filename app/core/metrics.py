@@ -0,0 +1,107 @@
+"""
+Lightweight in-process metrics.
+
+Counters, gauges and histograms live in one process-wide registry so any
+module can record a value without passing objects around::
+
+    from app.core.metrics import metrics
+
+    metrics.counter("llm.requests").inc()
+    metrics.histogram("llm.latency_seconds").observe(0.42)
+
+``metrics.snapshot()`` returns plain values, and ``log_periodically`` writes
+that snapshot to the log at a fixed interval.
+"""
+import asyncio
+import logging
+import math
+from collections import deque
+from typing import Deque, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class Histogram:
+    """Count/sum over all observations plus percentiles over the most recent ones."""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.sum = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self._recent.append(value)
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile (``q`` in 0..100) of the recent window."""
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        rank = max(1, math.ceil(q / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg": self.sum / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._counters: Dict[str, Counter] = {}
+        self._gauges: Dict[str, Gauge] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def counter(self, name: str) -> Counter:
+        return self._counters.setdefault(name, Counter())
+
+    def gauge(self, name: str) -> Gauge:
+        return self._gauges.setdefault(name, Gauge())
+
+    def histogram(self, name: str) -> Histogram:
+        return self._histograms.setdefault(name, Histogram())
+
+    def snapshot(self) -> Dict[str, object]:
+        data: Dict[str, object] = {}
+        data.update({name: c.value for name, c in self._counters.items()})
+        data.update({name: g.value for name, g in self._gauges.items()})
+        data.update({name: h.summary() for name, h in self._histograms.items()})
+        return dict(sorted(data.items()))
+
+
+metrics = MetricsRegistry()
+
+
+async def log_periodically(interval: float) -> None:
+    """Log a metrics snapshot every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        logger.info("metrics: %s", metrics.snapshot())
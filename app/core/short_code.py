@@ -0,0 +1,52 @@
+"""
+Short per-user transaction codes.
+
+Each transaction gets a per-user sequence number (``Transaction.seq``, assigned
+by a trigger from ``users.tx_seq``), shown to the user in Crockford base32:
+"00A3" instead of a 36-character UUID. Decoding is forgiving the way Crockford
+intends: case-insensitive, I/L read as 1, O as 0, hyphens ignored.
+"""
+from typing import Optional
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# Padded so listings line up; 32**4 (about a million) codes before a fifth character.
+WIDTH = 4
+# Longer input is treated as a UUID prefix (those were shown with 8+ characters).
+MAX_LENGTH = 7
+
+_DECODE = {char: value for value, char in enumerate(ALPHABET)}
+_DECODE.update({"I": 1, "L": 1, "O": 0})
+
+
+def encode(seq: int) -> str:
+    """
+    Args:
+        seq (int): Sequence number, 1 or more.
+
+    Returns:
+        str: The code, at least ``WIDTH`` characters.
+    """
+    chars = []
+    while seq:
+        seq, digit = divmod(seq, 32)
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars)).rjust(WIDTH, "0")
+
+
+def decode(code: str) -> Optional[int]:
+    """
+    Args:
+        code (str): Code as typed by the user.
+
+    Returns:
+        Optional[int]: The sequence number, or None if ``code`` is not a short code.
+    """
+    text = code.strip().upper().replace("-", "")
+    if not text or len(text) > MAX_LENGTH:
+        return None
+    seq = 0
+    for char in text:
+        if char not in _DECODE:
+            return None
+        seq = seq * 32 + _DECODE[char]
+    return seq or None
@@ -2,7 +2,8 @@
 
 from typing import Any, Generic, Type, TypeVar, Optional, List, Dict
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -20,26 +21,27 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             return obj.model_dump(exclude_unset=exclude_unset)  # type: ignore[attr-defined]
         return obj.dict(exclude_unset=exclude_unset)  # type: ignore[call-arg]
 
-    def get(self, db: Session, id: Any) -> Optional[ModelType]:
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         """Get a single record by ID."""
-        return db.query(self.model).get(id)
+        return await db.get(self.model, id)
 
-    def list(self, db: Session, skip: int = 0, limit: int = 100) -> List[ModelType]:
+    async def list(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[ModelType]:
         """List records with pagination."""
-        return db.query(self.model).offset(skip).limit(limit).all()
+        result = await db.execute(select(self.model).offset(skip).limit(limit))
+        return list(result.scalars().all())
 
-    def create(self, db: Session, obj_in: CreateSchemaType) -> ModelType:
+    async def create(self, db: AsyncSession, obj_in: CreateSchemaType) -> ModelType:
         """Create a new record."""
         obj_data = self._dump_model(obj_in)
         db_obj = self.model(**obj_data)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         return db_obj
 
-    def update(
+    async def update(
         self,
-        db: Session,
+        db: AsyncSession,
         db_obj: ModelType,
         obj_in: UpdateSchemaType | Dict[str, Any],
     ) -> ModelType:
@@ -48,16 +50,16 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         for field, value in data.items():
             setattr(db_obj, field, value)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         return db_obj
 
-    def delete(self, db: Session, id: Any) -> Optional[ModelType]:
+    async def delete(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         """Delete a record by ID."""
-        obj = db.query(self.model).get(id)
+        obj = await db.get(self.model, id)
         if not obj:
             return None
         obj.is_deleted = True
         db.add(obj)
-        db.commit()
+        await db.commit()
         return obj
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from typing import Dict, List
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models.conversation import ConversationState
+
+
+class CRUDConversationState(CRUDBase[ConversationState, BaseModel, BaseModel]):
+    async def save(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: UUID,
+        summary: str,
+        turns: List[Dict[str, str]],
+    ) -> None:
+        """
+        Insert or replace a user's conversation state in one statement
+
+        Args:
+            db (AsyncSession): Database session.
+            user_id (UUID): Owner of the conversation.
+            summary (str): Summary of older turns.
+            turns (List[Dict[str, str]]): Recent turns, oldest first.
+        """
+        now = datetime.now(timezone.utc)
+        stmt = insert(ConversationState).values(
+            user_id=user_id, summary=summary, turns=turns, created_at=now, updated_at=now,
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[ConversationState.user_id],
+            set_={"summary": stmt.excluded.summary, "turns": stmt.excluded.turns, "updated_at": now},
+        ))
+        await db.commit()
+
+
+conversation_crud = CRUDConversationState(ConversationState)
@@ -1,21 +1,26 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
 from app.models.currency import Currency
 
 
 class CRUDCurrency(CRUDBase[Currency, BaseModel, BaseModel]):
-    def get_by_code(self, db: Session, code: str) -> Optional[Currency]:
+    async def get_by_code(self, db: AsyncSession, code: str) -> Optional[Currency]:
         """Fetch a currency by its code (case-insensitive)."""
-        return (
-            db.query(Currency)
-            .filter(Currency.code == code.upper())
-            .first()
+        return await db.scalar(
+            select(Currency)
+            .where(Currency.code == code.upper())
+            .limit(1)
         )
 
+    async def list_all(self, db: AsyncSession) -> List[Currency]:
+        """Fetch the whole reference table (used to build the currency catalogue)."""
+        return list(await db.scalars(select(Currency).order_by(Currency.id)))
+
 
 currency_crud = CRUDCurrency(Currency)
 
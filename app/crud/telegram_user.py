@@ -1,25 +1,119 @@
+import uuid
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from app.models.user import TelegramUser
+from app.models.user import TelegramUser, User
 from app.schemas.telegram_user import TelegramUserCreate, TelegramUserUpdate
 from app.crud.base import CRUDBase
 
 
 class CRUDTelegramUser(CRUDBase[TelegramUser, TelegramUserCreate, TelegramUserUpdate]):
-    def get_by_telegram_id(self, db: Session, telegram_id: str) -> Optional[TelegramUser]:
+    async def get_by_telegram_id(self, db: AsyncSession, telegram_id: str) -> Optional[TelegramUser]:
         """
         Get TelegramUser by telegram_id
 
         Args:
-            db (Session): Database session.
+            db (AsyncSession): Database session.
             telegram_id (str): Telegram user ID.
 
         Returns:
-            Optional[TelegramUser]: TelegramUser object if found, otherwise None.
+            Optional[TelegramUser]: TelegramUser object (with ``user`` loaded) if found, otherwise None.
         """
-        return db.query(TelegramUser).filter(TelegramUser.telegram_id == telegram_id,
-                                             TelegramUser.is_deleted == False).first()
+        return await db.scalar(
+            select(TelegramUser)
+            .options(selectinload(TelegramUser.user))
+            .where(TelegramUser.telegram_id == telegram_id,
+                   TelegramUser.is_deleted == False)  # noqa: E712
+            .limit(1)
+        )
 
-telegram_user_crud = CRUDTelegramUser(TelegramUser)
\ No newline at end of file
+    async def get_or_create_user_id(
+        self,
+        db: AsyncSession,
+        *,
+        telegram_id: str,
+        username: Optional[str],
+        first_name: Optional[str],
+        last_name: Optional[str],
+    ) -> uuid.UUID:
+        """
+        Return the user id linked to a Telegram account, creating the user and
+        telegram user in one statement and one transaction if needed.
+
+        The statement reads the existing link and, only when there is none,
+        inserts ``users`` and ``telegram_users`` rows via data-modifying CTEs
+        (``INSERT ... ON CONFLICT (telegram_id) DO NOTHING``). If a concurrent
+        request created the link first, the orphaned user insert is rolled back
+        and the winner's user id is returned.
+
+        Args:
+            db (AsyncSession): Database session.
+            telegram_id (str): Telegram user ID.
+            username (Optional[str]): Telegram username.
+            first_name (Optional[str]): Telegram first name.
+            last_name (Optional[str]): Telegram last name.
+
+        Returns:
+            uuid.UUID: The user's ID.
+        """
+        existing = (
+            select(TelegramUser.user_id)
+            .where(TelegramUser.telegram_id == telegram_id)
+            .cte("existing")
+        )
+        new_user = (
+            insert(User)
+            .from_select(
+                ["id", "username", "role", "is_active", "is_deleted", "created_at", "updated_at"],
+                select(
+                    literal(uuid.uuid4(), User.id.type),
+                    literal(username, User.username.type),
+                    literal("user"),
+                    literal(True),
+                    literal(False),
+                    func.now(),
+                    func.now(),
+                ).where(~exists(select(existing.c.user_id))),
+            )
+            .returning(User.id)
+            .cte("new_user")
+        )
+        new_telegram_user = (
+            insert(TelegramUser)
+            .from_select(
+                ["id", "telegram_id", "user_id", "username", "first_name", "last_name",
+                 "is_deleted", "created_at", "updated_at"],
+                select(
+                    literal(uuid.uuid4(), TelegramUser.id.type),
+                    literal(telegram_id, TelegramUser.telegram_id.type),
+                    new_user.c.id,
+                    literal(username, TelegramUser.username.type),
+                    literal(first_name, TelegramUser.first_name.type),
+                    literal(last_name, TelegramUser.last_name.type),
+                    literal(False),
+                    func.now(),
+                    func.now(),
+                ),
+            )
+            .on_conflict_do_nothing(index_elements=["telegram_id"])
+            .returning(TelegramUser.user_id)
+            .cte("new_telegram_user")
+        )
+        stmt = select(new_telegram_user.c.user_id).union_all(select(existing.c.user_id))
+
+        user_id = await db.scalar(stmt)
+        if user_id is not None:
+            await db.commit()
+            return user_id
+
+        # Lost a race with a concurrent first message: drop our user row.
+        await db.rollback()
+        return await db.scalar(
+            select(TelegramUser.user_id).where(TelegramUser.telegram_id == telegram_id)
+        )
+
+telegram_user_crud = CRUDTelegramUser(TelegramUser)
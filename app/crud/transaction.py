@@ -1,19 +1,22 @@
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
 from pydantic import BaseModel
-from sqlalchemy import func, cast, String
-from sqlalchemy.orm import Session
+from sqlalchemy import func, cast, insert, select, tuple_, union_all, update, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.crud.base import CRUDBase
-from app.models.expense_tracker import Transaction
+from app.models.currency import Currency
+from app.models.expense_tracker import Transaction, TransactionDailyTotal
+from app.schemas.analytics import CategoryTotals, CurrencyTotals
 
 
 class CRUDTransaction(CRUDBase[Transaction, BaseModel, BaseModel]):
-    def create_for_user(
+    async def create_for_user(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         user_id: UUID,
         currency_id: int,
@@ -22,6 +25,7 @@ class CRUDTransaction(CRUDBase[Transaction, BaseModel, BaseModel]):
         category: Optional[str],
         type: str,
         occurred_at: datetime,
+        commit: bool = True,
     ) -> Transaction:
         transaction = Transaction(
             user_id=user_id,
@@ -33,72 +37,269 @@ class CRUDTransaction(CRUDBase[Transaction, BaseModel, BaseModel]):
             occurred_at=occurred_at,
         )
         db.add(transaction)
-        db.commit()
-        db.refresh(transaction)
+        if not commit:
+            await db.flush()
+            return transaction
+        await db.commit()
+        await db.refresh(transaction)
         return transaction
 
-    def list_recent_for_user(
+    async def create_many_for_user(
         self,
-        db: Session,
+        db: AsyncSession,
+        *,
+        user_id: UUID,
+        rows: List[Dict[str, Any]],
+        commit: bool = True,
+    ) -> int:
+        """
+        Insert many transactions with one multi-row INSERT
+
+        Args:
+            db (AsyncSession): Session to use.
+            user_id (UUID): Owner of every row.
+            rows (List[Dict[str, Any]]): Column values (currency_id, amount,
+                description, category, type, occurred_at) per transaction.
+            commit (bool): Commit afterwards; otherwise the caller commits.
+
+        Returns:
+            int: Number of rows inserted.
+        """
+        if not rows:
+            return 0
+        await db.execute(
+            insert(Transaction).values([{**row, "user_id": user_id} for row in rows])
+        )
+        if commit:
+            await db.commit()
+        return len(rows)
+
+    async def list_page_for_user(
+        self,
+        db: AsyncSession,
         *,
         user_id: UUID,
         limit: int,
-    ) -> List[Transaction]:
-        return (
-            db.query(Transaction)
-            .filter(
+        before: Optional[Tuple[datetime, UUID]] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+    ) -> Tuple[List[Transaction], bool]:
+        """
+        One page of history, keyset-paginated on ``(occurred_at, id)``
+
+        The cursor is the key of a row already shown, so every page is a
+        range scan from that key on ix_transactions_user_occurred_id_active
+        and a deep page costs the same as the first one (no OFFSET).
+
+        Args:
+            db (AsyncSession): Session to use.
+            user_id (UUID): Owner of the transactions.
+            limit (int): Page size.
+            before (Optional[Tuple[datetime, UUID]]): Return rows older than this key.
+            after (Optional[Tuple[datetime, UUID]]): Return rows newer than this key.
+
+        Returns:
+            Tuple[List[Transaction], bool]: The page, newest first, and whether
+                more rows exist beyond it in the direction paged.
+        """
+        key = tuple_(Transaction.occurred_at, Transaction.id)
+        query = select(Transaction).where(
+            Transaction.user_id == user_id,
+            ~Transaction.is_deleted,
+        )
+        if after is not None:
+            query = query.where(key > tuple_(*after)).order_by(
+                Transaction.occurred_at.asc(), Transaction.id.asc()
+            )
+        else:
+            if before is not None:
+                query = query.where(key < tuple_(*before))
+            query = query.order_by(Transaction.occurred_at.desc(), Transaction.id.desc())
+
+        # One extra row tells whether there is another page.
+        rows = list(await db.scalars(query.limit(limit + 1)))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if after is not None:
+            rows.reverse()
+        return rows, has_more
+
+    async def get_active_by_seq(self, db: AsyncSession, *, user_id: UUID, seq: int) -> Optional[Transaction]:
+        """
+        Look up a transaction by its short code number (ix_transactions_user_seq_active)
+
+        A code carries no date, so there is no occurred_at bound: on a
+        hypertable this is one index probe per chunk (about 12 a year with
+        monthly chunks) rather than a probe of a single chunk.
+        """
+        return await db.scalar(
+            select(Transaction)
+            .where(
                 Transaction.user_id == user_id,
-                Transaction.is_deleted.is_(False),
+                Transaction.seq == seq,
+                ~Transaction.is_deleted,
             )
-            .order_by(Transaction.occurred_at.desc())
-            .limit(limit)
-            .all()
         )
 
-    def find_active_by_id_prefix(
+    async def find_active_by_id_prefix(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         user_id: UUID,
         prefix: str,
     ) -> List[Transaction]:
-        return (
-            db.query(Transaction)
-            .filter(
+        """
+        Find transactions whose UUID starts with ``prefix``
+
+        The prefix is turned into the UUID range it covers, so the primary key
+        index serves the lookup instead of a LIKE over every id cast to text.
+        Like ``get_active_by_seq`` it has no occurred_at bound, so on a
+        hypertable every chunk's index is probed.
+
+        Args:
+            db (AsyncSession): Session to use.
+            user_id (UUID): Owner of the transactions.
+            prefix (str): Leading hex digits of the id (hyphens allowed).
+
+        Returns:
+            List[Transaction]: Matching active transactions (empty if ``prefix`` is not hex).
+        """
+        digits = prefix.replace("-", "").lower()
+        if not digits or len(digits) > 32 or any(char not in "0123456789abcdef" for char in digits):
+            return []
+        result = await db.scalars(
+            select(Transaction)
+            .where(
                 Transaction.user_id == user_id,
-                Transaction.is_deleted.is_(False),
-                cast(Transaction.id, String).like(f"{prefix}%"),
+                ~Transaction.is_deleted,
+                Transaction.id.between(
+                    UUID(digits.ljust(32, "0")),
+                    UUID(digits.ljust(32, "f")),
+                ),
             )
-            .all()
         )
+        return list(result.all())
 
-    def soft_delete(self, db: Session, *, tx: Transaction) -> Transaction:
-        tx.is_deleted = True
-        db.add(tx)
-        db.commit()
-        db.refresh(tx)
+    async def soft_delete(self, db: AsyncSession, *, tx: Transaction, commit: bool = True) -> Transaction:
+        # Bound on occurred_at too, so on a hypertable only the row's chunk is touched.
+        await db.execute(
+            update(Transaction)
+            .where(Transaction.id == tx.id, Transaction.occurred_at == tx.occurred_at)
+            .values(is_deleted=True)
+            .execution_options(synchronize_session=False)
+        )
+        set_committed_value(tx, "is_deleted", True)
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
         return tx
 
-    def sum_amount_for_user_and_type(
+    @staticmethod
+    def _range_totals(user_id: UUID, start: Optional[datetime], end: Optional[datetime]):
+        """
+        Subquery of (type, currency_id, category, total) rows covering ``[start, end)``
+
+        Whole days come from the daily totals; only the partial days at
+        unaligned range edges are read from raw transactions, so the cost
+        grows with the number of days, not transactions.
+        """
+        # Whole days are [first_day, last_day).
+        first_day = None
+        if start is not None:
+            first_day = start.date() if start.time() == time.min else start.date() + timedelta(days=1)
+        last_day = end.date() if end is not None else None
+
+        def raw(raw_start: Optional[datetime], raw_end: Optional[datetime]):
+            q = select(
+                Transaction.type,
+                Transaction.currency_id,
+                func.coalesce(Transaction.category, "").label("category"),
+                Transaction.amount.label("total"),
+            ).where(
+                Transaction.user_id == user_id,
+                ~Transaction.is_deleted,
+            )
+            if raw_start is not None:
+                q = q.where(Transaction.occurred_at >= raw_start)
+            if raw_end is not None:
+                q = q.where(Transaction.occurred_at < raw_end)
+            return q
+
+        parts = []
+        if first_day is not None and last_day is not None and first_day > last_day:
+            # Start and end fall inside the same day.
+            parts.append(raw(start, end))
+        else:
+            rollup = select(
+                TransactionDailyTotal.type,
+                TransactionDailyTotal.currency_id,
+                TransactionDailyTotal.category,
+                cast(TransactionDailyTotal.total, Float).label("total"),
+            ).where(TransactionDailyTotal.user_id == user_id)
+            if first_day is not None:
+                rollup = rollup.where(TransactionDailyTotal.day >= first_day)
+                if start.time() != time.min:
+                    parts.append(raw(start, datetime.combine(first_day, time.min)))
+            if last_day is not None:
+                rollup = rollup.where(TransactionDailyTotal.day < last_day)
+                if end.time() != time.min:
+                    parts.append(raw(datetime.combine(last_day, time.min), end))
+            parts.append(rollup)
+
+        return union_all(*parts).subquery() if len(parts) > 1 else parts[0].subquery()
+
+    async def analytics_for_user(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         user_id: UUID,
-        tx_type: str,
         start: Optional[datetime],
         end: Optional[datetime],
-    ) -> float:
-        q = db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == tx_type,
-            Transaction.is_deleted.is_(False),
+        by_category: bool = False,
+    ) -> List[CurrencyTotals]:
+        """
+        Income and expense per currency over ``[start, end)`` in one round trip
+
+        Args:
+            db (AsyncSession): Session to use.
+            user_id (UUID): User whose transactions are summed.
+            start (Optional[datetime]): Inclusive start (None = unbounded).
+            end (Optional[datetime]): Exclusive end (None = unbounded).
+            by_category (bool): Also break each currency down by category
+                (one GROUPING SETS query, not one query per level).
+
+        Returns:
+            List[CurrencyTotals]: One entry per currency used, by currency code.
+        """
+        totals = self._range_totals(user_id, start, end)
+        income = func.coalesce(func.sum(totals.c.total).filter(totals.c.type == "income"), 0.0)
+        expense = func.coalesce(func.sum(totals.c.total).filter(totals.c.type == "expense"), 0.0)
+        q = (
+            select(Currency.code, income, expense)
+            .select_from(totals)
+            .join(Currency, Currency.id == totals.c.currency_id)
         )
-        if start:
-            q = q.filter(Transaction.occurred_at >= start)
-        if end:
-            q = q.filter(Transaction.occurred_at < end)
-        return q.scalar() or 0.0
+        if by_category:
+            q = q.add_columns(
+                totals.c.category,
+                func.grouping(totals.c.category).label("all_categories"),
+            ).group_by(func.grouping_sets(tuple_(Currency.code), tuple_(Currency.code, totals.c.category)))
+        else:
+            q = q.group_by(Currency.code)
 
+        result: Dict[str, CurrencyTotals] = {}
+        for row in (await db.execute(q.order_by(Currency.code))).all():
+            code, income_total, expense_total = row[:3]
+            if by_category and not row.all_categories:
+                result.setdefault(code, CurrencyTotals(currency_code=code)).categories.append(
+                    CategoryTotals(category=row.category or None, income=income_total, expense=expense_total)
+                )
+                continue
+            entry = result.setdefault(code, CurrencyTotals(currency_code=code))
+            entry.income, entry.expense = income_total, expense_total
+        for entry in result.values():
+            entry.categories.sort(key=lambda c: (-c.expense, -c.income, c.category or ""))
+        return list(result.values())
 
 transaction_crud = CRUDTransaction(Transaction)
 
@@ -1,6 +1,7 @@
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
@@ -8,9 +9,9 @@ from app.crud.base import CRUDBase
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
-    def create(
+    async def create(
         self,
-        db: Session,
+        db: AsyncSession,
         obj_in: UserCreate,
         hashed_password: Optional[str] = None,
     ) -> User:
@@ -18,7 +19,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         Create a new user.
 
         Args:
-            db (Session): Database session.
+            db (AsyncSession): Database session.
             obj_in (UserCreate): User create schema.
             hashed_password (Optional[str]): Hashed password.
 
@@ -33,37 +34,37 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
         db_obj = self.model(**obj_data)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         return db_obj
 
-    def get_active(self, db: Session, user_id) -> Optional[User]:
+    async def get_active(self, db: AsyncSession, user_id) -> Optional[User]:
         """Get a non-deleted user by ID."""
-        return (
-            db.query(User)
-            .filter(
+        return await db.scalar(
+            select(User)
+            .where(
                 User.id == user_id,
                 User.is_deleted == False,  # noqa: E712
             )
-            .first()
+            .limit(1)
         )
 
-    def set_default_currency(
+    async def set_default_currency(
         self,
-        db: Session,
+        db: AsyncSession,
         user_id,
         currency_id: int,
     ) -> Optional[User]:
         """Set the default currency for a user and persist the change."""
-        user = self.get_active(db, user_id)
+        user = await self.get_active(db, user_id)
         if not user:
             return None
 
         user.currency_id = currency_id
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
 
 
-user_crud = CRUDUser(User)
\ No newline at end of file
+user_crud = CRUDUser(User)
@@ -1,8 +1,10 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
+# Sync engine: used by Alembic and the data migration scripts.
 engine = create_engine(settings.SQLALCHEMY_DATABASE_URI,
                        pool_pre_ping=True,
                        pool_size=settings.DB_POOL_SIZE,
@@ -11,4 +13,17 @@ engine = create_engine(settings.SQLALCHEMY_DATABASE_URI,
 
 SessionLocal = sessionmaker(autocommit=False,
                             autoflush=False,
-                            bind=engine)
\ No newline at end of file
+                            bind=engine)
+
+# Async engine: used by the bot so database round trips never block the event loop.
+async_engine = create_async_engine(settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+                                   pool_pre_ping=True,
+                                   pool_size=settings.DB_POOL_SIZE,
+                                   max_overflow=settings.DB_MAX_OVERFLOW,
+                                   pool_timeout=settings.DB_POOL_TIMEOUT)
+
+# expire_on_commit=False: attributes stay readable after commit without an
+# implicit (and, under asyncio, illegal) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(autoflush=False,
+                                       expire_on_commit=False,
+                                       bind=async_engine)
@@ -1,5 +1,6 @@
 from app.models.base import Base
 from app.models.user import User, TelegramUser
 from app.models.currency import Currency
-from app.models.expense_tracker import Transaction
+from app.models.expense_tracker import Transaction, TransactionDailyTotal
 
+from app.models.conversation import ConversationState
@@ -0,0 +1,14 @@
+from sqlalchemy import UUID, Column, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.models.base import Base, TimestampMixin
+
+
+class ConversationState(Base, TimestampMixin):
+    """Persisted conversation memory of one user (see app/nl_router/memory.py)."""
+    __tablename__ = 'conversation_states'
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), primary_key=True)
+    summary = Column(Text, nullable=False, default='')
+    # Recent turns, oldest first: [{"role": "user" | "assistant", "content": "..."}]
+    turns = Column(JSONB, nullable=False, default=list)
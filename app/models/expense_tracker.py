@@ -1,5 +1,7 @@
 import uuid
-from sqlalchemy import Column, String, Float, ForeignKey, DateTime, Integer, Boolean
+from sqlalchemy import (
+    BigInteger, Column, String, Float, ForeignKey, DateTime, Date, Integer, Boolean, FetchedValue, Index, Numeric, text,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -8,6 +10,27 @@ from app.models.base import Base, TimestampMixin
 
 class Transaction(Base, TimestampMixin):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Partial: soft-deleted rows are never read back, so they stay out of the indexes.
+        # Recent-first listing, keyset-paginated on (occurred_at, id), and lookups by user.
+        Index(
+            "ix_transactions_user_occurred_id_active",
+            "user_id",
+            text("occurred_at DESC"),
+            text("id DESC"),
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        # Short-code lookups. Unique on plain Postgres only: on a hypertable a
+        # unique index must include occurred_at, so the migration builds it
+        # non-unique there and the users.tx_seq counter keeps seq unique.
+        Index(
+            "ix_transactions_user_seq_active",
+            "user_id",
+            "seq",
+            unique=True,
+            postgresql_where=text("NOT is_deleted"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -16,8 +39,32 @@ class Transaction(Base, TimestampMixin):
     description = Column(String(255), nullable=False)
     category = Column(String(50), nullable=True)
     type = Column(String(50), nullable=False)
+    # Partitioning column when transactions is a TimescaleDB hypertable (the
+    # database key is then (id, occurred_at)); filtering on it skips chunks.
     occurred_at = Column(DateTime, nullable=False)
     is_deleted = Column(Boolean, nullable=False, default=False)
+    # Per-user number behind the short code (app.core.short_code), assigned by
+    # the transactions_assign_seq trigger on insert.
+    seq = Column(BigInteger, nullable=False, server_default=FetchedValue())
 
     user = relationship("User", back_populates="transactions")
     currency = relationship("Currency")
+
+
+class TransactionDailyTotal(Base):
+    """
+    Per-user daily sums of active transactions, kept exact by a trigger on
+    ``transactions`` (see migration d5e9a3c4b1f0) so range analytics read one
+    row per day instead of every transaction.
+    """
+    __tablename__ = "transaction_daily_totals"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    type = Column(String(50), primary_key=True)
+    # '' for transactions without a category (key columns cannot be NULL).
+    category = Column(String(50), primary_key=True)
+    currency_id = Column(Integer, ForeignKey("currency.id"), primary_key=True)
+    # Exact decimal, so adding and subtracting amounts leaves no float residue.
+    total = Column(Numeric, nullable=False)
+    count = Column(Integer, nullable=False)
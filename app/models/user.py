@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import UUID, Column, String, Boolean, ForeignKey, Integer
+from sqlalchemy import UUID, BigInteger, Column, String, Boolean, ForeignKey, Integer
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base, TimestampMixin
@@ -17,6 +17,8 @@ class User(Base, TimestampMixin):
     is_active = Column(Boolean, default=True)
     is_deleted = Column(Boolean, default=False)
     currency_id = Column(Integer, ForeignKey('currency.id'), nullable=True)
+    # Last transaction seq handed out to this user (see Transaction.seq).
+    tx_seq = Column(BigInteger, nullable=False, server_default='0')
 
     currency = relationship("Currency")
     transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
@@ -0,0 +1,269 @@
+"""
+Routing across several OpenAI-compatible endpoints.
+
+``EndpointPool.call`` sends a request to the endpoint with the lowest latency
+EWMA. If no answer has arrived once the pool's recent latency percentile has
+passed, the same request is hedged to the next-best endpoint and the first
+answer wins. Streaming requests only wait for the stream to open, so their
+latencies are tracked apart from those of whole completions. Endpoints that keep failing are skipped by a circuit breaker for a
+while, and a failed request fails over to the next endpoint.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Set, TypeVar
+
+import openai
+
+from app.core.metrics import Histogram, metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class NoEndpointAvailableError(Exception):
+    """Raised when every endpoint's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures; after
+    ``reset_timeout`` seconds one trial request is let through (half-open),
+    and its outcome closes or re-opens the breaker.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the breaker.
+        reset_timeout (float): Seconds the breaker stays open.
+    """
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self._trial_running or time.monotonic() - self.opened_at < self.reset_timeout:
+            return False
+        self._trial_running = True
+        return True
+
+    def release_trial(self) -> None:
+        """Forget a trial request that was cancelled before it finished."""
+        self._trial_running = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_running = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+@dataclass
+class Endpoint:
+    """One model server: its client, latency estimate and circuit breaker."""
+    name: str
+    model_name: str
+    client: openai.AsyncOpenAI
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    ewma: Optional[float] = None
+    stream_ewma: Optional[float] = None
+
+    def latency_estimate(self, streaming: bool = False) -> Optional[float]:
+        return self.stream_ewma if streaming else self.ewma
+
+    def observe_latency(self, seconds: float, alpha: float, streaming: bool = False) -> None:
+        previous = self.latency_estimate(streaming)
+        ewma = seconds if previous is None else alpha * seconds + (1 - alpha) * previous
+        if streaming:
+            self.stream_ewma = ewma
+        else:
+            self.ewma = ewma
+
+
+def is_endpoint_failure(error: BaseException) -> bool:
+    """
+    True if ``error`` says the endpoint is unhealthy (connection problems,
+    timeouts, 429 and 5xx), as opposed to a bad request that would fail anywhere.
+    """
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (openai.APIConnectionError, asyncio.TimeoutError, OSError))
+
+
+class EndpointPool:
+    """
+    Latency-aware, hedging, failing-over pool of endpoints.
+
+    Args:
+        endpoints (List[Endpoint]): Endpoints to route between.
+        hedge_percentile (float): Hedge once a request is slower than this
+            percentile of recent latencies (0 = never hedge).
+        hedge_default_delay (float): Hedge delay until enough latencies are known.
+        ewma_alpha (float): Weight of the newest latency in each endpoint's EWMA.
+        min_samples (int): Latencies needed before the percentile is trusted.
+    """
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        hedge_percentile: float = 95.0,
+        hedge_default_delay: float = 2.0,
+        ewma_alpha: float = 0.3,
+        min_samples: int = 20,
+    ):
+        if not endpoints:
+            raise ValueError("at least one endpoint is required")
+        self.endpoints = endpoints
+        self.hedge_percentile = hedge_percentile
+        self.hedge_default_delay = hedge_default_delay
+        self.ewma_alpha = ewma_alpha
+        self.min_samples = min_samples
+        self.latency = Histogram(window=256)
+        # Time to open a stream; a fraction of a whole completion's latency.
+        self.stream_latency = Histogram(window=256)
+        self._cleanups: Set[asyncio.Future] = set()
+
+    def hedge_delay(self, streaming: bool = False) -> Optional[float]:
+        if not self.hedge_percentile or len(self.endpoints) < 2:
+            return None
+        latency = self.stream_latency if streaming else self.latency
+        if latency.count < self.min_samples:
+            return self.hedge_default_delay
+        return latency.percentile(self.hedge_percentile)
+
+    def _next_endpoint(self, tried: Set[int], streaming: bool = False) -> Optional[Endpoint]:
+        def estimate(endpoint: Endpoint) -> float:
+            # Endpoints without a latency estimate sort first so they get measured.
+            ewma = endpoint.latency_estimate(streaming)
+            return -1.0 if ewma is None else ewma
+
+        # Tried endpoints are tracked by identity: names need not be unique.
+        candidates = sorted((e for e in self.endpoints if id(e) not in tried), key=estimate)
+        for endpoint in candidates:
+            if endpoint.breaker.allow():
+                return endpoint
+        return None
+
+    async def _attempt(
+        self, endpoint: Endpoint, request: Callable[[Endpoint], Awaitable[T]], streaming: bool,
+    ) -> T:
+        started = time.monotonic()
+        try:
+            result = await request(endpoint)
+        except asyncio.CancelledError:
+            # Lost a hedge race; says nothing about the endpoint's health.
+            endpoint.breaker.release_trial()
+            raise
+        except Exception as e:
+            if is_endpoint_failure(e):
+                endpoint.breaker.record_failure()
+                metrics.counter(f"llm.endpoint.{endpoint.name}.failures").inc()
+                if endpoint.breaker.is_open:
+                    logger.warning("LLM endpoint %s circuit open: %s", endpoint.name, e)
+            else:
+                endpoint.breaker.record_success()
+            raise
+        elapsed = time.monotonic() - started
+        endpoint.breaker.record_success()
+        endpoint.observe_latency(elapsed, self.ewma_alpha, streaming)
+        if streaming:
+            self.stream_latency.observe(elapsed)
+            metrics.histogram(f"llm.endpoint.{endpoint.name}.stream_open_seconds").observe(elapsed)
+        else:
+            self.latency.observe(elapsed)
+            metrics.histogram(f"llm.endpoint.{endpoint.name}.latency_seconds").observe(elapsed)
+        return result
+
+    async def call(
+        self,
+        request: Callable[[Endpoint], Awaitable[T]],
+        discard: Optional[Callable[[T], Awaitable[None]]] = None,
+        streaming: bool = False,
+    ) -> T:
+        """
+        Run ``request`` against the pool
+
+        Args:
+            request (Callable[[Endpoint], Awaitable[T]]): Sends the request to
+                the given endpoint.
+            discard (Optional[Callable[[T], Awaitable[None]]]): Releases a
+                result that lost a hedge race (e.g. closes a stream).
+            streaming (bool): ``request`` returns once a stream is open, not
+                once the completion is done; its latency is kept separately.
+
+        Returns:
+            T: The first successful result.
+
+        Raises:
+            NoEndpointAvailableError: If every circuit breaker is open.
+            Exception: The last error, if every endpoint tried failed or the
+                error was not an endpoint failure.
+        """
+        tried: Set[int] = set()
+        pending: Set["asyncio.Task[T]"] = set()
+        last_error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            endpoint = self._next_endpoint(tried, streaming)
+            if endpoint is None:
+                return False
+            tried.add(id(endpoint))
+            pending.add(asyncio.create_task(self._attempt(endpoint, request, streaming)))
+            return True
+
+        if not launch():
+            raise NoEndpointAvailableError("all LLM endpoints are unavailable")
+        try:
+            hedged = False
+            while pending:
+                timeout = None if hedged else self.hedge_delay(streaming)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Slower than usual: race a second endpoint.
+                    hedged = True
+                    if launch():
+                        metrics.counter("llm.hedged_requests").inc()
+                    continue
+                pending -= done
+                results = [task.result() for task in done if task.exception() is None]
+                if results:
+                    for extra in results[1:]:
+                        if discard is not None:
+                            await discard(extra)
+                    return results[0]
+                for task in done:
+                    if not is_endpoint_failure(task.exception()):
+                        raise task.exception()
+                    last_error = task.exception()
+                if not pending and launch():
+                    metrics.counter("llm.failovers").inc()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending and discard is not None:
+                # A hedge may finish before it sees the cancellation.
+                cleanup = asyncio.ensure_future(self._discard_late(pending, discard))
+                self._cleanups.add(cleanup)
+                cleanup.add_done_callback(self._cleanups.discard)
+
+    @staticmethod
+    async def _discard_late(tasks: Set["asyncio.Task[T]"], discard: Callable[[T], Awaitable[None]]) -> None:
+        for task in asyncio.as_completed(tasks):
+            try:
+                await discard(await task)
+            except (asyncio.CancelledError, Exception):
+                pass
@@ -0,0 +1,156 @@
+"""
+Rule-based parser for one-line expense/income messages.
+
+Most messages look like "spent 15 on lunch", "coffee 3.5 EUR" or
+"salary 3000". These are parsed locally into the same ``parsed_call`` dict
+the models produce, so ``FunctionRouter`` can record them without an LLM round
+trip. A pasted list with one such item per line becomes a single
+``add_transactions`` call. Anything the grammar does not match exactly returns
+None and goes to the model instead; this parser prefers missing a message over
+misreading it.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+from app.bot.controller.expense.transaction_controller import TransactionCategory, TransactionType
+from app.nl_router.intent import DELETE_WORDS
+from app.nl_router.tools.transactions import MAX_LINE_ITEMS
+
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "₹": "INR", "¥": "JPY"}
+
+_AMOUNT = r"(?P<amount>\d{1,9}(?:[.,]\d{1,2})?)"
+# Currency as a symbol, or a code written in capitals ("EUR", not "eur").
+_CURRENCY = r"(?P<currency>[$€£₹¥]|(?-i:[A-Z]{3}))"
+_MONEY = rf"(?:{_CURRENCY}\s?{_AMOUNT}|{_AMOUNT.replace('amount', 'amount2')}(?:\s?{_CURRENCY.replace('currency', 'currency2')})?)"
+_DESCRIPTION = r"(?P<description>[^\W\d_][^\W\d_'&\-]*(?:[\s'&\-]+[^\W\d_]+){0,3})"
+
+# lunch 15 / coffee 3.5 EUR / taxi $20. Without a verb "page 2" or "make that
+# 20" look the same, so this form also needs a currency or a known expense word.
+_BARE_PATTERN = re.compile(rf"^{_DESCRIPTION}\s+{_MONEY}$", re.I)
+_EXPENSE_PATTERNS = [
+    # spent 15 on lunch / paid $20 for taxi
+    re.compile(rf"^(?:spent|spend|paid|pay)\s+{_MONEY}\s+(?:on|for)\s+{_DESCRIPTION}$", re.I),
+    _BARE_PATTERN,
+]
+_INCOME_PATTERNS = [
+    # earned 500 from freelancing / received 100 for birthday
+    re.compile(rf"^(?:earned|received|got)\s+{_MONEY}\s+(?:from|for)\s+{_DESCRIPTION}$", re.I),
+]
+
+INCOME_WORDS = {"salary", "paycheck", "wage", "wages", "bonus", "income", "refund", "freelance", "freelancing"}
+
+CATEGORY_KEYWORDS = {
+    TransactionCategory.FOOD: {
+        "breakfast", "lunch", "dinner", "brunch", "coffee", "tea", "snack", "snacks", "food",
+        "groceries", "grocery", "restaurant", "pizza", "burger", "drinks", "meal",
+    },
+    TransactionCategory.TRANSPORT: {
+        "bus", "taxi", "uber", "cab", "train", "metro", "subway", "fuel", "petrol", "gas",
+        "parking", "flight", "tram", "transport",
+    },
+    TransactionCategory.SHOPPING: {
+        "clothes", "shoes", "shopping", "shirt", "jacket", "gift", "electronics", "books",
+    },
+    TransactionCategory.SALARY: {"salary", "paycheck", "wage", "wages", "bonus"},
+}
+
+# Things people buy that no category above covers; enough for the bare form.
+EXPENSE_WORDS = {
+    "rent", "bills", "bill", "electricity", "water", "internet", "phone", "gym", "movie", "movies",
+    "cinema", "haircut", "medicine", "pharmacy", "doctor", "netflix", "subscription", "insurance",
+}
+
+_KNOWN_WORDS = set().union(*CATEGORY_KEYWORDS.values(), INCOME_WORDS, EXPENSE_WORDS)
+
+# Pronouns and function words: "change it to 20" refers to an earlier message
+# and "call mom at 5" is not a purchase. A description never needs them.
+_FUNCTION_WORDS = {
+    "i", "me", "my", "you", "it", "that", "this", "these", "those", "am", "is", "are", "was",
+    "to", "at", "and", "plus", "or", "make", "change",
+}
+
+# Words that turn a matching line into a question or command for the model.
+_STOP_WORDS = {
+    "how", "what", "when", "show", "list", "total", "last", "this",
+    "month", "week", "today", "yesterday", "analytics", "my", "top", "recent",
+    "transactions", "expenses", "spent", "spend", "paid", "earned", "received", "got",
+} | DELETE_WORDS
+
+
+def _category_for(description: str) -> str:
+    words = set(description.lower().replace("-", " ").split())
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        if words & keywords:
+            return category
+    return TransactionCategory.OTHER
+
+
+def parse_fast_path(message: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a simple expense/income line, or a list of them, without the LLM
+
+    Args:
+        message (str): The user's message.
+
+    Returns:
+        Optional[Dict[str, Any]]: ``{"function": ..., "arguments": {...}}`` for
+            ``FunctionRouter``, or None if the message is not confidently understood.
+    """
+    lines = [line for line in message.splitlines() if line.strip()]
+    if len(lines) > 1:
+        return _parse_lines(lines)
+    return _parse_line(message)
+
+
+def _parse_lines(lines: List[str]) -> Optional[Dict[str, Any]]:
+    """Every line must parse, otherwise the whole message goes to the model."""
+    if len(lines) > MAX_LINE_ITEMS:
+        return None
+    items = []
+    for line in lines:
+        parsed_call = _parse_line(line.strip().lstrip("-*•").strip())
+        if parsed_call is None:
+            return None
+        item_type = TransactionType.INCOME if parsed_call["function"] == "add_income" else TransactionType.EXPENSE
+        items.append({**parsed_call["arguments"], "type": item_type.value})
+    return {"function": "add_transactions", "arguments": {"items": items}}
+
+
+def _parse_line(message: str) -> Optional[Dict[str, Any]]:
+    text = " ".join(message.strip().rstrip(".!").split())
+    if not text or len(text) > 80:
+        return None
+
+    for function, patterns in (("add_expense", _EXPENSE_PATTERNS), ("add_income", _INCOME_PATTERNS)):
+        for pattern in patterns:
+            match = pattern.match(text)
+            if match:
+                break
+        else:
+            continue
+
+        groups = match.groupdict()
+        description = groups["description"].strip()
+        words = set(description.lower().replace("-", " ").split())
+        if words & (_STOP_WORDS | _FUNCTION_WORDS):
+            return None
+        currency = groups["currency"] or groups["currency2"]
+        if pattern is _BARE_PATTERN and not currency and not words & _KNOWN_WORDS:
+            return None
+        if function == "add_expense" and words & INCOME_WORDS:
+            function = "add_income"
+
+        amount = float((groups["amount"] or groups["amount2"]).replace(",", "."))
+        if amount <= 0:
+            return None
+
+        arguments: Dict[str, Any] = {
+            "amount": amount,
+            "description": description,
+            "category": _category_for(description),
+        }
+        if currency:
+            arguments["currency_code"] = CURRENCY_SYMBOLS.get(currency, currency)
+        return {"function": function, "arguments": arguments}
+
+    return None
@@ -0,0 +1,27 @@
+import httpx
+from openai import DefaultAsyncHttpxClient
+
+from app.core.config import settings
+
+
+def build_llm_http_client() -> httpx.AsyncClient:
+    """
+    Build the keep-alive HTTP pool shared by all LLM calls in this process.
+
+    Reusing pooled connections skips the TCP and TLS handshakes on every
+    message; the single SSL context means the CA bundle is loaded once and
+    every connection in the pool shares the same TLS configuration.
+
+    Returns:
+        httpx.AsyncClient: Client to pass to the model SDKs. Close it with
+        ``await client.aclose()`` on shutdown.
+    """
+    return DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(settings.LLM_HTTP_TIMEOUT, connect=10.0),
+        verify=httpx.create_ssl_context(),
+    )
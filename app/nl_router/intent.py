@@ -0,0 +1,102 @@
+"""
+Keyword intent classifier that decides which tool schemas go to the model.
+
+Every schema attached to a request is prompt tokens the model has to read
+before it can answer, so only the tools a message could plausibly need are
+sent, and none for small talk. When in doubt a group is included: a missing
+tool costs a wrong answer, an extra one only a few tokens. A message that
+matches no group and is not plainly small talk ("groceries were forty") gets
+every tool, and a follow-up ("EUR", "yes please") is classified together with
+the user's previous turns.
+"""
+import re
+from typing import Any, Dict, List, Optional, Set
+
+from app.nl_router.tools.registry import registry
+
+_RECORD_TOOLS = ["add_expense", "add_income", "add_transactions"]
+
+# Verbs that ask to delete a transaction. The fast path treats them as stop
+# words so "undo 3" is never recorded as an expense.
+DELETE_WORDS = {"delete", "remove", "undo", "cancel", "erase"}
+
+_INTENT_PATTERNS = {
+    "record": re.compile(
+        r"\d|\b(spen[dt]|paid|pay|bought|buy|cost|earn(ed)?|received?|got|salary|income|"
+        r"bonus|refund|dollars?|euros?|pounds?|rupees?|bucks|add|log|record)\b"
+    ),
+    "analytics": re.compile(
+        r"\b(how much|total|sum|summary|summar(y|ise|ize)|analytics|report|balance|overview|"
+        r"spending|breakdown|this (month|week)|last (month|week)|today)\b"
+    ),
+    "list": re.compile(r"\b(list|show|history|recent|latest|transactions?|entries|what did i)\b"),
+    "delete": re.compile(rf"\b({'|'.join(sorted(DELETE_WORDS))})\b"),
+}
+
+_INTENT_TOOLS = {
+    "record": _RECORD_TOOLS,
+    "analytics": ["get_analytics"],
+    "list": ["list_transactions"],
+    # Deleting usually needs an ID from the list first.
+    "delete": ["delete_transaction", "list_transactions"],
+}
+
+# Whole messages that need no tool: greetings, thanks, goodbyes.
+_SMALL_TALK = re.compile(
+    r"^(?:(?:hi|hello|hey|yo|thanks|thank you|thx|cheers|bye|goodbye|good (?:morning|afternoon|evening|night)|"
+    r"how are you|how are you doing|what's up|nice|great|cool|ok|okay)(?: there| so much| again| bot)?"
+    r"[\s,.!?]*)+$"
+)
+
+# User turns of the history read along with a follow-up.
+_HISTORY_TURNS = 2
+
+
+def classify_intents(message: str) -> List[str]:
+    """Names of the intents a message expresses on its own; empty if none is recognized."""
+    text = message.casefold()
+    return [intent for intent, pattern in _INTENT_PATTERNS.items() if pattern.search(text)]
+
+
+def is_small_talk(message: str) -> bool:
+    """True only for messages that are plainly greetings, thanks and the like."""
+    return bool(_SMALL_TALK.match(message.casefold().strip()))
+
+
+def select_tool_names(
+    message: str, history: Optional[List[Dict[str, str]]] = None
+) -> Optional[Set[str]]:
+    """
+    Names of the tools a message may need
+
+    Args:
+        message (str): The user's message.
+        history (Optional[List[Dict[str, str]]]): Earlier turns; the last user
+            turns are classified along with the message.
+
+    Returns:
+        Optional[Set[str]]: The tools to send; empty for small talk and None
+            (every tool) when nothing is recognized.
+    """
+    if is_small_talk(message):
+        return set()
+    recent = [turn["content"] for turn in history or [] if turn.get("role") == "user"][-_HISTORY_TURNS:]
+    intents = classify_intents("\n".join([*recent, message]))
+    if not intents:
+        return None
+    return {name for intent in intents for name in _INTENT_TOOLS[intent]}
+
+
+def select_tools(message: str, history: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, Any]]:
+    """
+    Pick the tool schemas to attach to a model request
+
+    Args:
+        message (str): The user's message.
+        history (Optional[List[Dict[str, str]]]): Earlier turns of the conversation.
+
+    Returns:
+        List[Dict[str, Any]]: Subset of ``STD_TOOLS`` in their original order;
+            empty for small talk.
+    """
+    return registry.openai_tools(select_tool_names(message, history))
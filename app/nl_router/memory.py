@@ -0,0 +1,154 @@
+"""
+Per-user conversation memory for follow-up messages.
+
+Each user keeps a ring buffer of recent turns plus a short summary of older
+ones. Whenever the turns exceed the token budget the oldest are rolled into
+the summary, which is itself capped, so the prompt and the memory held per
+user stay bounded however long a conversation runs. The summary is extractive
+(clipped "role: text" lines), which costs no extra model call.
+
+Users live in an LRU cache, so idle conversations are dropped from memory; with
+persistence enabled they are written to ``conversation_states`` and loaded
+again on the next message.
+"""
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List
+from uuid import UUID
+
+from app.core.cache import TTLCache
+from app.core.metrics import metrics
+from app.crud.conversation import conversation_crud
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+Turn = Dict[str, str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token plus per-message overhead)."""
+    return len(text) // 4 + 4
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+@dataclass
+class Conversation:
+    turns: Deque[Turn]
+    summary: str = ""
+    tokens: int = 0
+
+
+class ConversationMemory:
+    """
+    Bounded conversation store.
+
+    Args:
+        token_budget (int): Max estimated tokens of recent turns sent with a message.
+        max_turns (int): Max turns (user and assistant messages) kept per user.
+        summary_tokens (int): Max estimated tokens of the rolled-up summary.
+        maxsize (int): Max users held in memory.
+        ttl (float): Seconds an idle conversation stays in memory.
+        persist (bool): Load and save conversations in Postgres.
+    """
+    def __init__(
+        self,
+        token_budget: int = 1000,
+        max_turns: int = 20,
+        summary_tokens: int = 200,
+        maxsize: int = 10000,
+        ttl: float = 3600.0,
+        persist: bool = False,
+    ):
+        self.token_budget = token_budget
+        self.max_turns = max_turns
+        self.summary_tokens = summary_tokens
+        self.persist = persist
+        # No single turn may take more than half the budget.
+        self._turn_chars = max(40, token_budget * 2)
+        self._conversations: TTLCache[str, Conversation] = TTLCache(maxsize, ttl)
+
+    async def history(self, user_id: str) -> List[Turn]:
+        """
+        Messages to put between the system prompt and the new user message
+
+        Args:
+            user_id (str): ID of the user.
+
+        Returns:
+            List[Turn]: The summary (as a system message) followed by recent turns.
+        """
+        conversation = await self._get(user_id)
+        messages: List[Turn] = []
+        if conversation.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{conversation.summary}",
+            })
+        messages.extend(dict(turn) for turn in conversation.turns)
+        return messages
+
+    async def append(self, user_id: str, user_text: str, assistant_text: str) -> None:
+        """Record one exchange and roll old turns into the summary as needed."""
+        conversation = await self._get(user_id)
+        for role, text in (("user", user_text), ("assistant", assistant_text)):
+            if len(conversation.turns) == self.max_turns:
+                self._roll(conversation)
+            turn = {"role": role, "content": _clip(text, self._turn_chars)}
+            conversation.turns.append(turn)
+            conversation.tokens += estimate_tokens(turn["content"])
+        while conversation.tokens > self.token_budget and conversation.turns:
+            self._roll(conversation)
+        metrics.histogram("nlu.memory.tokens").observe(conversation.tokens)
+        # Re-set to restart the idle timer.
+        self._conversations.set(str(user_id), conversation)
+
+        if self.persist:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await conversation_crud.save(
+                        db,
+                        user_id=UUID(str(user_id)),
+                        summary=conversation.summary,
+                        turns=list(conversation.turns),
+                    )
+            except Exception as e:
+                # Memory is a convenience; never fail the reply over it.
+                logger.warning("Could not persist conversation of %s: %s", user_id, e)
+
+    def forget(self, user_id: str) -> None:
+        self._conversations.pop(str(user_id))
+
+    def _roll(self, conversation: Conversation) -> None:
+        turn = conversation.turns.popleft()
+        conversation.tokens -= estimate_tokens(turn["content"])
+        lines = conversation.summary.splitlines()
+        lines.append(f"{turn['role']}: {_clip(turn['content'], 160)}")
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > self.summary_tokens:
+            lines.pop(0)
+        conversation.summary = _clip("\n".join(lines), self.summary_tokens * 4)
+
+    async def _get(self, user_id: str) -> Conversation:
+        key = str(user_id)
+        conversation = self._conversations.get(key)
+        if conversation is not None:
+            return conversation
+
+        conversation = Conversation(turns=deque(maxlen=self.max_turns))
+        if self.persist:
+            try:
+                async with AsyncSessionLocal() as db:
+                    state = await conversation_crud.get(db, UUID(key))
+                if state is not None:
+                    conversation.summary = state.summary
+                    for turn in state.turns[-self.max_turns:]:
+                        conversation.turns.append(turn)
+                        conversation.tokens += estimate_tokens(turn["content"])
+            except Exception as e:
+                logger.warning("Could not load conversation of %s: %s", user_id, e)
+        self._conversations.set(key, conversation)
+        return conversation
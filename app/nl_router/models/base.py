@@ -1,8 +1,60 @@
-
+import logging
 from abc import ABC, abstractmethod
-from typing import Any
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant."
+
+
+def load_system_prompt() -> str:
+    prompt_path = Path(__file__).resolve().parent.parent / "prompts" / "system.md"
+    try:
+        return prompt_path.read_text().strip()
+    except OSError as e:
+        logger.warning("Could not load system prompt from %s: %s. Using default.", prompt_path, e)
+        return DEFAULT_SYSTEM_PROMPT
+
+
+@dataclass
+class ModelResponse:
+    """
+    What the model answered: plain text, tool calls, or both.
+
+    Each tool call is a ``{"function": name, "arguments": {...}}`` dict as
+    consumed by ``FunctionRouter.call_function``.
+    """
+    content: Optional[str] = None
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+
 
 class BaseModel(ABC):
     @abstractmethod
-    async def parse_user_message(self, message: str, user_id: str) -> Any:
+    async def get_response(
+        self, message: str, history: Optional[List[Dict[str, str]]] = None
+    ) -> ModelResponse:
+        """
+        Args:
+            message (str): The user's message.
+            history (Optional[List[Dict[str, str]]]): Earlier conversation as
+                ``{"role": ..., "content": ...}`` messages, oldest first.
+        """
+        pass
+
+    async def stream_response(
+        self,
+        message: str,
+        on_text: Callable[[str], Awaitable[None]],
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> ModelResponse:
+        """
+        Like ``get_response``, but calls ``on_text`` with the text so far as it
+        is generated. Models without streaming support answer in one piece.
+        """
+        return await self.get_response(message, history)
+
+    async def aclose(self) -> None:
+        """Release network resources held by the model client."""
         pass
@@ -1,16 +1,85 @@
+import logging
+from typing import Any, Dict, List, Optional
 
-from typing import Any
+import httpx
 from google import genai
 from google.genai import types
 from app.core.config import settings
-from app.nl_router.models.base import BaseModel
-from app.nl_router.tools.gen_ai import get_weather_tool
-from app.nl_router.router import FunctionRouter
+from app.core.metrics import metrics
+from app.nl_router.intent import select_tool_names
+from app.nl_router.models.base import BaseModel, ModelResponse, load_system_prompt
+from app.nl_router.tools.gen_ai import genai_tools
+
+logger = logging.getLogger(__name__)
+
+# Gemini calls the assistant side of a conversation "model".
+_ROLES = {"user": "user", "assistant": "model"}
+
 
 class GenAIModel(BaseModel):
-    def __init__(self):
-        self.client = genai.Client(api_key=settings.GEN_AI_API_KEY)
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        self.client = genai.Client(
+            api_key=settings.GEN_AI_API_KEY,
+            http_options=types.HttpOptions(httpx_async_client=http_client),
+        )
         self.model_name = settings.GEN_AI_MODEL_NAME
+        self._system_prompt = load_system_prompt()
+
+    async def aclose(self) -> None:
+        await self.client.aio.aclose()
+
+    def _config(self, message: str, history: List[Dict[str, str]]) -> types.GenerateContentConfig:
+        # Gemini takes system text only as the system instruction, so the
+        # conversation summary is appended there.
+        system = [self._system_prompt]
+        system.extend(turn["content"] for turn in history if turn["role"] == "system")
+        tools = genai_tools(select_tool_names(message, history) if settings.NLU_TOOL_SELECTION else None)
+        metrics.histogram("nlu.tools_per_request").observe(
+            sum(len(tool.function_declarations) for tool in tools)
+        )
+        return types.GenerateContentConfig(
+            system_instruction="\n\n".join(system),
+            tools=tools or None,
+            # The router executes the calls; the SDK must not call anything itself.
+            automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
+        )
+
+    @staticmethod
+    def _contents(message: str, history: List[Dict[str, str]]) -> List[types.Content]:
+        contents = [
+            types.Content(role=_ROLES[turn["role"]], parts=[types.Part.from_text(text=turn["content"])])
+            for turn in history
+            if turn["role"] in _ROLES
+        ]
+        contents.append(types.Content(role="user", parts=[types.Part.from_text(text=message)]))
+        return contents
+
+    @staticmethod
+    def _parsed_call(function_call: types.FunctionCall) -> Dict[str, Any]:
+        function_args = dict(function_call.args or {})
+        logger.info(f"Model requested tool execution: {function_call.name} with args: {function_args}")
+        return {
+            "function": function_call.name,
+            "arguments": function_args
+        }
+
+    async def get_response(
+        self, message: str, history: Optional[List[Dict[str, str]]] = None
+    ) -> ModelResponse:
+        """
+        Queries the Gemini model.
+        Returns the text reply and any function calls it requested.
+        """
+        history = history or []
+        response = await self.client.aio.models.generate_content(
+            model=self.model_name,
+            contents=self._contents(message, history),
+            config=self._config(message, history),
+        )
 
-    async def parse_user_message(self, message: str, user_id: str) -> Any:
-        return "GenAI Model not implemented yet."
+        parts: List[types.Part] = []
+        if response.candidates and response.candidates[0].content:
+            parts = response.candidates[0].content.parts or []
+        text = "".join(part.text for part in parts if part.text and not part.thought)
+        tool_calls = [self._parsed_call(part.function_call) for part in parts if part.function_call]
+        return ModelResponse(content=text or None, tool_calls=tool_calls)
@@ -1,74 +1,150 @@
 import json
 import logging
-from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
 from openai import AsyncOpenAI
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.nl_router.intent import select_tools
+from app.nl_router.endpoints import CircuitBreaker, Endpoint, EndpointPool
 from app.nl_router.tools.openai import STD_TOOLS
-from app.nl_router.router import FunctionRouter
-from app.nl_router.models.base import BaseModel
+from app.nl_router.models.base import BaseModel, ModelResponse, load_system_prompt
 
 logger = logging.getLogger(__name__)
 
-DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant."
+def _endpoint_name(url: str, index: int) -> str:
+    """host:port of ``url`` (just the host on a default port), or the index."""
+    parsed = httpx.URL(url)
+    if not parsed.host:
+        return str(index)
+    return f"{parsed.host}:{parsed.port}" if parsed.port else parsed.host
 
 
-def _load_system_prompt() -> str:
-    prompt_path = Path(__file__).resolve().parent.parent / "prompts" / "system.md"
-    try:
-        return prompt_path.read_text().strip()
-    except OSError as e:
-        logger.warning("Could not load system prompt from %s: %s. Using default.", prompt_path, e)
-        return DEFAULT_SYSTEM_PROMPT
+def _build_endpoints(http_client: Optional[httpx.AsyncClient]) -> List[Endpoint]:
+    configs = settings.OPEN_AI_MODEL_ENDPOINTS or [{"url": settings.OPEN_AI_MODEL_URL}]
+    endpoints = []
+    names = set()
+    for index, config in enumerate(configs):
+        name = config.get("name") or _endpoint_name(config["url"], index)
+        # Names key the metrics; replicas behind one host:port still need their own.
+        if name in names:
+            name = f"{name}#{index}"
+        names.add(name)
+        endpoints.append(Endpoint(
+            name=name,
+            model_name=config.get("model") or settings.OPEN_AI_MODEL_NAME,
+            # All endpoints share the process-wide connection pool.
+            client=AsyncOpenAI(
+                base_url=config["url"],
+                api_key=config.get("api_key") or settings.OPEN_AI_API_KEY,
+                http_client=http_client,
+            ),
+            breaker=CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET_SECONDS),
+        ))
+    return endpoints
 
 
 class OpenAIModel(BaseModel):
-    def __init__(self):
-        self.client = AsyncOpenAI(
-            base_url=settings.OPEN_AI_MODEL_URL,
-            api_key=settings.OPEN_AI_API_KEY,
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        self.pool = EndpointPool(
+            _build_endpoints(http_client),
+            hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+            hedge_default_delay=settings.LLM_HEDGE_DEFAULT_DELAY,
         )
-        self.model_name = settings.OPEN_AI_MODEL_NAME
-        self._system_prompt = _load_system_prompt()
+        self.model_name = ",".join(endpoint.model_name for endpoint in self.pool.endpoints)
+        self._system_prompt = load_system_prompt()
+
+    async def aclose(self) -> None:
+        for endpoint in self.pool.endpoints:
+            await endpoint.client.close()
+
+    def _messages(self, message: str, history: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self._system_prompt},
+            *(history or []),
+            {"role": "user", "content": message}
+        ]
+
+    @staticmethod
+    def _tool_kwargs(message: str, history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """Tool schemas for this message; without any, the request carries no tools."""
+        tools = select_tools(message, history) if settings.NLU_TOOL_SELECTION else STD_TOOLS
+        metrics.histogram("nlu.tools_per_request").observe(len(tools))
+        if not tools:
+            return {}
+        return {"tools": tools, "tool_choice": "auto"}
+
+    @staticmethod
+    def _parsed_call(function_name: str, arguments: str) -> Dict[str, Any]:
+        function_args = json.loads(arguments or "{}")
+        logger.info(f"Model requested tool execution: {function_name} with args: {function_args}")
+        # Reformatted for the router
+        return {
+            "function": function_name,
+            "arguments": function_args
+        }
 
-    async def parse_user_message(self, message: str, user_id: str) -> Any:
+    async def get_response(
+        self, message: str, history: Optional[List[Dict[str, str]]] = None
+    ) -> ModelResponse:
         """
         Queries the OpenAI-compatible model.
-        Handles tool calls if the model requests them.
+        Returns the text reply and any tool calls it requested.
         """
-        messages = [
-            {"role": "system", "content": self._system_prompt},
-            {"role": "user", "content": message}
+        messages = self._messages(message, history)
+        tool_kwargs = self._tool_kwargs(message, history)
+        response = await self.pool.call(lambda endpoint: endpoint.client.chat.completions.create(
+            model=endpoint.model_name,
+            messages=messages,
+            **tool_kwargs,
+        ))
+
+        response_message = response.choices[0].message
+        tool_calls = [
+            self._parsed_call(tool_call.function.name, tool_call.function.arguments)
+            for tool_call in response_message.tool_calls or []
         ]
+        return ModelResponse(content=response_message.content, tool_calls=tool_calls)
+
+    async def stream_response(
+        self,
+        message: str,
+        on_text: Callable[[str], Awaitable[None]],
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> ModelResponse:
+        """
+        Streams the completion, passing the text so far to ``on_text``.
+        Tool calls arrive as argument fragments and are assembled at the end.
+        Endpoint selection, hedging and failover cover opening the stream.
+        """
+        messages = self._messages(message, history)
+        tool_kwargs = self._tool_kwargs(message, history)
+        stream = await self.pool.call(lambda endpoint: endpoint.client.chat.completions.create(
+            model=endpoint.model_name,
+            messages=messages,
+            stream=True,
+            **tool_kwargs,
+        ), discard=lambda stream: stream.close(), streaming=True)
 
-        try:
-            response = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                tools=STD_TOOLS,
-                tool_choice="auto", 
-            )
-
-            response_message = response.choices[0].message
-
-            # Check for tool calls
-            if response_message.tool_calls:
-                tool_call = response_message.tool_calls[0]
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-                
-                logger.info(f"Model requested tool execution: {function_name} with args: {function_args}")
-                
-                # Reformatted for the router
-                parsed_call = {
-                    "function": function_name,
-                    "arguments": function_args
-                }
-                return FunctionRouter.call_function(parsed_call, user_id)
-
-            # If no tool call, return the content
-            return response_message.content
-
-        except Exception as e:
-            logger.error(f"Error querying OpenAI model: {e}")
-            return f"Error: {str(e)}"
+        content = ""
+        calls: Dict[int, Dict[str, str]] = {}
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content += delta.content
+                await on_text(content)
+            for tool_call in delta.tool_calls or []:
+                call = calls.setdefault(tool_call.index, {"name": "", "arguments": ""})
+                if tool_call.function and tool_call.function.name:
+                    call["name"] += tool_call.function.name
+                if tool_call.function and tool_call.function.arguments:
+                    call["arguments"] += tool_call.function.arguments
+
+        tool_calls = [
+            self._parsed_call(call["name"], call["arguments"])
+            for _, call in sorted(calls.items())
+        ]
+        return ModelResponse(content=content or None, tool_calls=tool_calls)
@@ -1,26 +1,167 @@
-
-from typing import Any
+import logging
+import math
+from typing import Any, Optional, Protocol, Tuple
 from app.core.config import settings
+from app.core.metrics import metrics
 from app.nl_router.enums import ModelType
-from app.nl_router.models.base import BaseModel
+from app.nl_router.fast_path import parse_fast_path
+from app.nl_router.http_client import build_llm_http_client
+from app.nl_router.models.base import BaseModel, ModelResponse
 from app.nl_router.models.openai_model import OpenAIModel
 from app.nl_router.models.gen_ai_model import GenAIModel
+from app.nl_router.router import FunctionRouter
+from app.nl_router.memory import ConversationMemory
+from app.nl_router.rate_limit import LLMBusyError, LLMLimiter, UserRateLimiter
+from app.nl_router.tool_cache import ToolCallCache, conversation_key, schema_version
+from app.nl_router.tools.openai import STD_TOOLS
+
+logger = logging.getLogger(__name__)
+
+
+class ReplyStream(Protocol):
+    """Where a streamed answer is shown while the model is still generating it."""
+
+    async def start(self) -> None:
+        """Called before waiting for a model slot, so the user sees progress early."""
+
+    async def update(self, text: str) -> None:
+        """Called with the whole text generated so far."""
+
 
 class NLURouter:
     def __init__(self):
+        self.http_client = build_llm_http_client()
         self.model: BaseModel = self._get_model()
+        self.limiter = LLMLimiter(
+            settings.LLM_MAX_CONCURRENCY,
+            timeout=settings.LLM_QUEUE_TIMEOUT or None,
+        )
+        self.user_limiter = UserRateLimiter(
+            settings.USER_RATE_LIMIT_PER_MINUTE,
+            settings.USER_RATE_LIMIT_BURST,
+        )
+        self.tool_cache = ToolCallCache(
+            settings.TOOL_CALL_CACHE_SIZE,
+            settings.TOOL_CALL_CACHE_TTL,
+            version=schema_version(STD_TOOLS, settings.MODEL_TYPE, getattr(self.model, "model_name", None)),
+        )
+        self.memory: Optional[ConversationMemory] = None
+        if settings.CONVERSATION_TOKEN_BUDGET > 0:
+            self.memory = ConversationMemory(
+                token_budget=settings.CONVERSATION_TOKEN_BUDGET,
+                max_turns=settings.CONVERSATION_MAX_TURNS,
+                summary_tokens=settings.CONVERSATION_SUMMARY_TOKENS,
+                maxsize=settings.CONVERSATION_CACHE_SIZE,
+                ttl=settings.CONVERSATION_IDLE_SECONDS,
+                persist=settings.CONVERSATION_PERSIST,
+            )
 
     def _get_model(self) -> BaseModel:
         model_type = settings.MODEL_TYPE
         
         if model_type == ModelType.OPEN_AI.value:
-            return OpenAIModel()
+            return OpenAIModel(self.http_client)
         elif model_type == ModelType.GEN_AI.value:
-            return GenAIModel()
+            return GenAIModel(self.http_client)
         else:
             if not model_type:
-                 return OpenAIModel()
+                 return OpenAIModel(self.http_client)
             raise ValueError(f"Unknown MODEL_TYPE: {model_type}")
 
-    async def parse_user_message(self, message: str, user_id: str) -> Any:
-        return await self.model.parse_user_message(message, user_id)
\ No newline at end of file
+    async def parse_user_message(
+        self, message: str, user_id: str, stream: Optional[ReplyStream] = None
+    ) -> Any:
+        """
+        Answer a user's message: fast path, cached tool call, or the model.
+
+        Args:
+            message (str): The user's message.
+            user_id (str): ID of the user.
+            stream (Optional[ReplyStream]): If given (and LLM_STREAMING is on),
+                model output is streamed to it as it is generated.
+
+        Returns:
+            Any: The reply text.
+        """
+        reply, remember = await self._answer(message, user_id, stream)
+        if remember and reply is not None and self.memory is not None:
+            await self.memory.append(user_id, message, str(reply))
+        return reply
+
+    async def _answer(
+        self, message: str, user_id: str, stream: Optional[ReplyStream]
+    ) -> Tuple[Any, bool]:
+        """Returns the reply and whether it belongs in the conversation memory."""
+        if settings.NLU_FAST_PATH_ENABLED:
+            parsed_call = parse_fast_path(message)
+            if parsed_call is not None:
+                metrics.counter("nlu.fast_path.hit").inc()
+                return await FunctionRouter.call_function(parsed_call, user_id), True
+            metrics.counter("nlu.fast_path.miss").inc()
+
+        # For a follow-up the history is part of the cache key: the same words
+        # mean different calls in different conversations.
+        history = await self.memory.history(user_id) if self.memory is not None else None
+        context = conversation_key(user_id, message, history)
+        response = self.tool_cache.get(message, context) if settings.TOOL_CALL_CACHE_SIZE else None
+        if response is None:
+            retry_after = self.user_limiter.check(user_id)
+            if retry_after:
+                return f"You're sending messages too fast. Please wait {math.ceil(retry_after)}s and try again.", False
+
+            streaming = stream is not None and settings.LLM_STREAMING
+            try:
+                # Post the placeholder before taking a slot: it waits on the
+                # outbound sender, which must not hold up other users' requests.
+                if streaming:
+                    await stream.start()
+                async with self.limiter:
+                    if streaming:
+                        response = await self.model.stream_response(message, stream.update, history)
+                    else:
+                        response = await self.model.get_response(message, history)
+            except LLMBusyError:
+                return "I'm handling a lot of requests right now. Please try again in a moment.", False
+            except Exception as e:
+                logger.error(f"Error querying model: {e}")
+                return f"Error: {str(e)}", False
+            self.tool_cache.set(message, response, context)
+
+        return await self._execute(response, user_id), True
+
+    async def _execute(self, response: ModelResponse, user_id: str) -> Any:
+        if not response.tool_calls:
+            return response.content
+        try:
+            results = await FunctionRouter.call_functions(response.tool_calls, user_id)
+        except Exception as e:
+            logger.error(f"Error executing tool call: {e}")
+            return f"Error: {str(e)}"
+        if len(results) == 1:
+            return results[0]
+        # One reply for the whole message; blank lines only between multi-line results.
+        texts = [str(result) for result in results]
+        separator = "\n\n" if any("\n" in text for text in texts) else "\n"
+        return separator.join(texts)
+
+    async def aclose(self) -> None:
+        await self.model.aclose()
+        await self.http_client.aclose()
+
+
+# One router (and HTTP pool) per process; built at startup by the bot runner.
+_router: Optional[NLURouter] = None
+
+
+def get_nlu_router() -> NLURouter:
+    global _router
+    if _router is None:
+        _router = NLURouter()
+    return _router
+
+
+async def close_nlu_router() -> None:
+    global _router
+    if _router is not None:
+        await _router.aclose()
+        _router = None
@@ -0,0 +1,126 @@
+"""
+Admission control for LLM calls.
+
+``UserRateLimiter`` keeps one token bucket per user so a chatty user is told
+to slow down instead of filling the model server's queue, and ``LLMLimiter``
+bounds how many LLM requests this process has in flight at once.
+"""
+import asyncio
+import time
+from typing import Hashable, Optional
+
+from app.core.cache import TTLCache
+from app.core.metrics import metrics
+
+
+class LLMBusyError(Exception):
+    """Raised when an LLM slot did not free up within the queue timeout."""
+
+
+class TokenBucket:
+    """
+    Token bucket holding up to ``capacity`` tokens, refilled at ``rate`` per second.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (float): Bucket size, i.e. the allowed burst.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self, now: Optional[float] = None) -> bool:
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until the next token is available."""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class UserRateLimiter:
+    """
+    Per-user token buckets.
+
+    A bucket left alone for ``burst / rate`` seconds is full again, so that is
+    also how long it is kept; idle users cost no memory after that.
+
+    Args:
+        per_minute (float): Sustained messages per minute per user.
+        burst (int): Messages a user may send back to back.
+        maxsize (int): Maximum number of tracked users.
+    """
+    def __init__(self, per_minute: float, burst: int, maxsize: int = 10000):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self._buckets: TTLCache[Hashable, TokenBucket] = TTLCache(maxsize, burst / self.rate)
+
+    def check(self, user_id: Hashable) -> float:
+        """
+        Take one token from the user's bucket
+
+        Args:
+            user_id (Hashable): User the request is for.
+
+        Returns:
+            float: 0 if the request may go ahead, otherwise seconds to wait.
+        """
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+        # Re-set on every call so the entry expires burst/rate after last use.
+        self._buckets.set(user_id, bucket)
+        if bucket.try_acquire():
+            return 0.0
+        metrics.counter("llm.rate_limited").inc()
+        return bucket.retry_after()
+
+
+class LLMLimiter:
+    """
+    Bounds the number of in-flight LLM requests in this process.
+
+    Use as ``async with limiter:``. Callers wait in FIFO order for a slot; with
+    a ``timeout`` they give up with ``LLMBusyError`` instead of queueing forever.
+
+    Args:
+        max_in_flight (int): Concurrent LLM requests allowed.
+        timeout (Optional[float]): Max seconds to wait for a slot (None = no limit).
+    """
+    def __init__(self, max_in_flight: int, timeout: Optional[float] = None):
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._waiting = 0
+        self._in_flight = 0
+
+    async def __aenter__(self) -> "LLMLimiter":
+        started = time.monotonic()
+        self._waiting += 1
+        metrics.gauge("llm.queue.depth").set(self._waiting)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            metrics.counter("llm.queue.timeouts").inc()
+            raise LLMBusyError(f"no LLM slot free after {self.timeout}s") from None
+        finally:
+            self._waiting -= 1
+            metrics.gauge("llm.queue.depth").set(self._waiting)
+            metrics.histogram("llm.queue.wait_seconds").observe(time.monotonic() - started)
+        self._in_flight += 1
+        metrics.gauge("llm.in_flight").set(self._in_flight)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._in_flight -= 1
+        metrics.gauge("llm.in_flight").set(self._in_flight)
+        self._slots.release()
@@ -1,54 +1,63 @@
-from typing import Any, Dict
+import asyncio
+from typing import Any, Dict, List
 
-from app.bot.controller.expense.transaction_controller import (
-    TransactionController,
-    TransactionType,
-)
+from app.bot.controller.expense.transaction_controller import TransactionController
+from app.nl_router.tools.registry import registry
+
+UNKNOWN_FUNCTION = "❌ Unknown function"
 
 
 class FunctionRouter:
     @staticmethod
-    def call_function(parsed_call: Dict[str, Any], user_id: str) -> Any:
-        fn = parsed_call.get("function")
-        args = parsed_call.get("arguments", {})
-
-        controller = TransactionController(user_id=user_id)
-
-        if fn == "add_expense":
-            return controller.add_transaction(
-                amount=args.get("amount"),
-                description=args.get("description"),
-                transaction_type=TransactionType.EXPENSE,
-                currency_code=args.get("currency_code"),
-                category=args.get("category"),
-                date=args.get("date"),
-            )
+    async def call_function(parsed_call: Dict[str, Any], user_id: str) -> Any:
+        if registry.get(parsed_call.get("function")) is None:
+            return UNKNOWN_FUNCTION
+        async with TransactionController(user_id=user_id) as controller:
+            return await FunctionRouter._dispatch(controller, parsed_call)
 
-        if fn == "add_income":
-            return controller.add_transaction(
-                amount=args.get("amount"),
-                description=args.get("description"),
-                transaction_type=TransactionType.INCOME,
-                currency_code=args.get("currency_code"),
-                category=args.get("category"),
-                date=args.get("date"),
-            )
-
-        if fn == "get_analytics":
-            return controller.get_analytics(
-                time_range=args.get("time_range", "current_month"),
-                start_date=args.get("start_date"),
-                end_date=args.get("end_date"),
-            )
-
-        if fn == "list_transactions":
-            return controller.list_transactions(
-                limit=args.get("limit"),
+    @staticmethod
+    async def call_functions(parsed_calls: List[Dict[str, Any]], user_id: str) -> List[Any]:
+        """
+        Run every tool call from one model response
+
+        Writes run first, in order, in a single DB transaction, so either all
+        of them are stored or (on an error) none are. Reads then run
+        concurrently, each on its own session, and see those writes.
+
+        Args:
+            parsed_calls (List[Dict[str, Any]]): Tool calls as produced by the model.
+            user_id (str): User the calls are made for.
+
+        Returns:
+            List[Any]: One result per call, in the order of ``parsed_calls``.
+        """
+        results: List[Any] = [None] * len(parsed_calls)
+        tools = [registry.get(call.get("function")) for call in parsed_calls]
+        writes = [i for i, tool in enumerate(tools) if tool is not None and tool.writes]
+        reads = [i for i, tool in enumerate(tools) if tool is not None and not tool.writes]
+        for i, tool in enumerate(tools):
+            if tool is None:
+                results[i] = UNKNOWN_FUNCTION
+
+        if writes:
+            async with TransactionController(user_id=user_id, autocommit=False) as controller:
+                try:
+                    for i in writes:
+                        results[i] = await FunctionRouter._dispatch(controller, parsed_calls[i])
+                    await controller.db.commit()
+                except Exception:
+                    await controller.db.rollback()
+                    raise
+
+        if reads:
+            read_results = await asyncio.gather(
+                *(FunctionRouter.call_function(parsed_calls[i], user_id) for i in reads)
             )
+            for i, result in zip(reads, read_results):
+                results[i] = result
 
-        if fn == "delete_transaction":
-            return controller.delete_transaction(
-                transaction_id=args.get("transaction_id"),
-            )
+        return results
 
-        return "❌ Unknown function"
+    @staticmethod
+    async def _dispatch(controller: TransactionController, parsed_call: Dict[str, Any]) -> Any:
+        return await registry.dispatch(controller, parsed_call)
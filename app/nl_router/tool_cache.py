@@ -0,0 +1,139 @@
+"""
+Cache of the model's parsed tool calls for common read-only questions.
+
+"show my analytics" or "list my transactions" map to the same tool call for
+every user, so the call the model chose is cached (never the executed result)
+and replayed for the next user who sends the same normalized text, whatever
+came before it in their conversation. Only a follow-up ("same again", "and
+last month?") depends on earlier turns; its key also carries the user and a
+hash of the history.
+"""
+import copy
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.metrics import metrics
+from app.nl_router.intent import classify_intents
+from app.nl_router.models.base import ModelResponse
+
+# Read-only tools whose arguments do not depend on who is asking.
+CACHEABLE_FUNCTIONS = {"get_analytics", "list_transactions"}
+# Absolute dates are usually resolved from "last week"-style phrases relative
+# to today, so calls carrying them are not replayed.
+_UNCACHEABLE_ARGUMENTS = {"start_date", "end_date", "date"}
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+# Words that point back at earlier turns ("same again", "and for food?").
+_FOLLOW_UP = re.compile(
+    r"^(?:and|but|or|also|what about|how about|now)\b"
+    r"|\b(?:it|them|those|same|again|too|instead|else|previous|above|one|ones)\b"
+)
+
+
+def normalize_message(message: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a message."""
+    text = unicodedata.normalize("NFKC", message).casefold()
+    return " ".join(_PUNCTUATION.sub(" ", text).split())
+
+
+def schema_version(*parts: Any) -> str:
+    """Short stable hash of the tool schema (and anything else the calls depend on)."""
+    payload = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()[:12]
+
+
+def is_follow_up(message: str) -> bool:
+    """True if the message may only make sense with the turns before it."""
+    text = normalize_message(message)
+    return not classify_intents(text) or bool(_FOLLOW_UP.search(text))
+
+
+def conversation_key(user_id: str, message: str, history: Optional[List[Dict[str, str]]]) -> str:
+    """
+    Cache context for a message: shared ("") unless it is a follow-up with history
+
+    Args:
+        user_id (str): ID of the user.
+        message (str): The user's message.
+        history (Optional[List[Dict[str, str]]]): Turns sent to the model with the message.
+
+    Returns:
+        str: Part of the cache key.
+    """
+    if not history or not is_follow_up(message):
+        return ""
+    return f"{user_id}:{schema_version(history)}"
+
+
+def is_cacheable(response: ModelResponse) -> bool:
+    if not response.tool_calls:
+        return False
+    return all(
+        call.get("function") in CACHEABLE_FUNCTIONS
+        and not _UNCACHEABLE_ARGUMENTS & set(call.get("arguments") or {})
+        for call in response.tool_calls
+    )
+
+
+class ToolCallCache:
+    """
+    Bounded LRU/TTL cache from normalized message text to tool calls.
+
+    Args:
+        maxsize (int): Maximum number of cached messages.
+        ttl (float): Seconds an entry stays valid.
+        version (str): Tool schema version; part of every key, so changing
+            the tools (or model) never replays stale calls.
+    """
+    def __init__(self, maxsize: int, ttl: float, version: str):
+        self.version = version
+        self._cache: TTLCache[Tuple[str, str, str], List[Dict[str, Any]]] = TTLCache(maxsize, ttl)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def _key(self, message: str, context: str) -> Tuple[str, str, str]:
+        return self.version, context, normalize_message(message)
+
+    def get(self, message: str, context: str = "") -> Optional[ModelResponse]:
+        """
+        Args:
+            message (str): The user's message.
+            context (str): ``conversation_key`` of the message.
+
+        Returns:
+            Optional[ModelResponse]: The cached tool calls, if any.
+        """
+        tool_calls = self._cache.get(self._key(message, context))
+        if tool_calls is None:
+            metrics.counter("nlu.tool_cache.miss").inc()
+            return None
+        metrics.counter("nlu.tool_cache.hit").inc()
+        return ModelResponse(tool_calls=copy.deepcopy(tool_calls))
+
+    def set(self, message: str, response: ModelResponse, context: str = "") -> bool:
+        """
+        Cache the response's tool calls if they are safe to replay
+
+        Args:
+            message (str): The user's message.
+            response (ModelResponse): What the model answered.
+            context (str): ``conversation_key`` of the message.
+
+        Returns:
+            bool: True if the response was cached.
+        """
+        if not is_cacheable(response):
+            return False
+        self._cache.set(self._key(message, context), response.tool_calls)
+        return True
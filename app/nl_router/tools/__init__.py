@@ -0,0 +1,2 @@
+# Importing the tool modules registers their tools with the registry.
+from app.nl_router.tools import transactions  # noqa: F401
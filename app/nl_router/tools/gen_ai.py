@@ -1,13 +1,13 @@
+from typing import Iterable, List, Optional
 
 from google.genai import types
 
-get_weather_declaration = types.FunctionDeclaration(
-  name="get_weather",
-  description="Gets the current weather temperature for a given location.",
-  parameters={
-      "type": "object",
-      "properties": {"location": {"type": "string"}},
-      "required": ["location"],
-  },
-)
-get_weather_tool = types.Tool(function_declarations=[get_weather_declaration])
+from app.nl_router.tools.registry import registry
+
+STD_DECLARATIONS = registry.genai_declarations()
+
+
+def genai_tools(names: Optional[Iterable[str]] = None) -> List[types.Tool]:
+    """``tools`` for a genai request; empty when no tool is selected."""
+    declarations = STD_DECLARATIONS if names is None else registry.genai_declarations(names)
+    return [types.Tool(function_declarations=declarations)] if declarations else []
@@ -0,0 +1,180 @@
+"""
+Declarative tool registry.
+
+A tool is a pydantic model describing its arguments plus an async handler::
+
+    class AddExpenseArgs(BaseModel):
+        amount: float = Field(description="Amount spent")
+
+    @registry.tool("add_expense", "Add an expense transaction", writes=True)
+    async def add_expense(controller: TransactionController, args: AddExpenseArgs) -> str:
+        ...
+
+Schemas are built once, when the tool is registered, and the registry renders
+them for each model API (OpenAI ``tools`` and google-genai
+``FunctionDeclaration``). Dispatch is a dict lookup, arguments are validated
+against the model, and every call is timed per tool.
+"""
+import inspect
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Type
+
+from google.genai import types
+from pydantic import BaseModel, ValidationError
+
+from app.core.metrics import metrics
+
+Handler = Callable[[Any, BaseModel], Awaitable[Any]]
+
+
+class ToolArgumentsError(ValueError):
+    """The model called a tool with arguments that do not match its schema."""
+
+
+def _clean_schema(schema: Any) -> Any:
+    """Strip pydantic-only keys and collapse ``Optional[X]`` into plain ``X``."""
+    if isinstance(schema, list):
+        return [_clean_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    options = schema.get("anyOf")
+    if options and len(options) == 2 and {"type": "null"} in options:
+        merged = {key: value for key, value in schema.items() if key != "anyOf"}
+        merged.update(next(option for option in options if option != {"type": "null"}))
+        schema = merged
+    return {
+        key: _clean_schema(value)
+        for key, value in schema.items()
+        if key not in ("title", "default")
+    }
+
+
+def _inline_refs(schema: Any, defs: Dict[str, Any]) -> Any:
+    """Replace ``$ref``s to nested models with the models' schemas."""
+    if isinstance(schema, list):
+        return [_inline_refs(item, defs) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    if "$ref" in schema:
+        target = defs[schema["$ref"].rsplit("/", 1)[-1]]
+        extra = {key: value for key, value in schema.items() if key != "$ref"}
+        return _inline_refs({**target, **extra}, defs)
+    return {key: _inline_refs(value, defs) for key, value in schema.items() if key != "$defs"}
+
+
+@dataclass(frozen=True)
+class Tool:
+    name: str
+    description: str
+    args_model: Type[BaseModel]
+    handler: Handler
+    # Changes data; such calls from one message share a DB transaction.
+    writes: bool
+    parameters: Dict[str, Any]
+
+    def openai_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters,
+            },
+        }
+
+    def genai_declaration(self) -> types.FunctionDeclaration:
+        return types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters_json_schema=self.parameters,
+        )
+
+    def parse_arguments(self, arguments: Optional[Dict[str, Any]]) -> BaseModel:
+        try:
+            return self.args_model.model_validate(arguments or {})
+        except ValidationError as e:
+            raise ToolArgumentsError(f"Invalid arguments for {self.name}: {e}") from e
+
+
+class ToolRegistry:
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+
+    def tool(self, name: str, description: str, writes: bool = False) -> Callable[[Handler], Handler]:
+        """
+        Register an async handler as a tool
+
+        Args:
+            name (str): Function name the model calls.
+            description (str): What the tool does, shown to the model.
+            writes (bool): Whether the tool changes data.
+
+        Returns:
+            Callable[[Handler], Handler]: Decorator returning the handler unchanged.
+        """
+        def decorator(handler: Handler) -> Handler:
+            if name in self._tools:
+                raise ValueError(f"Tool {name!r} is already registered")
+            if not inspect.iscoroutinefunction(handler):
+                raise TypeError(f"Tool {name!r} handler must be async")
+            params = list(inspect.signature(handler).parameters.values())
+            if len(params) != 2:
+                raise TypeError(f"Tool {name!r} handler must take (controller, args)")
+            args_model = params[1].annotation
+            if not (inspect.isclass(args_model) and issubclass(args_model, BaseModel)):
+                raise TypeError(f"Tool {name!r} args must be annotated with a pydantic model")
+
+            schema = args_model.model_json_schema()
+            # Not every model API resolves references, so nested models are inlined.
+            parameters = _clean_schema(_inline_refs(schema, schema.get("$defs", {})))
+            parameters.setdefault("properties", {})
+            parameters.setdefault("required", [])
+            self._tools[name] = Tool(name, description, args_model, handler, writes, parameters)
+            return handler
+        return decorator
+
+    def get(self, name: Optional[str]) -> Optional[Tool]:
+        return self._tools.get(name) if name else None
+
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def _select(self, names: Optional[Iterable[str]]) -> List[Tool]:
+        if names is None:
+            return list(self._tools.values())
+        wanted = set(names)
+        return [tool for tool in self._tools.values() if tool.name in wanted]
+
+    def openai_tools(self, names: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """OpenAI ``tools`` list, in registration order (all tools if ``names`` is None)."""
+        return [tool.openai_schema() for tool in self._select(names)]
+
+    def genai_declarations(self, names: Optional[Iterable[str]] = None) -> List[types.FunctionDeclaration]:
+        """google-genai function declarations (all tools if ``names`` is None)."""
+        return [tool.genai_declaration() for tool in self._select(names)]
+
+    async def dispatch(self, controller: Any, parsed_call: Dict[str, Any]) -> Any:
+        """
+        Validate and run one tool call
+
+        Args:
+            controller (Any): Controller passed to the handler.
+            parsed_call (Dict[str, Any]): ``{"function": name, "arguments": {...}}``.
+
+        Returns:
+            Any: The handler's result.
+
+        Raises:
+            ToolArgumentsError: If the arguments do not match the tool's model.
+        """
+        tool = self._tools[parsed_call["function"]]
+        args = tool.parse_arguments(parsed_call.get("arguments"))
+        started = time.monotonic()
+        try:
+            return await tool.handler(controller, args)
+        finally:
+            metrics.histogram(f"tool.{tool.name}.latency_seconds").observe(time.monotonic() - started)
+
+
+registry = ToolRegistry()
@@ -0,0 +1,123 @@
+"""
+Expense-tracker tools exposed to the model.
+
+Field descriptions are what the model sees, so keep them short and concrete.
+"""
+from typing import Annotated, Any, List, Literal, Optional, Union, get_args
+
+from pydantic import BaseModel, Field, WithJsonSchema, field_validator
+
+from app.bot.controller.expense.transaction_controller import (
+    TransactionController,
+    TransactionType,
+)
+from app.nl_router.tools.registry import registry
+
+MAX_LINE_ITEMS = 50
+
+TimeRange = Literal["current_month", "last_month", "today"]
+_TIME_RANGE_ALIASES = {"this_month": "current_month", "month": "current_month", "previous_month": "last_month"}
+
+# Keeps ints as ints so replies read "3 USD", not "3.0 USD".
+Amount = Annotated[Union[int, float], WithJsonSchema({"type": "number"})]
+
+
+class AddExpenseArgs(BaseModel):
+    amount: Amount = Field(description="Amount spent")
+    description: str = Field(description="Description of the expense")
+    currency_code: Optional[str] = Field(None, description="Currency code (e.g., USD, EUR). Optional if default set.")
+    category: Optional[str] = Field(None, description="Category of expense (e.g., food, transport). Optional.")
+    date: Optional[str] = Field(None, description="Date of transaction (YYYY-MM-DD). Optional.")
+
+
+class AddIncomeArgs(BaseModel):
+    amount: Amount = Field(description="Amount earned")
+    description: str = Field(description="Source of income")
+    currency_code: Optional[str] = Field(None, description="Currency code. Optional.")
+    category: Optional[str] = Field(None, description="Category (e.g., salary, gift). Optional.")
+    date: Optional[str] = Field(None, description="Date of transaction. Optional.")
+
+
+class LineItem(BaseModel):
+    amount: Amount = Field(description="Amount of the item")
+    description: str = Field(description="What the item was")
+    type: Literal["expense", "income"] = Field("expense", description="expense or income. Default is expense.")
+    currency_code: Optional[str] = Field(None, description="Currency code. Optional if default set.")
+    category: Optional[str] = Field(None, description="Category (e.g., food, transport, salary). Optional.")
+    date: Optional[str] = Field(None, description="Date of transaction (YYYY-MM-DD). Optional.")
+
+
+class AddTransactionsArgs(BaseModel):
+    items: List[LineItem] = Field(
+        min_length=1, max_length=MAX_LINE_ITEMS, description="Every item mentioned in the message"
+    )
+
+
+class GetAnalyticsArgs(BaseModel):
+    time_range: TimeRange = Field(
+        "current_month", description="Preset time range. Default is current_month."
+    )
+    start_date: Optional[str] = Field(None, description="Start date for custom range (YYYY-MM-DD). Optional.")
+    end_date: Optional[str] = Field(None, description="End date for custom range (YYYY-MM-DD). Optional.")
+    by_category: bool = Field(False, description="Also break the totals down by category.")
+
+    @field_validator("time_range", mode="before")
+    @classmethod
+    def _normalize_time_range(cls, value: Any) -> str:
+        """Models send "This Month", "week" or null too; anything unknown means the default."""
+        key = str(value or "").strip().lower().replace(" ", "_").replace("-", "_")
+        key = _TIME_RANGE_ALIASES.get(key, key)
+        return key if key in get_args(TimeRange) else "current_month"
+
+
+class ListTransactionsArgs(BaseModel):
+    limit: Optional[int] = Field(
+        None, description="Number of most recent transactions to list (default 10, max 50)."
+    )
+
+
+class DeleteTransactionArgs(BaseModel):
+    transaction_id: str = Field(
+        description="Short code of the transaction to delete, as shown in the transaction list (e.g. 00A3)."
+    )
+
+
+@registry.tool("add_expense", "Add an expense transaction", writes=True)
+async def add_expense(controller: TransactionController, args: AddExpenseArgs) -> str:
+    return await controller.add_transaction(transaction_type=TransactionType.EXPENSE, **args.model_dump())
+
+
+@registry.tool("add_income", "Add an income transaction", writes=True)
+async def add_income(controller: TransactionController, args: AddIncomeArgs) -> str:
+    return await controller.add_transaction(transaction_type=TransactionType.INCOME, **args.model_dump())
+
+
+@registry.tool(
+    "add_transactions",
+    "Add several expenses and/or incomes from one message (e.g. a pasted list, one item per line) in one call.",
+    writes=True,
+)
+async def add_transactions(controller: TransactionController, args: AddTransactionsArgs) -> str:
+    return await controller.add_transactions([item.model_dump() for item in args.items])
+
+
+@registry.tool(
+    "get_analytics",
+    "Get expense analytics for a time range. You can specify a preset time_range OR a custom "
+    "date range (start_date and end_date).",
+)
+async def get_analytics(controller: TransactionController, args: GetAnalyticsArgs) -> str:
+    return await controller.get_analytics(**args.model_dump())
+
+
+@registry.tool(
+    "list_transactions",
+    "List the user's most recent transactions in descending chronological order.",
+)
+async def list_transactions(controller: TransactionController, args: ListTransactionsArgs) -> str:
+    return await controller.list_transactions(limit=args.limit)
+
+
+@registry.tool("delete_transaction", "Delete a specific transaction by its code.", writes=True)
+async def delete_transaction(controller: TransactionController, args: DeleteTransactionArgs) -> str:
+    return await controller.delete_transaction(transaction_id=args.transaction_id)
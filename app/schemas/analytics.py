@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class CategoryTotals(BaseModel):
+    category: Optional[str] = None
+    income: float = 0.0
+    expense: float = 0.0
+
+
+class CurrencyTotals(BaseModel):
+    """Totals in one currency; amounts in different currencies are never added up."""
+    currency_code: str
+    income: float = 0.0
+    expense: float = 0.0
+    # Only filled when a category breakdown was requested; largest expense first.
+    categories: List[CategoryTotals] = []
+
+    @property
+    def balance(self) -> float:
+        return self.income - self.expense
+
+
+class AnalyticsResult(BaseModel):
+    label: str
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    currencies: List[CurrencyTotals] = []
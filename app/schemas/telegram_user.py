@@ -4,7 +4,7 @@ import uuid
 
 class TelegramUserBase(BaseModel):
     user_id: uuid.UUID
-    telegram_id: int
+    telegram_id: str
     username: str
     first_name: str
     last_name: str
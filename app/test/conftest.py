@@ -0,0 +1,34 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+
+from app.core.currencies import currency_catalogue
+from app.db.session import AsyncSessionLocal
+from app.models.currency import Currency
+from app.models.user import User
+
+
+@pytest.fixture
+async def create_user():
+    """Factory for committed throwaway users whose default currency is USD."""
+    async def create() -> User:
+        async with AsyncSessionLocal() as db:
+            currency = await db.scalar(select(Currency).where(Currency.code == "USD"))
+            if not currency:
+                currency = Currency(name="US Dollar", code="USD", symbol="$", numeric_code=840, minor_unit=2)
+                db.add(currency)
+                await db.flush()
+                await currency_catalogue.refresh(db)
+            user = User(username=f"user_{str(uuid4())[:8]}", currency_id=currency.id)
+            db.add(user)
+            await db.commit()
+            return user
+
+    return create
+
+
+@pytest.fixture
+async def user(create_user) -> User:
+    """A committed throwaway user whose default currency is USD."""
+    return await create_user()
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event, select
+
+from app.bot.controller.expense.transaction_controller import TransactionController
+from app.core.currencies import currency_catalogue
+from app.crud.transaction import transaction_crud
+from app.db.session import AsyncSessionLocal, async_engine
+from app.models.currency import Currency
+from app.models.user import User
+
+BASE = datetime(2025, 3, 10)
+
+
+async def _currency(db, code, name, symbol, numeric_code):
+    currency = await db.scalar(select(Currency).where(Currency.code == code))
+    if not currency:
+        currency = Currency(name=name, code=code, symbol=symbol, numeric_code=numeric_code, minor_unit=2)
+        db.add(currency)
+        await db.flush()
+        await currency_catalogue.refresh(db)
+    return currency
+
+
+async def _user_with_transactions(db):
+    usd = await _currency(db, "USD", "US Dollar", "$", 840)
+    eur = await _currency(db, "EUR", "Euro", "€", 978)
+    user = User(username=f"user_{str(uuid4())[:8]}", currency_id=usd.id)
+    db.add(user)
+    await db.commit()
+
+    def row(currency, amount, tx_type, category, hours):
+        return {
+            "currency_id": currency.id, "amount": amount, "description": "x", "category": category,
+            "type": tx_type, "occurred_at": BASE + timedelta(hours=hours),
+        }
+
+    await transaction_crud.create_many_for_user(db, user_id=user.id, rows=[
+        row(usd, 10, "expense", "food", 1),
+        row(usd, 5, "expense", "food", 30),
+        row(usd, 20, "expense", "transport", 40),
+        row(usd, 100, "income", "salary", 50),
+        row(eur, 7, "expense", None, 60),
+    ])
+    return user
+
+
+async def test_totals_are_kept_per_currency():
+    async with AsyncSessionLocal() as db:
+        user = await _user_with_transactions(db)
+        totals = await transaction_crud.analytics_for_user(db, user_id=user.id, start=None, end=None)
+
+    assert [(t.currency_code, t.income, t.expense, t.balance) for t in totals] == [
+        ("EUR", 0.0, 7.0, -7.0),
+        ("USD", 100.0, 35.0, 65.0),
+    ]
+    assert all(t.categories == [] for t in totals)
+
+
+async def test_category_breakdown_comes_from_the_same_query():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with AsyncSessionLocal() as db:
+        user = await _user_with_transactions(db)
+        event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            totals = await transaction_crud.analytics_for_user(
+                db, user_id=user.id, start=BASE, end=BASE + timedelta(days=7), by_category=True,
+            )
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    assert len(statements) == 1
+    eur, usd = totals
+    assert (usd.income, usd.expense) == (100.0, 35.0)
+    assert [(c.category, c.income, c.expense) for c in usd.categories] == [
+        ("transport", 0.0, 20.0),
+        ("food", 0.0, 15.0),
+        ("salary", 100.0, 0.0),
+    ]
+    assert [(c.category, c.expense) for c in eur.categories] == [(None, 7.0)]
+
+
+async def test_get_analytics_renders_each_currency_in_one_round_trip():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with AsyncSessionLocal() as db:
+        user = await _user_with_transactions(db)
+        controller = TransactionController(user.id, db=db)
+        event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            reply = await controller.get_analytics(
+                start_date="2025-03-01", end_date="2025-04-01", by_category=True,
+            )
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    assert len(statements) == 1
+    assert "Expense: 7.0 EUR" in reply
+    assert "Balance: 65.0 USD" in reply
+    assert "• food: -15.0 USD" in reply
+    assert "• uncategorized: -7.0 EUR" in reply
+
+
+async def test_get_analytics_without_transactions():
+    async with AsyncSessionLocal() as db:
+        user = User(username=f"user_{str(uuid4())[:8]}")
+        db.add(user)
+        await db.commit()
+        reply = await TransactionController(user.id, db=db).get_analytics(time_range="today")
+
+    assert reply.startswith("📊 Analytics (Today):")
+    assert "No transactions in this period." in reply
@@ -0,0 +1,73 @@
+from sqlalchemy import event, select
+
+from app.db.session import AsyncSessionLocal, async_engine
+from app.models.expense_tracker import Transaction
+from app.nl_router.fast_path import parse_fast_path
+from app.nl_router.router import FunctionRouter
+
+
+async def _transactions(user_id):
+    async with AsyncSessionLocal() as db:
+        return (await db.scalars(
+            select(Transaction).where(Transaction.user_id == user_id).order_by(Transaction.description)
+        )).all()
+
+
+async def test_pasted_list_is_stored_with_one_insert(user):
+    user_id = user.id
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO transactions"):
+            inserts.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_inserts)
+    try:
+        reply = await FunctionRouter.call_function(
+            parse_fast_path("groceries 42\nfuel 60\nnetflix 15\nsalary 3000"), str(user_id)
+        )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count_inserts)
+
+    assert len(inserts) == 1
+    assert reply.splitlines() == [
+        "Recorded 4 transactions:",
+        "- expense: 42.0 USD for groceries",
+        "- expense: 60.0 USD for fuel",
+        "- expense: 15.0 USD for netflix",
+        "- income: 3000.0 USD for salary",
+        "Total expense: 117.0 USD",
+        "Total income: 3000.0 USD",
+    ]
+    rows = await _transactions(user_id)
+    assert [(tx.description, tx.type, tx.category) for tx in rows] == [
+        ("fuel", "expense", "transport"),
+        ("groceries", "expense", "food"),
+        ("netflix", "expense", "other"),
+        ("salary", "income", "salary"),
+    ]
+    assert len({tx.id for tx in rows}) == 4
+    assert all(tx.created_at is not None and not tx.is_deleted for tx in rows)
+
+
+async def test_invalid_items_are_skipped_and_reported(user):
+    user_id = user.id
+
+    reply = await FunctionRouter.call_function(
+        {"function": "add_transactions", "arguments": {"items": [
+            {"amount": 12, "description": "lunch"},
+            {"amount": -5, "description": "refund?"},
+            {"amount": 8, "description": "book", "currency_code": "XXZ"},
+        ]}},
+        str(user_id),
+    )
+
+    assert reply.splitlines() == [
+        "Recorded 1 transaction:",
+        "- expense: 12 USD for lunch",
+        "Total expense: 12 USD",
+        "Skipped 2:",
+        "- refund?: amount must be a positive number",
+        "- book: currency XXZ not supported",
+    ]
+    assert [tx.description for tx in await _transactions(user_id)] == ["lunch"]
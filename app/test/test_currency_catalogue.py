@@ -0,0 +1,76 @@
+import asyncio
+import dataclasses
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event, select
+
+from app.bot.controller.expense.transaction_controller import TransactionController
+from app.core.currencies import CurrencyCatalogue, currency_catalogue
+from app.db.session import AsyncSessionLocal, async_engine
+from app.models.currency import Currency
+from app.models.user import User
+
+
+async def _seed_usd(db):
+    if not await db.scalar(select(Currency).where(Currency.code == "USD")):
+        db.add(Currency(name="US Dollar", code="USD", symbol="$", numeric_code=840, minor_unit=2))
+        await db.commit()
+
+
+async def test_lookups_by_code_id_and_numeric_code():
+    catalogue = CurrencyCatalogue()
+    with pytest.raises(RuntimeError):
+        catalogue.by_code("USD")
+
+    async with AsyncSessionLocal() as db:
+        await _seed_usd(db)
+    await asyncio.gather(*(catalogue.ensure_loaded() for _ in range(5)))
+
+    usd = catalogue.by_code(" usd ")
+    assert (usd.code, usd.symbol, usd.numeric_code, usd.minor_unit) == ("USD", "$", 840, 2)
+    assert catalogue.by_id(usd.id) is usd
+    assert catalogue.by_numeric_code(840) is usd
+    assert catalogue.by_code("XXQ") is None
+    assert catalogue.by_id(None) is None
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        usd.code = "EUR"
+
+
+async def test_refresh_picks_up_new_currencies():
+    catalogue = CurrencyCatalogue()
+    async with AsyncSessionLocal() as db:
+        await catalogue.refresh(db)
+        code = f"Q{uuid4().hex[:2].upper()}"
+        db.add(Currency(name="Test", code=code, symbol="?", numeric_code=0, minor_unit=2))
+        await db.flush()
+
+        assert catalogue.by_code(code) is None
+        await catalogue.refresh(db)
+        assert catalogue.by_code(code).name == "Test"
+        await db.rollback()
+
+
+async def test_recording_and_listing_do_not_query_currencies():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with AsyncSessionLocal() as db:
+        await _seed_usd(db)
+        await currency_catalogue.refresh(db)
+        user = User(username=f"user_{str(uuid4())[:8]}")
+        db.add(user)
+        await db.commit()
+
+        controller = TransactionController(user.id, db=db)
+        event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            assert "Recorded expense: 4 USD" in await controller.add_transaction(4, "tea", "expense", "USD")
+            assert "Recorded expense: 2 USD" in await controller.add_transaction(2, "bus", "expense")
+            assert "| 4.0 USD | tea" in await controller.list_transactions()
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    assert not [s for s in statements if "FROM currency" in s]
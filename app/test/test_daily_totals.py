@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, select
+
+from app.crud.transaction import transaction_crud
+from app.db.session import AsyncSessionLocal, async_engine
+from app.models.expense_tracker import TransactionDailyTotal
+
+BASE = datetime(2025, 3, 10)
+
+
+async def _daily_totals(db, user_id):
+    rows = await db.scalars(
+        select(TransactionDailyTotal)
+        .where(TransactionDailyTotal.user_id == user_id)
+        .order_by(TransactionDailyTotal.day, TransactionDailyTotal.type)
+    )
+    return [(row.day.isoformat(), row.type, row.category, float(row.total), row.count) for row in rows]
+
+
+async def test_trigger_keeps_daily_totals_exact(user):
+    async with AsyncSessionLocal() as db:
+        common = dict(user_id=user.id, currency_id=user.currency_id, type="expense")
+
+        coffee = await transaction_crud.create_for_user(
+            db, amount=0.1, description="coffee", category="food", occurred_at=BASE.replace(hour=8), **common,
+        )
+        await transaction_crud.create_for_user(
+            db, amount=0.2, description="tea", category="food", occurred_at=BASE.replace(hour=9), **common,
+        )
+        await transaction_crud.create_many_for_user(db, user_id=user.id, rows=[
+            {"currency_id": user.currency_id, "amount": 40, "description": "fuel", "category": None,
+             "type": "expense", "occurred_at": BASE + timedelta(days=1)},
+            {"currency_id": user.currency_id, "amount": 100, "description": "gift", "category": None,
+             "type": "income", "occurred_at": BASE + timedelta(days=1)},
+        ])
+        assert await _daily_totals(db, user.id) == [
+            ("2025-03-10", "expense", "food", pytest.approx(0.3), 2),
+            ("2025-03-11", "expense", "", 40.0, 1),
+            ("2025-03-11", "income", "", 100.0, 1),
+        ]
+
+        await transaction_crud.soft_delete(db, tx=coffee)
+        assert (await _daily_totals(db, user.id))[0] == ("2025-03-10", "expense", "food", 0.2, 1)
+
+
+async def test_sums_match_raw_transactions_for_any_range(user):
+    async with AsyncSessionLocal() as db:
+        rows = []
+        for day in range(6):
+            for hour, amount, tx_type in ((7, 3.5, "expense"), (13, 12, "expense"), (18, 200, "income")):
+                rows.append({
+                    "currency_id": user.currency_id, "amount": amount + day, "description": "x",
+                    "category": None, "type": tx_type, "occurred_at": BASE + timedelta(days=day, hours=hour),
+                })
+        await transaction_crud.create_many_for_user(db, user_id=user.id, rows=rows)
+
+        ranges = [
+            (None, None),
+            (BASE, None),
+            (None, BASE + timedelta(days=3)),
+            (BASE + timedelta(days=1), BASE + timedelta(days=4)),
+            (BASE + timedelta(days=1, hours=10), BASE + timedelta(days=4, hours=15)),
+            (BASE + timedelta(days=2, hours=10), BASE + timedelta(days=2, hours=15)),
+            (BASE + timedelta(days=2, hours=10), BASE + timedelta(days=3)),
+            (BASE + timedelta(days=2), BASE + timedelta(days=2, hours=15)),
+            (BASE + timedelta(days=5, hours=12), None),
+        ]
+        for start, end in ranges:
+            [usd] = await transaction_crud.analytics_for_user(db, user_id=user.id, start=start, end=end)
+            for tx_type in ("income", "expense"):
+                raw = sum(
+                    row["amount"] for row in rows
+                    if row["type"] == tx_type
+                    and (start is None or row["occurred_at"] >= start)
+                    and (end is None or row["occurred_at"] < end)
+                )
+                assert getattr(usd, tx_type) == pytest.approx(raw), (start, end, tx_type)
+
+
+async def test_day_aligned_ranges_read_only_the_daily_totals(user):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with AsyncSessionLocal() as db:
+        event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await transaction_crud.analytics_for_user(
+                db, user_id=user.id, start=BASE, end=BASE + timedelta(days=365), by_category=True,
+            )
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    assert len(statements) == 1
+    assert "transaction_daily_totals" in statements[0]
+    assert "FROM transactions" not in statements[0]
@@ -0,0 +1,131 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from app.core.config import settings
+from app.nl_router.endpoints import CircuitBreaker, Endpoint, EndpointPool, NoEndpointAvailableError
+from app.nl_router.models.openai_model import _build_endpoints
+
+
+def _endpoint(name, threshold=3):
+    return Endpoint(name=name, model_name="m", client=None, breaker=CircuitBreaker(threshold, reset_timeout=60))
+
+
+def _server_error():
+    request = httpx.Request("POST", "http://llm/v1/chat/completions")
+    return openai.InternalServerError("boom", response=httpx.Response(500, request=request), body=None)
+
+
+def _bad_request():
+    request = httpx.Request("POST", "http://llm/v1/chat/completions")
+    return openai.BadRequestError("bad", response=httpx.Response(400, request=request), body=None)
+
+
+def _server(delays, errors=None):
+    """Request function where endpoint ``name`` answers after ``delays[name]`` seconds."""
+    calls = []
+
+    async def request(endpoint):
+        calls.append(endpoint.name)
+        await asyncio.sleep(delays.get(endpoint.name, 0))
+        if errors and endpoint.name in errors:
+            raise errors[endpoint.name]
+        return endpoint.name
+
+    return request, calls
+
+
+async def test_prefers_the_endpoint_with_lowest_latency():
+    pool = EndpointPool([_endpoint("slow"), _endpoint("fast")], hedge_percentile=0)
+    request, calls = _server({"slow": 0.02, "fast": 0.0})
+
+    # Both get measured first, then the faster one wins every time.
+    for _ in range(4):
+        await pool.call(request)
+
+    assert calls[2:] == ["fast", "fast"]
+
+
+async def test_stream_open_latency_is_kept_apart_from_completions():
+    pool = EndpointPool([_endpoint("a"), _endpoint("b")], hedge_percentile=50, min_samples=1)
+    complete, _ = _server({"a": 0.03, "b": 0.03})
+    open_stream, _ = _server({})
+
+    await pool.call(complete)
+    await pool.call(open_stream, streaming=True)
+
+    # Quick stream opens do not drag down the completion estimates.
+    assert pool.latency.count == 1 and pool.stream_latency.count == 1
+    assert pool.endpoints[0].ewma >= 0.03 > pool.endpoints[0].stream_ewma
+    assert pool.hedge_delay() > pool.hedge_delay(streaming=True)
+
+
+async def test_hedges_slow_requests_to_a_second_endpoint():
+    pool = EndpointPool([_endpoint("a"), _endpoint("b")], hedge_default_delay=0.01)
+    request, calls = _server({"a": 1.0, "b": 0.0})
+
+    assert await asyncio.wait_for(pool.call(request), 0.5) == "b"
+    assert calls == ["a", "b"]
+
+
+async def test_fails_over_and_opens_the_circuit():
+    pool = EndpointPool([_endpoint("bad", threshold=2), _endpoint("good")], hedge_percentile=0)
+    request, calls = _server({"good": 0.01}, errors={"bad": _server_error()})
+
+    for _ in range(3):
+        assert await pool.call(request) == "good"
+
+    assert pool.endpoints[0].breaker.is_open
+    # Once open, the broken endpoint is no longer tried first.
+    assert calls.count("bad") == 2
+
+
+async def test_bad_requests_are_not_retried_elsewhere():
+    pool = EndpointPool([_endpoint("a"), _endpoint("b")], hedge_percentile=0)
+    request, calls = _server({}, errors={"a": _bad_request(), "b": _bad_request()})
+
+    with pytest.raises(openai.BadRequestError):
+        await pool.call(request)
+
+    assert len(calls) == 1
+    assert not any(endpoint.breaker.is_open for endpoint in pool.endpoints)
+
+
+async def test_raises_when_every_circuit_is_open():
+    pool = EndpointPool([_endpoint("a", threshold=1)], hedge_percentile=0)
+    request, _ = _server({}, errors={"a": _server_error()})
+
+    with pytest.raises(openai.InternalServerError):
+        await pool.call(request)
+    with pytest.raises(NoEndpointAvailableError):
+        await pool.call(request)
+
+
+def test_replicas_on_one_host_get_their_own_names(monkeypatch):
+    monkeypatch.setattr(settings, "OPEN_AI_MODEL_ENDPOINTS", [
+        {"url": "http://localhost:8000/v1"},
+        {"url": "http://localhost:8001/v1"},
+        {"url": "http://localhost:8001/v2"},
+        {"url": "https://llm.example.com/v1"},
+    ])
+
+    names = [endpoint.name for endpoint in _build_endpoints(None)]
+
+    assert names == ["localhost:8000", "localhost:8001", "localhost:8001#2", "llm.example.com"]
+
+
+async def test_fails_over_between_endpoints_with_the_same_name():
+    pool = EndpointPool([_endpoint("localhost"), _endpoint("localhost")], hedge_percentile=0)
+    first, second = pool.endpoints
+    answered = []
+
+    async def request(endpoint):
+        if endpoint is first:
+            raise _server_error()
+        answered.append(endpoint)
+        return "ok"
+
+    assert await pool.call(request) == "ok"
+    assert answered == [second]
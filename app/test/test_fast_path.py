@@ -0,0 +1,111 @@
+import pytest
+
+from app.nl_router.fast_path import parse_fast_path
+from app.nl_router.models.base import BaseModel
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        ("spent 15 on lunch", ("add_expense", {"amount": 15.0, "description": "lunch", "category": "food"})),
+        ("Paid $20 for taxi", ("add_expense", {"amount": 20.0, "description": "taxi", "category": "transport",
+                                               "currency_code": "USD"})),
+        ("coffee 3.5 EUR", ("add_expense", {"amount": 3.5, "description": "coffee", "category": "food",
+                                            "currency_code": "EUR"})),
+        ("new shoes 49,99", ("add_expense", {"amount": 49.99, "description": "new shoes", "category": "shopping"})),
+        ("salary 3000", ("add_income", {"amount": 3000.0, "description": "salary", "category": "salary"})),
+        ("gift for mom 25 EUR", ("add_expense", {"amount": 25.0, "description": "gift for mom",
+                                                 "category": "shopping", "currency_code": "EUR"})),
+        ("rent 900", ("add_expense", {"amount": 900.0, "description": "rent", "category": "other"})),
+        ("earned 500 from freelancing", ("add_income", {"amount": 500.0, "description": "freelancing",
+                                                        "category": "other"})),
+    ],
+)
+def test_parses_simple_lines(message, expected):
+    function, arguments = expected
+
+    assert parse_fast_path(message) == {"function": function, "arguments": arguments}
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "show my analytics",
+        "list 10",
+        "last 5",
+        "how much did I spend this month?",
+        "coffee 3, bus 2.5 and lunch 12",
+        "spent 1,000 on rent",
+        "coffee 3.5 eur",
+        "delete 1a2b",
+        "undo 3",
+        "cancel 12",
+        "erase 7",
+        "lunch 0",
+        "groceries 42\nand what did I spend today?",
+        # Bare "words number" without a currency or a known expense word.
+        "make that 20",
+        "change it to 20",
+        "I am 25",
+        "remind me 5",
+        "call mom at 5",
+        "help 1",
+        "next 5",
+        "page 2",
+        "Thanks 100",
+        "paid 20 for it",
+    ],
+)
+def test_defers_anything_else_to_the_model(message):
+    assert parse_fast_path(message) is None
+
+
+class _UnreachableModel(BaseModel):
+    async def get_response(self, message, history=None):
+        raise AssertionError("fast path should not call the model")
+
+
+def test_parses_a_pasted_list_into_one_call():
+    parsed_call = parse_fast_path("groceries 42\n- fuel 60 EUR\n\nsalary 3000\n")
+
+    assert parsed_call == {
+        "function": "add_transactions",
+        "arguments": {"items": [
+            {"amount": 42.0, "description": "groceries", "category": "food", "type": "expense"},
+            {"amount": 60.0, "description": "fuel", "category": "transport", "currency_code": "EUR",
+             "type": "expense"},
+            {"amount": 3000.0, "description": "salary", "category": "salary", "type": "income"},
+        ]},
+    }
+
+
+async def test_router_records_fast_path_messages_without_the_model():
+    from uuid import uuid4
+
+    from sqlalchemy import select
+
+    from app.core.currencies import currency_catalogue
+    from app.db.session import AsyncSessionLocal
+    from app.models.currency import Currency
+    from app.models.expense_tracker import Transaction
+    from app.models.user import User
+    from app.nl_router.nlu import NLURouter
+
+    async with AsyncSessionLocal() as db:
+        if not await db.scalar(select(Currency).where(Currency.code == "USD")):
+            db.add(Currency(name="US Dollar", code="USD", symbol="$", numeric_code=840, minor_unit=2))
+        user = User(username=f"user_{str(uuid4())[:8]}")
+        db.add(user)
+        await db.commit()
+        await currency_catalogue.refresh(db)
+
+        router = NLURouter()
+        router.model = _UnreachableModel()
+        try:
+            response = await router.parse_user_message("coffee 3.5 USD", str(user.id))
+        finally:
+            await router.aclose()
+
+        assert response == "Recorded expense: 3.5 USD for coffee."
+        transaction = await db.scalar(select(Transaction).where(Transaction.user_id == user.id))
+        assert transaction.category == "food"
@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.db.session import AsyncSessionLocal
+from app.models.expense_tracker import Transaction
+from app.nl_router.router import FunctionRouter
+
+
+async def _transaction_count(user_id):
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(Transaction).where(Transaction.user_id == user_id))
+
+
+def _expense(amount, description):
+    return {"function": "add_expense", "arguments": {"amount": amount, "description": description}}
+
+
+async def test_all_tool_calls_run_and_reads_see_the_writes(user):
+    user_id = user.id
+
+    results = await FunctionRouter.call_functions(
+        [
+            _expense(3, "coffee"),
+            {"function": "get_analytics", "arguments": {"time_range": "today"}},
+            _expense(2.5, "bus"),
+            _expense(12, "lunch"),
+        ],
+        str(user_id),
+    )
+
+    assert results[0] == "Recorded expense: 3 USD for coffee."
+    assert "Expense: 17.5 USD" in results[1]
+    assert results[2] == "Recorded expense: 2.5 USD for bus."
+    assert results[3] == "Recorded expense: 12 USD for lunch."
+    assert await _transaction_count(user_id) == 3
+
+
+async def test_failed_write_rolls_back_the_whole_message(user):
+    user_id = user.id
+
+    with pytest.raises(Exception):
+        await FunctionRouter.call_functions([_expense(3, "coffee"), _expense(None, "broken")], str(user_id))
+
+    assert await _transaction_count(user_id) == 0
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from app.bot.command_handler import Handler
+from app.bot.controller.expense.transaction_controller import (
+    NEWER,
+    OLDER,
+    TransactionController,
+    decode_page_callback,
+    encode_page_callback,
+)
+from app.bot.controller.user import identity_resolver as identity_module
+from app.crud.transaction import transaction_crud
+from app.db.session import AsyncSessionLocal
+from app.models.expense_tracker import Transaction
+
+BASE = datetime(2025, 6, 1, 12)
+
+
+async def _add_history(db, user, count):
+    # Pairs share a timestamp, so paging has to break ties on id.
+    await transaction_crud.create_many_for_user(db, user_id=user.id, rows=[
+        {"currency_id": user.currency_id, "amount": i + 1, "description": f"item {i}", "category": None,
+         "type": "expense", "occurred_at": BASE + timedelta(hours=i // 2)}
+        for i in range(count)
+    ])
+
+
+def _key(tx):
+    return (tx.occurred_at, tx.id)
+
+
+async def test_keyset_pages_cover_history_exactly_once(user):
+    async with AsyncSessionLocal() as db:
+        await _add_history(db, user, 23)
+        expected = sorted(
+            await db.scalars(select(Transaction).where(Transaction.user_id == user.id)), key=_key, reverse=True,
+        )
+
+        pages, cursor, has_more = [], None, True
+        while has_more:
+            page, has_more = await transaction_crud.list_page_for_user(db, user_id=user.id, limit=5, before=cursor)
+            pages.append(page)
+            cursor = _key(page[-1])
+        assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+        assert [tx.id for page in pages for tx in page] == [tx.id for tx in expected]
+
+        # Back towards the newest, from the oldest page.
+        newer, has_more = await transaction_crud.list_page_for_user(
+            db, user_id=user.id, limit=5, after=_key(pages[-1][0]),
+        )
+        assert [tx.id for tx in newer] == [tx.id for tx in pages[-2]]
+        assert has_more
+
+
+def test_callback_data_round_trips_within_telegram_limit():
+    tx = SimpleNamespace(occurred_at=datetime(1969, 12, 31, 23, 59, 59, 123456), id=uuid4())
+    data = encode_page_callback(OLDER, 50, tx)
+
+    assert len(data.encode()) <= 64
+    assert decode_page_callback(data) == (OLDER, 50, (tx.occurred_at, tx.id))
+    assert decode_page_callback(data.replace(":o:", ":x:")) is None
+    assert decode_page_callback("tx:o:10:zz") is None
+    assert decode_page_callback(f"tx:n:999:{data.split(':', 3)[3]}")[1] == 50
+
+
+async def test_list_then_page_older_and_newer(user):
+    async with AsyncSessionLocal() as db:
+        await _add_history(db, user, 6)
+        controller = TransactionController(user.id, db=db)
+
+        first = await controller.list_transactions(limit=2)
+        assert first.startswith("Here are your most recent transactions:")
+        assert [label for label, _ in first.buttons] == ["◀ Older"]
+
+        second = await controller.page_transactions(first.buttons[0][1])
+        assert "item 3" in second and "item 2" in second and "item 4" not in second
+        assert [label for label, _ in second.buttons] == ["◀ Older", "Newer ▶"]
+
+        last = await controller.page_transactions(second.buttons[0][1])
+        assert "item 1" in last and "item 0" in last
+        assert [label for label, _ in last.buttons] == ["Newer ▶"]
+
+        back = await controller.page_transactions(last.buttons[0][1])
+        assert str(back).splitlines()[1:] == str(second).splitlines()[1:]
+
+        assert "no longer available" in await controller.page_transactions("tx:o:bad")
+
+
+class _FakeQuery:
+    def __init__(self, data, from_user):
+        self.data = data
+        self.from_user = from_user
+        self.answered = False
+        self.edits = []
+
+    async def answer(self):
+        self.answered = True
+
+    async def edit_message_text(self, text, reply_markup=None):
+        self.edits.append((text, reply_markup))
+
+
+async def test_callback_query_pages_without_the_model(monkeypatch, user):
+    async with AsyncSessionLocal() as db:
+        await _add_history(db, user, 4)
+        first = await TransactionController(user.id, db=db).list_transactions(limit=2)
+
+    async def resolve(telegram_user):
+        return user.id
+
+    monkeypatch.setattr(identity_module.identity_resolver, "resolve", resolve)
+    query = _FakeQuery(first.buttons[0][1], SimpleNamespace(id=1))
+    await Handler.transactions_page(SimpleNamespace(callback_query=query), None)
+
+    assert query.answered
+    (text, markup), = query.edits
+    assert "item 1" in text and "item 0" in text
+    assert [button.text for button in markup.inline_keyboard[0]] == ["Newer ▶"]
+    assert decode_page_callback(markup.inline_keyboard[0][0].callback_data)[0] == NEWER
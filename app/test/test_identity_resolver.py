@@ -0,0 +1,71 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+
+from app.db.session import AsyncSessionLocal
+from app.models.user import TelegramUser
+from app.bot.controller.user.identity_resolver import IdentityResolver
+from app.core.cache import TTLCache
+
+
+def _telegram_user():
+    return SimpleNamespace(
+        id=random.randint(10**12, 10**13),
+        username="resolver_test",
+        first_name="Test",
+        last_name=None,
+    )
+
+
+async def _telegram_user_count(telegram_id):
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(
+            select(func.count()).select_from(TelegramUser).where(TelegramUser.telegram_id == str(telegram_id))
+        )
+
+
+async def test_resolve_creates_user_once_and_caches():
+    resolver = IdentityResolver(maxsize=10, ttl=60)
+    details = _telegram_user()
+
+    first = await resolver.resolve(details)
+    second = await resolver.resolve(details)
+
+    assert first == second
+    assert resolver.cache.hits == 1
+    assert await _telegram_user_count(details.id) == 1
+
+    # A cold cache resolves to the same existing user.
+    assert await IdentityResolver(maxsize=10, ttl=60).resolve(details) == first
+
+
+async def test_concurrent_first_messages_create_one_user():
+    details = _telegram_user()
+
+    # Separate resolvers so every call goes to the database at the same time.
+    ids = await asyncio.gather(*(IdentityResolver(maxsize=10, ttl=60).resolve(details) for _ in range(10)))
+
+    assert len(set(ids)) == 1
+    assert await _telegram_user_count(details.id) == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=2, ttl=0)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
@@ -0,0 +1,51 @@
+import pytest
+
+from app.nl_router.intent import select_tools
+from app.nl_router.tools.openai import STD_TOOLS
+
+ALL_TOOLS = [tool["function"]["name"] for tool in STD_TOOLS]
+
+
+def _names(message, history=None):
+    return [tool["function"]["name"] for tool in select_tools(message, history)]
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        ("Hello, how are you?", []),
+        ("thanks!", []),
+        ("I bought a sandwich for five dollars", ["add_expense", "add_income", "add_transactions"]),
+        ("coffee 3, bus 2.5 and lunch 12", ["add_expense", "add_income", "add_transactions"]),
+        ("give me a summary of last month", ["get_analytics"]),
+        ("show my recent transactions", ["list_transactions"]),
+        ("delete the taxi one", ["list_transactions", "delete_transaction"]),
+        ("cancel the last one", ["list_transactions", "delete_transaction"]),
+        ("Thanks so much!", []),
+    ],
+)
+def test_selects_only_relevant_tools(message, expected):
+    assert _names(message) == expected
+
+
+@pytest.mark.parametrize("message", ["groceries were forty", "Uber home was twelve", "EUR", "yes please"])
+def test_unrecognized_messages_get_every_tool(message):
+    assert _names(message) == ALL_TOOLS
+
+
+def test_follow_ups_are_classified_with_the_previous_turns():
+    history = [
+        {"role": "system", "content": "Summary of the conversation so far: ..."},
+        {"role": "user", "content": "coffee 3"},
+        {"role": "assistant", "content": "Which currency?"},
+    ]
+
+    assert _names("EUR", history) == ["add_expense", "add_income", "add_transactions"]
+    assert _names("thanks!", history) == []
+
+
+def test_selected_tools_are_unchanged_schemas():
+    tools = select_tools("how much did I spend this month, and list them")
+
+    assert all(tool in STD_TOOLS for tool in tools)
+    assert {"get_analytics", "list_transactions"} <= set(_names("how much did I spend this month, and list them"))
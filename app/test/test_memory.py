@@ -0,0 +1,53 @@
+from uuid import uuid4
+
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+from app.nl_router.memory import ConversationMemory, estimate_tokens
+
+
+async def test_history_replays_recent_turns():
+    memory = ConversationMemory()
+    await memory.append("u1", "spent 15 on lunch", "Recorded expense: 15 USD for lunch.")
+
+    assert await memory.history("u1") == [
+        {"role": "user", "content": "spent 15 on lunch"},
+        {"role": "assistant", "content": "Recorded expense: 15 USD for lunch."},
+    ]
+    assert await memory.history("u2") == []
+
+
+async def test_old_turns_roll_into_a_bounded_summary():
+    memory = ConversationMemory(token_budget=100, max_turns=6, summary_tokens=40)
+
+    for i in range(50):
+        await memory.append("u1", f"message number {i} " + "x" * 40, f"reply number {i}")
+
+    history = await memory.history("u1")
+    summary, turns = history[0], history[1:]
+    assert summary["role"] == "system"
+    # The newest rolled-up turn is the one just before the kept turns.
+    assert summary["content"].endswith(f"assistant: reply number {49 - len(turns) // 2}")
+    assert estimate_tokens(summary["content"]) <= 40 + estimate_tokens("Summary of the earlier conversation:\n")
+    assert sum(estimate_tokens(turn["content"]) for turn in turns) <= 100
+    assert turns[-1] == {"role": "assistant", "content": "reply number 49"}
+
+
+async def test_long_messages_are_clipped():
+    memory = ConversationMemory(token_budget=50)
+    await memory.append("u1", "y" * 10000, "ok")
+
+    assert all(len(turn["content"]) <= 100 for turn in await memory.history("u1"))
+
+
+async def test_persisted_conversation_survives_eviction():
+    async with AsyncSessionLocal() as db:
+        user = User(username=f"user_{str(uuid4())[:8]}")
+        db.add(user)
+        await db.commit()
+
+    await ConversationMemory(persist=True).append(str(user.id), "coffee 3", "Recorded expense: 3 USD for coffee.")
+
+    # A fresh store (e.g. another worker or after a restart) loads it back.
+    history = await ConversationMemory(persist=True).history(str(user.id))
+    assert [turn["role"] for turn in history] == ["user", "assistant"]
+    assert history[0]["content"] == "coffee 3"
@@ -1,38 +1,84 @@
+import pytest
+from sqlalchemy import select
 
-import asyncio
-import os
-from app.nl_router.nlu import NLURouter
+from app.benchmarks.llm_stub import MISS_REPLY, Cassette, Recording, StubLLMServer
 from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.expense_tracker import Transaction
+from app.nl_router.nlu import NLURouter
+
+CASSETTE = [
+    Recording(message="Hello, how are you?", content="Hi! How can I help with your expenses?"),
+    Recording(
+        message="Bought groceries for 42.50",
+        tool_calls=[{"name": "add_expense", "arguments": {"amount": 42.5, "description": "groceries"}}],
+    ),
+    Recording(
+        message="how much did I spend today",
+        tool_calls=[{"name": "get_analytics", "arguments": {"time_range": "today"}}],
+    ),
+]
+
+
+class _Collect:
+    def __init__(self):
+        self.started = False
+        self.texts = []
+
+    async def start(self):
+        self.started = True
+
+    async def update(self, text):
+        self.texts.append(text)
+
+
+@pytest.fixture
+async def stub(monkeypatch):
+    async with StubLLMServer(Cassette(CASSETTE), latency=0.0) as server:
+        monkeypatch.setattr(settings, "MODEL_TYPE", "open_ai")
+        monkeypatch.setattr(settings, "OPEN_AI_MODEL_ENDPOINTS", [{"url": server.url, "api_key": "test"}])
+        monkeypatch.setattr(settings, "NLU_FAST_PATH_ENABLED", False)
+        monkeypatch.setattr(settings, "CONVERSATION_PERSIST", False)
+        yield server
 
-async def test_local_model():
-    # Force use of local model for test
-    settings.MODEL_TYPE = "open_ai"
-    # settings.MODEL_TYPE = "gen_ai" # Uncomment to test gen_ai
-    
-    # Check if OPEN_AI_MODEL_URL is set, if not fallback to LOCAL_MODEL_URL logic or just set it for test
-    if not settings.OPEN_AI_MODEL_URL:
-        # Assuming we want to test with the local qwen model logic
-        settings.OPEN_AI_MODEL_URL = "http://host.docker.internal:12434/engines/v1"
-        settings.OPEN_AI_MODEL_NAME = "ai/qwen2.5:7B-Q4_0"
-
-    print(f"Testing OpenAI compatible model: {settings.OPEN_AI_MODEL_NAME} at {settings.OPEN_AI_MODEL_URL}")
-    
+
+@pytest.fixture
+async def router(stub):
     router = NLURouter()
+    yield router
+    await router.aclose()
+
+
+async def test_local_model(stub, router, user):
+    user_id = str(user.id)
+
+    assert await router.parse_user_message("Hello, how are you?", user_id) == "Hi! How can I help with your expenses?"
+    assert await router.parse_user_message("Bought groceries for 42.50", user_id) == (
+        "Recorded expense: 42.5 USD for groceries."
+    )
+    assert "Expense: 42.5 USD" in await router.parse_user_message("how much did I spend today", user_id)
+    assert await router.parse_user_message("something unrecorded", user_id) == MISS_REPLY
+    assert (stub.requests, stub.misses) == (4, 1)
+
+    async with AsyncSessionLocal() as db:
+        descriptions = (await db.scalars(
+            select(Transaction.description).where(Transaction.user_id == user_id)
+        )).all()
+    assert descriptions == ["groceries"]
+
+
+async def test_streamed_tool_calls_are_reassembled(router, monkeypatch, user):
+    monkeypatch.setattr(settings, "LLM_STREAMING", True)
+    user_id = str(user.id)
+    reply = _Collect()
+
+    assert await router.parse_user_message("Bought groceries for 42.50", user_id, stream=reply) == (
+        "Recorded expense: 42.5 USD for groceries."
+    )
+    assert reply.started
 
-    # Test 1: Simple query
-    print("\n--- Test 1: Simple Query ---")
-    response = await router.parse_user_message("Hello, how are you?")
-    print(f"Response: {response}")
-
-    # Test 2: Tool Call (Send Money)
-    print("\n--- Test 2: Tool Call (Send Money) ---")
-    response_tool = await router.parse_user_message("Send 50 dollars to Alice on tomorrow")
-    print(f"Response: {response_tool}")
-    
-    # Test 3: Tool Call (Check Balance)
-    print("\n--- Test 3: Tool Call (Check Balance) ---")
-    response_balance = await router.parse_user_message("Check my balance")
-    print(f"Response: {response_balance}")
-
-if __name__ == "__main__":
-    asyncio.run(test_local_model())
+    greeting = _Collect()
+    assert await router.parse_user_message("Hello, how are you?", user_id, stream=greeting) == (
+        "Hi! How can I help with your expenses?"
+    )
+    assert greeting.texts[-1] == "Hi! How can I help with your expenses?"
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.nl_router.rate_limit import LLMBusyError, LLMLimiter, TokenBucket, UserRateLimiter
+
+
+def test_token_bucket_allows_burst_then_refills():
+    bucket = TokenBucket(rate=1, capacity=3)
+    now = bucket.updated_at
+
+    assert [bucket.try_acquire(now) for _ in range(4)] == [True, True, True, False]
+    assert bucket.retry_after() == pytest.approx(1)
+    assert bucket.try_acquire(now + 1)
+    assert not bucket.try_acquire(now + 1)
+
+
+def test_user_rate_limiter_is_per_user():
+    limiter = UserRateLimiter(per_minute=60, burst=2)
+
+    assert limiter.check("a") == 0
+    assert limiter.check("a") == 0
+    assert limiter.check("a") > 0
+    assert limiter.check("b") == 0
+
+
+async def test_llm_limiter_caps_in_flight_requests():
+    limiter = LLMLimiter(max_in_flight=2)
+    running = peak = 0
+
+    async def call():
+        nonlocal running, peak
+        async with limiter:
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(call() for _ in range(10)))
+
+    assert peak == 2
+
+
+async def test_llm_limiter_times_out_when_saturated():
+    limiter = LLMLimiter(max_in_flight=1, timeout=0.01)
+
+    async with limiter:
+        with pytest.raises(LLMBusyError):
+            async with limiter:
+                pass
+
+    async with limiter:
+        pass
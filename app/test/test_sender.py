@@ -0,0 +1,72 @@
+import asyncio
+import datetime
+
+import pytest
+from telegram.error import BadRequest, RetryAfter
+
+from app.bot.sender import OutboundSender
+
+
+class FakeBot:
+    def __init__(self, failures=()):
+        self.sent = []
+        self.failures = list(failures)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((chat_id, text))
+        return (chat_id, text)
+
+
+async def test_messages_to_one_chat_are_ordered_and_coalesced():
+    bot = FakeBot()
+    sender = OutboundSender(bot, chat_interval=0.05)
+    sender.start()
+
+    first = sender.send(1, "a")
+    await first
+    # Queued while chat 1 waits out its interval: delivered as one message.
+    rest = [sender.send(1, "b"), sender.send(1, "c")]
+    await asyncio.gather(*rest)
+    await sender.stop()
+
+    assert bot.sent == [(1, "a"), (1, "b\n\nc")]
+    assert rest[0].result() == rest[1].result() == (1, "b\n\nc")
+
+
+async def test_retry_after_pauses_and_redelivers():
+    bot = FakeBot(failures=[RetryAfter(datetime.timedelta(seconds=0.05))])
+    sender = OutboundSender(bot, chat_interval=0)
+    sender.start()
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    assert await sender.send(1, "hi") == (1, "hi")
+    await sender.stop()
+
+    assert loop.time() - started >= 0.05
+    assert bot.sent == [(1, "hi")]
+
+
+async def test_rejected_message_fails_without_retry():
+    bot = FakeBot(failures=[BadRequest("chat not found")])
+    sender = OutboundSender(bot, chat_interval=0)
+    sender.start()
+
+    with pytest.raises(BadRequest):
+        await sender.send(1, "hi")
+    await sender.stop()
+
+    assert bot.sent == []
+
+
+async def test_chats_are_sent_in_parallel_within_global_rate():
+    bot = FakeBot()
+    sender = OutboundSender(bot, global_rate=1000, chat_interval=10)
+    sender.start()
+
+    await asyncio.wait_for(asyncio.gather(*(sender.send(chat, "x") for chat in range(20))), 1)
+    await sender.stop()
+
+    assert len(bot.sent) == 20
@@ -0,0 +1,120 @@
+import asyncio
+import multiprocessing
+from collections import Counter
+from types import SimpleNamespace
+
+from telegram import Update, User
+from telegram.ext import ExtBot, TypeHandler
+
+from app.bot.runner import build_application
+from app.bot.sharding import STOP, HashRing, WorkerSupervisor, forward_updates, run_worker_application
+
+
+def _exit_immediately(index, updates):
+    pass
+
+
+def _wait_for_stop(index, updates):
+    updates.get()
+
+
+def test_hash_ring_is_stable_and_balanced():
+    ring = HashRing(4)
+    owners = [ring.node_for(chat_id) for chat_id in range(10000)]
+
+    assert owners == [HashRing(4).node_for(chat_id) for chat_id in range(10000)]
+    counts = Counter(owners)
+    assert set(counts) == {0, 1, 2, 3}
+    assert min(counts.values()) > 10000 / 4 * 0.7
+
+
+def test_hash_ring_growth_moves_few_keys():
+    before, after = HashRing(4), HashRing(5)
+    moved = sum(before.node_for(chat_id) != after.node_for(chat_id) for chat_id in range(10000))
+
+    # Ideal is 1/5 of the keys; a modulo hash would move 4/5.
+    assert moved < 10000 * 0.3
+
+
+def test_supervisor_restarts_dead_workers():
+    supervisor = WorkerSupervisor(2, target=_exit_immediately, restart_delay=0)
+    supervisor.start()
+    try:
+        first = list(supervisor.processes)
+        for process in first:
+            process.join(10)
+
+        assert supervisor.check() == 2
+        assert all(new is not old for new, old in zip(supervisor.processes, first))
+    finally:
+        supervisor.stop()
+
+
+def test_supervisor_stop_finishes_workers():
+    supervisor = WorkerSupervisor(2, target=_wait_for_stop)
+    supervisor.start()
+    supervisor.stop(timeout=10)
+
+    assert all(process.exitcode == 0 for process in supervisor.processes)
+    assert supervisor.check() == 0
+
+
+class _SlowApp:
+    def __init__(self):
+        self.bot = None
+        self.running = 0
+        self.peak = 0
+        self.processed = []
+        self.update_processor = SimpleNamespace(process_update=self._run)
+
+    async def _run(self, update, coroutine):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await coroutine
+        self.running -= 1
+
+    async def process_update(self, update):
+        await asyncio.sleep(0.01)
+        self.processed.append(update.update_id)
+
+
+async def test_worker_takes_updates_only_when_it_has_room():
+    updates = multiprocessing.get_context("spawn").Queue()
+    for update_id in range(10):
+        updates.put({"update_id": update_id})
+    updates.put(STOP)
+    app = _SlowApp()
+
+    await forward_updates(app, updates, max_pending=3)
+    updates.close()
+
+    assert sorted(app.processed) == list(range(10))
+    assert app.peak == 3
+
+
+async def _get_me(self, *args, **kwargs):
+    self._bot_user = User(id=1, first_name="bot", is_bot=True, username="test_bot")
+    return self._bot_user
+
+
+async def test_worker_runs_the_startup_and_shutdown_hooks(monkeypatch):
+    # No Telegram round trip for the test bot.
+    monkeypatch.setattr(ExtBot, "get_me", _get_me)
+    app = build_application(with_updater=False)
+    seen = []
+
+    async def record(update, context):
+        seen.append(context.bot_data.get("sender"))
+
+    app.add_handler(TypeHandler(Update, record), group=-1)
+    updates = multiprocessing.get_context("spawn").Queue()
+    updates.put({"update_id": 1})
+    updates.put(STOP)
+
+    await run_worker_application(app, updates, max_pending=4)
+    updates.close()
+
+    # Handlers reply through the sender that post_init creates.
+    assert seen and seen[0] is not None
+    # post_stop flushed and removed it.
+    assert "sender" not in app.bot_data
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.bot.controller.expense.transaction_controller import TransactionController
+from app.core import short_code
+from app.crud.transaction import transaction_crud
+from app.db.session import AsyncSessionLocal
+from app.models.expense_tracker import Transaction
+from app.models.user import User
+
+
+@pytest.mark.parametrize("seq, code", [(1, "0001"), (31, "000Z"), (32, "0010"), (32 ** 4, "10000")])
+def test_codes_round_trip(seq, code):
+    assert short_code.encode(seq) == code
+    assert short_code.decode(code) == seq
+
+
+def test_decoding_is_forgiving_but_strict_about_length():
+    assert short_code.decode(" 00a3 ") == short_code.decode("00A3") == 323
+    assert short_code.decode("OOL-1") == short_code.decode("0011")
+    assert short_code.decode("12345678") is None
+    assert short_code.decode("00U0") is None
+    assert short_code.decode("0000") is None
+
+
+async def test_each_user_gets_consecutive_numbers(create_user):
+    now = datetime(2025, 5, 1)
+    async with AsyncSessionLocal() as db:
+        user, other = await create_user(), await create_user()
+        common = dict(currency_id=user.currency_id, description="x", category=None, type="expense")
+
+        first = await transaction_crud.create_for_user(db, user_id=user.id, amount=1, occurred_at=now, **common)
+        await transaction_crud.create_for_user(db, user_id=other.id, amount=1, occurred_at=now, **common)
+        await transaction_crud.create_many_for_user(db, user_id=user.id, rows=[
+            {**common, "amount": 2, "occurred_at": now - timedelta(days=1)},
+            {**common, "amount": 3, "occurred_at": now + timedelta(days=1)},
+        ])
+
+        assert first.seq == 1
+        seqs = await db.scalars(
+            select(Transaction.seq).where(Transaction.user_id == user.id).order_by(Transaction.seq)
+        )
+        assert list(seqs) == [1, 2, 3]
+        assert await db.scalar(select(User.tx_seq).where(User.id == other.id)) == 1
+
+
+async def test_delete_by_short_code(user):
+    async with AsyncSessionLocal() as db:
+        controller = TransactionController(user.id, db=db)
+        await controller.add_transaction(5.0, "Coffee", "expense", "USD")
+        await controller.add_transaction(9.0, "Lunch", "expense", "USD")
+
+        listing = await controller.list_transactions()
+        assert "code: 0002" in listing
+
+        assert "Deleted transaction 0002" in await controller.delete_transaction("2")
+        assert "Transaction not found" in await controller.delete_transaction("0002")
+        assert "Lunch" not in await controller.list_transactions()
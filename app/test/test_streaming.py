@@ -0,0 +1,169 @@
+import asyncio
+from types import SimpleNamespace
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from app.bot.sender import OutboundSender
+from app.bot.streaming import PLACEHOLDER, StreamingReply
+from app.core.config import settings
+from app.nl_router.endpoints import Endpoint, EndpointPool
+from app.nl_router.models.base import BaseModel, ModelResponse
+from app.nl_router.models.openai_model import OpenAIModel
+from app.nl_router.nlu import NLURouter
+from app.nl_router.rate_limit import LLMLimiter
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+        self.edits = []
+        self.markups = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append(text)
+        self.markups.append(kwargs.get("reply_markup"))
+        return SimpleNamespace(chat_id=chat_id, message_id=len(self.sent))
+
+    async def edit_message_text(self, text, chat_id, message_id, reply_markup=None):
+        self.edits.append(text)
+        self.markups.append(reply_markup)
+
+
+async def test_streaming_reply_edits_placeholder_progressively():
+    bot = FakeBot()
+    sender = OutboundSender(bot, chat_interval=0)
+    sender.start()
+    reply = StreamingReply(bot, sender, chat_id=1, edit_interval=0.01)
+
+    await reply.start()
+    for text in ("Hel", "Hello", "Hello, wor"):
+        await reply.update(text)
+        await asyncio.sleep(0.03)
+    await reply.finish("Hello, world")
+    await sender.stop()
+
+    assert bot.sent == [PLACEHOLDER]
+    assert bot.edits == ["Hel", "Hello", "Hello, wor", "Hello, world"]
+
+
+async def test_reply_without_stream_is_sent_normally():
+    bot = FakeBot()
+    sender = OutboundSender(bot, chat_interval=0)
+    sender.start()
+
+    await StreamingReply(bot, sender, chat_id=1).finish("Recorded expense.")
+    await sender.stop()
+
+    assert bot.sent == ["Recorded expense."]
+    assert bot.edits == []
+
+
+async def test_final_reply_carries_the_keyboard():
+    keyboard = InlineKeyboardMarkup([[InlineKeyboardButton("◀ Older", callback_data="tx:o:10:0:0")]])
+    bot = FakeBot()
+    sender = OutboundSender(bot, chat_interval=0)
+    sender.start()
+
+    streamed = StreamingReply(bot, sender, chat_id=1, edit_interval=10)
+    await streamed.start()
+    await streamed.finish("Here are your most recent transactions:", reply_markup=keyboard)
+    await StreamingReply(bot, sender, chat_id=2).finish("Listed.", reply_markup=keyboard)
+    await sender.stop()
+
+    assert bot.edits == ["Here are your most recent transactions:"]
+    assert bot.markups == [None, keyboard, keyboard]
+
+
+class _StreamingModel(BaseModel):
+    async def get_response(self, message, history=None):
+        raise AssertionError("streaming requests must not use get_response")
+
+    async def stream_response(self, message, on_text, history=None):
+        await on_text("Hi")
+        return ModelResponse(content="Hi there")
+
+
+async def test_placeholder_is_posted_before_waiting_for_a_model_slot(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_STREAMING", True)
+    router = NLURouter()
+    router.model = _StreamingModel()
+    router.limiter = LLMLimiter(1)
+    started = asyncio.Event()
+    stream = SimpleNamespace(start=_set_event(started), update=_set_event(asyncio.Event()))
+    try:
+        async with router.limiter:
+            # Every slot is taken, yet the user already sees the placeholder.
+            answer = asyncio.create_task(router.parse_user_message("hello there", "u1", stream))
+            await asyncio.wait_for(started.wait(), timeout=1)
+            assert not answer.done()
+        assert await answer == "Hi there"
+    finally:
+        await router.aclose()
+
+
+def _set_event(event):
+    async def handler(*args):
+        event.set()
+    return handler
+
+
+def _chunk(content=None, tool_calls=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def _tool_delta(index, name=None, arguments=None):
+    return SimpleNamespace(index=index, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+class FakeCompletions:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def create(self, **kwargs):
+        assert kwargs["stream"] is True
+
+        async def stream():
+            for chunk in self.chunks:
+                yield chunk
+
+        return stream()
+
+
+def _model(chunks):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(chunks)))
+    model = OpenAIModel.__new__(OpenAIModel)
+    model.pool = EndpointPool([Endpoint(name="test", model_name="test", client=client)])
+    model.model_name = "test"
+    model._system_prompt = ""
+    return model
+
+
+async def test_openai_stream_passes_text_so_far():
+    seen = []
+
+    async def on_text(text):
+        seen.append(text)
+
+    response = await _model([_chunk("Hi"), _chunk(" there")]).stream_response("hello", on_text)
+
+    assert seen == ["Hi", "Hi there"]
+    assert response.content == "Hi there"
+    assert response.tool_calls == []
+
+
+async def test_openai_stream_assembles_tool_call_fragments():
+    async def on_text(text):
+        raise AssertionError("tool calls have no text")
+
+    response = await _model([
+        _chunk(tool_calls=[_tool_delta(0, "add_expense", '{"amount": 3,')]),
+        _chunk(tool_calls=[_tool_delta(0, None, ' "description": "coffee"}'), _tool_delta(1, "add_expense", "")]),
+        _chunk(tool_calls=[_tool_delta(1, None, '{"amount": 2.5, "description": "bus"}')]),
+    ]).stream_response("coffee 3 and bus 2.5", on_text)
+
+    assert response.content is None
+    assert response.tool_calls == [
+        {"function": "add_expense", "arguments": {"amount": 3, "description": "coffee"}},
+        {"function": "add_expense", "arguments": {"amount": 2.5, "description": "bus"}},
+    ]
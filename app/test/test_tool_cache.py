@@ -0,0 +1,157 @@
+from types import SimpleNamespace
+
+from app.nl_router.models.base import BaseModel, ModelResponse
+from app.nl_router.nlu import NLURouter
+from app.nl_router.tool_cache import ToolCallCache, conversation_key, is_follow_up, normalize_message
+
+ANALYTICS = {"function": "get_analytics", "arguments": {"time_range": "current_month"}}
+
+
+def test_normalize_message_ignores_case_punctuation_and_spacing():
+    assert normalize_message("  Show my   ANALYTICS!! ") == normalize_message("show my analytics")
+
+
+def test_only_read_only_calls_without_dates_are_cached():
+    cache = ToolCallCache(maxsize=10, ttl=60, version="v1")
+
+    assert cache.set("show my analytics", ModelResponse(tool_calls=[ANALYTICS]))
+    assert not cache.set("coffee 3", ModelResponse(tool_calls=[{"function": "add_expense", "arguments": {}}]))
+    assert not cache.set("last week", ModelResponse(tool_calls=[
+        {"function": "get_analytics", "arguments": {"start_date": "2026-01-01", "end_date": "2026-01-07"}},
+    ]))
+    assert not cache.set("hello", ModelResponse(content="Hi!"))
+
+    assert cache.get("Show my analytics.").tool_calls == [ANALYTICS]
+    assert cache.get("coffee 3") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_schema_version_is_part_of_the_key():
+    old = ToolCallCache(maxsize=10, ttl=60, version="v1")
+    old.set("show my analytics", ModelResponse(tool_calls=[ANALYTICS]))
+    new = ToolCallCache(maxsize=10, ttl=60, version="v2")
+    new._cache = old._cache
+
+    assert new.get("show my analytics") is None
+
+
+class _CountingModel(BaseModel):
+    def __init__(self):
+        self.calls = 0
+
+    async def get_response(self, message, history=None):
+        self.calls += 1
+        return ModelResponse(tool_calls=[dict(ANALYTICS)])
+
+
+async def test_router_asks_the_model_once_for_repeated_questions(monkeypatch):
+    executed = []
+
+    async def call_function(parsed_call, user_id):
+        executed.append((parsed_call["function"], user_id))
+        return "ok"
+
+    monkeypatch.setattr("app.nl_router.nlu.FunctionRouter.call_function", call_function)
+    router = NLURouter()
+    model = router.model = _CountingModel()
+    try:
+        assert await router.parse_user_message("show my analytics", "u1") == "ok"
+        assert await router.parse_user_message("Show my analytics!", "u2") == "ok"
+    finally:
+        await router.aclose()
+
+    assert model.calls == 1
+    assert executed == [("get_analytics", "u1"), ("get_analytics", "u2")]
+
+
+def test_history_keeps_follow_ups_apart():
+    cache = ToolCallCache(maxsize=10, ttl=60, version="v1")
+    history_a = [{"role": "user", "content": "analytics for today"}, {"role": "assistant", "content": "..."}]
+    history_b = [{"role": "user", "content": "analytics for last month"}, {"role": "assistant", "content": "..."}]
+    today = {"function": "get_analytics", "arguments": {"time_range": "today"}}
+    last_month = {"function": "get_analytics", "arguments": {"time_range": "last_month"}}
+
+    cache.set("same again", ModelResponse(tool_calls=[today]), conversation_key("u1", "same again", history_a))
+    cache.set("same again", ModelResponse(tool_calls=[last_month]), conversation_key("u2", "same again", history_b))
+
+    assert cache.get("same again", conversation_key("u1", "same again", history_a)).tool_calls == [today]
+    assert cache.get("same again", conversation_key("u2", "same again", history_b)).tool_calls == [last_month]
+    # Same history text, other user: not shared either.
+    assert cache.get("same again", conversation_key("u2", "same again", history_a)) is None
+    assert cache.get("same again") is None
+
+
+def test_self_contained_questions_share_a_key_whatever_the_history():
+    history = [{"role": "user", "content": "coffee 3"}, {"role": "assistant", "content": "Recorded."}]
+
+    assert conversation_key("u1", "show my analytics", history) == ""
+    assert conversation_key("u2", "List my transactions!", history) == ""
+    for follow_up in ("same again", "and last month?", "show it again", "yes please"):
+        assert is_follow_up(follow_up), follow_up
+        assert conversation_key("u1", follow_up, history) != ""
+
+
+class _HistoryModel(BaseModel):
+    def __init__(self):
+        self.calls = 0
+
+    async def get_response(self, message, history=None):
+        self.calls += 1
+        time_range = "last_month" if history and "last month" in history[0]["content"] else "today"
+        return ModelResponse(tool_calls=[{"function": "get_analytics", "arguments": {"time_range": time_range}}])
+
+
+async def test_router_does_not_replay_follow_ups_across_conversations(monkeypatch):
+    executed = []
+
+    async def call_function(parsed_call, user_id):
+        executed.append((user_id, parsed_call["arguments"]["time_range"]))
+        return "ok"
+
+    histories = {
+        "u1": [{"role": "user", "content": "spending today"}, {"role": "assistant", "content": "ok"}],
+        "u2": [{"role": "user", "content": "spending last month"}, {"role": "assistant", "content": "ok"}],
+    }
+
+    async def history(user_id):
+        return histories[user_id]
+
+    monkeypatch.setattr("app.nl_router.nlu.FunctionRouter.call_function", call_function)
+    router = NLURouter()
+    model = router.model = _HistoryModel()
+    monkeypatch.setattr(router, "memory", SimpleNamespace(history=history, append=_noop_append))
+    try:
+        await router.parse_user_message("same again", "u1")
+        await router.parse_user_message("same again", "u2")
+        await router.parse_user_message("same again", "u1")
+    finally:
+        await router.aclose()
+
+    assert executed == [("u1", "today"), ("u2", "last_month"), ("u1", "today")]
+    # The repeat within the unchanged conversation still comes from the cache.
+    assert model.calls == 2
+
+
+async def _noop_append(user_id, user_text, assistant_text):
+    pass
+
+
+async def test_router_shares_self_contained_questions_across_conversations(monkeypatch):
+    async def call_function(parsed_call, user_id):
+        return "ok"
+
+    async def history(user_id):
+        return [{"role": "user", "content": f"coffee {len(user_id)}"}, {"role": "assistant", "content": "ok"}]
+
+    monkeypatch.setattr("app.nl_router.nlu.FunctionRouter.call_function", call_function)
+    router = NLURouter()
+    model = router.model = _CountingModel()
+    monkeypatch.setattr(router, "memory", SimpleNamespace(history=history, append=_noop_append))
+    try:
+        await router.parse_user_message("show my analytics", "u1")
+        await router.parse_user_message("show my analytics", "user2")
+    finally:
+        await router.aclose()
+
+    # Conversation memory is on by default; it must not turn the cache off.
+    assert model.calls == 1
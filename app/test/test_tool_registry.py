@@ -0,0 +1,159 @@
+from typing import Optional
+
+import pytest
+from google.genai import types
+from pydantic import BaseModel, Field
+
+from app.core.metrics import metrics
+from app.nl_router.models.gen_ai_model import GenAIModel
+from app.nl_router.router import UNKNOWN_FUNCTION, FunctionRouter
+from app.nl_router.tools.gen_ai import genai_tools
+from app.nl_router.tools.openai import STD_TOOLS
+from app.nl_router.tools.registry import ToolArgumentsError, ToolRegistry, registry
+from app.nl_router.tools.transactions import GetAnalyticsArgs
+
+
+class _EchoArgs(BaseModel):
+    text: str = Field(description="Text to echo")
+    times: Optional[int] = Field(None, description="Repetitions")
+
+
+def _echo_registry():
+    tools = ToolRegistry()
+
+    @tools.tool("echo", "Echo the text", writes=False)
+    async def echo(controller, args: _EchoArgs) -> str:
+        return args.text * (args.times or 1)
+
+    return tools
+
+
+def test_schemas_are_generated_from_the_argument_models():
+    tool = _echo_registry().openai_tools()[0]
+
+    assert tool == {
+        "type": "function",
+        "function": {
+            "name": "echo",
+            "description": "Echo the text",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "text": {"type": "string", "description": "Text to echo"},
+                    "times": {"type": "integer", "description": "Repetitions"},
+                },
+                "required": ["text"],
+            },
+        },
+    }
+
+
+def test_std_tools_cover_every_registered_tool():
+    names = [tool["function"]["name"] for tool in STD_TOOLS]
+    parameters = {tool["function"]["name"]: tool["function"]["parameters"] for tool in STD_TOOLS}
+
+    assert names == registry.names()
+    assert parameters["add_expense"]["required"] == ["amount", "description"]
+    assert parameters["get_analytics"]["properties"]["time_range"]["enum"] == [
+        "current_month", "last_month", "today",
+    ]
+    # Nested models are inlined rather than referenced.
+    assert "$defs" not in parameters["add_transactions"]
+    assert parameters["add_transactions"]["properties"]["items"]["items"]["required"] == ["amount", "description"]
+
+
+@pytest.mark.parametrize(
+    "sent, expected",
+    [
+        ("last_month", "last_month"),
+        ("Last Month", "last_month"),
+        ("this_month", "current_month"),
+        ("last_week", "current_month"),
+        (None, "current_month"),
+    ],
+)
+def test_analytics_time_range_falls_back_instead_of_failing(sent, expected):
+    assert GetAnalyticsArgs.model_validate({"time_range": sent}).time_range == expected
+
+
+def test_genai_declarations_match_openai_schemas():
+    declarations = genai_tools()[0].function_declarations
+
+    assert [d.name for d in declarations] == registry.names()
+    assert declarations[0].parameters_json_schema == STD_TOOLS[0]["function"]["parameters"]
+    assert genai_tools([]) == []
+
+
+def test_rejects_bad_registrations():
+    tools = _echo_registry()
+
+    with pytest.raises(ValueError):
+        @tools.tool("echo", "again")
+        async def echo(controller, args: _EchoArgs) -> str:
+            return ""
+
+    with pytest.raises(TypeError):
+        @tools.tool("sync", "not async")
+        def sync(controller, args: _EchoArgs) -> str:
+            return ""
+
+    with pytest.raises(TypeError):
+        @tools.tool("untyped", "no model")
+        async def untyped(controller, args) -> str:
+            return ""
+
+
+async def test_dispatch_validates_arguments_and_records_latency():
+    tools = _echo_registry()
+
+    assert await tools.dispatch(None, {"function": "echo", "arguments": {"text": "ab", "times": 2}}) == "abab"
+    assert metrics.histogram("tool.echo.latency_seconds").count >= 1
+    with pytest.raises(ToolArgumentsError):
+        await tools.dispatch(None, {"function": "echo", "arguments": {"times": "many"}})
+
+
+async def test_unknown_function_needs_no_controller():
+    assert await FunctionRouter.call_function({"function": "nope", "arguments": {}}, "not-a-uuid") == UNKNOWN_FUNCTION
+    assert await FunctionRouter.call_functions([{"function": "nope"}], "not-a-uuid") == [UNKNOWN_FUNCTION]
+
+
+class _FakeModels:
+    def __init__(self, response):
+        self.response = response
+        self.kwargs = None
+
+    async def generate_content(self, **kwargs):
+        self.kwargs = kwargs
+        return self.response
+
+
+async def test_genai_model_returns_text_and_function_calls():
+    response = types.GenerateContentResponse(candidates=[types.Candidate(content=types.Content(
+        role="model",
+        parts=[
+            types.Part.from_text(text="Recording it."),
+            types.Part.from_function_call(name="add_expense", args={"amount": 3, "description": "coffee"}),
+        ],
+    ))])
+    fake = _FakeModels(response)
+    model = GenAIModel.__new__(GenAIModel)
+    model.client = type("Client", (), {"aio": type("Aio", (), {"models": fake})()})()
+    model.model_name = "gemini-test"
+    model._system_prompt = "prompt"
+
+    result = await model.get_response(
+        "coffee 3",
+        history=[
+            {"role": "system", "content": "Summary of the earlier conversation:\nuser: hi"},
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "hello"},
+        ],
+    )
+
+    assert result.content == "Recording it."
+    assert result.tool_calls == [{"function": "add_expense", "arguments": {"amount": 3, "description": "coffee"}}]
+    assert [c.role for c in fake.kwargs["contents"]] == ["user", "model", "user"]
+    config = fake.kwargs["config"]
+    assert config.system_instruction.startswith("prompt\n\nSummary of the earlier conversation")
+    assert config.automatic_function_calling.disable is True
+    assert {d.name for d in config.tools[0].function_declarations} == {"add_expense", "add_income", "add_transactions"}
@@ -0,0 +1,77 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.bot.update_processor import PerUserUpdateProcessor
+
+
+def _update(user_id):
+    return SimpleNamespace(effective_user=SimpleNamespace(id=user_id), effective_chat=None)
+
+
+async def test_same_user_updates_run_in_order():
+    processor = PerUserUpdateProcessor(max_concurrent_updates=8)
+    seen = []
+
+    async def handle(label, delay):
+        await asyncio.sleep(delay)
+        seen.append(label)
+
+    # The first update is the slowest; it must still finish first.
+    await asyncio.gather(
+        processor.process_update(_update(1), handle("first", 0.05)),
+        processor.process_update(_update(1), handle("second", 0.0)),
+        processor.process_update(_update(1), handle("third", 0.01)),
+    )
+    await processor.shutdown()
+
+    assert seen == ["first", "second", "third"]
+
+
+async def test_different_users_run_in_parallel():
+    processor = PerUserUpdateProcessor(max_concurrent_updates=8)
+    running = 0
+    peak = 0
+
+    async def handle():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    await asyncio.gather(*(processor.process_update(_update(i), handle()) for i in range(5)))
+    await processor.shutdown()
+
+    assert peak == 5
+
+
+async def test_concurrency_cap_is_respected():
+    processor = PerUserUpdateProcessor(max_concurrent_updates=2)
+    running = 0
+    peak = 0
+
+    async def handle():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(processor.process_update(_update(i), handle()) for i in range(6)))
+    await processor.shutdown()
+
+    assert peak == 2
+
+
+async def test_idle_user_queue_is_evicted():
+    processor = PerUserUpdateProcessor(max_concurrent_updates=2, idle_timeout=0.01)
+
+    async def handle():
+        pass
+
+    await processor.process_update(_update(42), handle())
+    assert ("user", 42) in processor._queues
+
+    await asyncio.sleep(0.05)
+    assert ("user", 42) not in processor._queues
+    await processor.shutdown()
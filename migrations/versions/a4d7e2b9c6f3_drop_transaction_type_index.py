@@ -0,0 +1,59 @@
+"""Drop the per-type transactions index
+
+Revision ID: a4d7e2b9c6f3
+Revises: f2c6a8d0b4e1
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d7e2b9c6f3"
+down_revision: Union[str, Sequence[str], None] = "f2c6a8d0b4e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_hypertable(bind) -> bool:
+    return bind.scalar(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')"
+    )) and bind.scalar(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM timescaledb_information.hypertables "
+        "WHERE hypertable_name = 'transactions')"
+    ))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Per-type sums are read from transaction_daily_totals now, so nothing
+    # scans this index any more; it only adds write cost.
+    with op.get_context().autocommit_block():
+        if _is_hypertable(op.get_bind()):
+            op.drop_index("ix_transactions_user_type_occurred_active", table_name="transactions", if_exists=True)
+        else:
+            op.drop_index(
+                "ix_transactions_user_type_occurred_active",
+                table_name="transactions",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        if _is_hypertable(op.get_bind()):
+            op.execute(
+                "CREATE INDEX IF NOT EXISTS ix_transactions_user_type_occurred_active "
+                "ON transactions (user_id, type, occurred_at) INCLUDE (amount) "
+                "WITH (timescaledb.transaction_per_chunk) WHERE NOT is_deleted"
+            )
+        else:
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_user_type_occurred_active "
+                "ON transactions (user_id, type, occurred_at) INCLUDE (amount) WHERE NOT is_deleted"
+            )
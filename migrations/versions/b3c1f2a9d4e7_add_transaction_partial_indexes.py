@@ -0,0 +1,59 @@
+"""Add partial indexes for the transaction hot queries
+
+Revision ID: b3c1f2a9d4e7
+Revises: 457924f434c7
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b3c1f2a9d4e7"
+down_revision: Union[str, Sequence[str], None] = "457924f434c7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block, and it avoids locking
+    # out writes while the indexes build on a large table.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transactions_user_occurred_active",
+            "transactions",
+            ["user_id", sa.text("occurred_at DESC")],
+            postgresql_where=sa.text("NOT is_deleted"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_transactions_user_type_occurred_active",
+            "transactions",
+            ["user_id", "type", "occurred_at"],
+            postgresql_include=["amount"],
+            postgresql_where=sa.text("NOT is_deleted"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_transactions_user_type_occurred_active",
+            table_name="transactions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_transactions_user_occurred_active",
+            table_name="transactions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,108 @@
+"""Make transactions a TimescaleDB hypertable
+
+Revision ID: c7d2e8f1a0b3
+Revises: b3c1f2a9d4e7
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2e8f1a0b3"
+down_revision: Union[str, Sequence[str], None] = "b3c1f2a9d4e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _timescale_available(bind) -> bool:
+    return bind.scalar(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'timescaledb')"
+    ))
+
+
+def _is_hypertable(bind) -> bool:
+    return bind.scalar(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')"
+    )) and bind.scalar(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM timescaledb_information.hypertables "
+        "WHERE hypertable_name = 'transactions')"
+    ))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if not _timescale_available(bind):
+        logger.warning("TimescaleDB is not installed; transactions stays a plain table.")
+        return
+
+    # Unique constraints on a hypertable must include the partitioning column.
+    # Only done here: on plain Postgres the key stays (id), which keeps id unique.
+    op.drop_constraint("transactions_pkey", "transactions", type_="primary")
+    op.create_primary_key("transactions_pkey", "transactions", ["id", "occurred_at"])
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS timescaledb")
+    # Time chunks only: a user_id space dimension pays off only with chunks on
+    # several disks. Per-user locality comes from compress_segmentby instead.
+    op.execute(sa.text(
+        "SELECT create_hypertable('transactions', 'occurred_at', "
+        "chunk_time_interval => CAST(:interval AS interval), "
+        "migrate_data => true, if_not_exists => true)"
+    ).bindparams(interval=settings.TIMESCALE_CHUNK_INTERVAL))
+    # The primary key columns must be in segmentby/orderby.
+    op.execute(
+        "ALTER TABLE transactions SET ("
+        "timescaledb.compress, "
+        "timescaledb.compress_segmentby = 'user_id', "
+        "timescaledb.compress_orderby = 'occurred_at DESC, id')"
+    )
+    op.execute(sa.text(
+        "SELECT add_compression_policy('transactions', CAST(:after AS interval), if_not_exists => true)"
+    ).bindparams(after=settings.TIMESCALE_COMPRESS_AFTER))
+    if settings.TIMESCALE_RETENTION:
+        op.execute(sa.text(
+            "SELECT add_retention_policy('transactions', CAST(:after AS interval), if_not_exists => true)"
+        ).bindparams(after=settings.TIMESCALE_RETENTION))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if not _is_hypertable(bind):
+        return
+    op.execute("SELECT remove_retention_policy('transactions', if_exists => true)")
+    op.execute("SELECT remove_compression_policy('transactions', if_exists => true)")
+    # A hypertable cannot be converted back in place: copy the rows
+    # (compressed chunks are read transparently) into a plain table.
+    op.execute(
+        "CREATE TABLE transactions_plain "
+        "(LIKE transactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute("INSERT INTO transactions_plain SELECT * FROM transactions")
+    op.drop_table("transactions")
+    op.rename_table("transactions_plain", "transactions")
+    op.create_primary_key("transactions_pkey", "transactions", ["id"])
+    op.create_foreign_key(None, "transactions", "users", ["user_id"], ["id"])
+    op.create_foreign_key(None, "transactions", "currency", ["currency_id"], ["id"])
+    op.create_index(
+        "ix_transactions_user_occurred_active",
+        "transactions",
+        ["user_id", sa.text("occurred_at DESC")],
+        postgresql_where=sa.text("NOT is_deleted"),
+    )
+    op.create_index(
+        "ix_transactions_user_type_occurred_active",
+        "transactions",
+        ["user_id", "type", "occurred_at"],
+        postgresql_include=["amount"],
+        postgresql_where=sa.text("NOT is_deleted"),
+    )
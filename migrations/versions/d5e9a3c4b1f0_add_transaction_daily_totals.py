@@ -0,0 +1,89 @@
+"""Add trigger-maintained daily transaction totals
+
+Revision ID: d5e9a3c4b1f0
+Revises: c7d2e8f1a0b3
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5e9a3c4b1f0"
+down_revision: Union[str, Sequence[str], None] = "c7d2e8f1a0b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_ROLLUP_COLUMNS = "user_id, day, type, category, currency_id, total, count"
+
+
+def _apply(row: str, sign: str) -> str:
+    """Add (sign '+') or remove (sign '-') one transaction row from its daily total."""
+    return f"""
+        INSERT INTO transaction_daily_totals ({_ROLLUP_COLUMNS})
+        VALUES ({row}.user_id, {row}.occurred_at::date, {row}.type, COALESCE({row}.category, ''),
+                {row}.currency_id, {sign}{row}.amount::numeric, {sign}1)
+        ON CONFLICT (user_id, day, type, category, currency_id) DO UPDATE
+        SET total = transaction_daily_totals.total + EXCLUDED.total,
+            count = transaction_daily_totals.count + EXCLUDED.count;"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "transaction_daily_totals",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("type", sa.String(length=50), nullable=False),
+        sa.Column("category", sa.String(length=50), nullable=False),
+        sa.Column("currency_id", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Numeric(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["currency_id"], ["currency.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "day", "type", "category", "currency_id"),
+    )
+
+    # A row trigger rather than a continuous aggregate: it is exact at commit
+    # time (no refresh lag, soft deletes included) and works the same on plain
+    # Postgres and on the transactions hypertable.
+    op.execute(f"""
+        CREATE FUNCTION transactions_daily_totals() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND NOT OLD.is_deleted THEN
+                {_apply("OLD", "-")}
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NOT NEW.is_deleted THEN
+                {_apply("NEW", "")}
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER transactions_daily_totals
+        AFTER INSERT OR DELETE
+            OR UPDATE OF user_id, occurred_at, type, category, currency_id, amount, is_deleted
+        ON transactions
+        FOR EACH ROW EXECUTE FUNCTION transactions_daily_totals()
+    """)
+
+    op.execute(f"""
+        INSERT INTO transaction_daily_totals ({_ROLLUP_COLUMNS})
+        SELECT user_id, occurred_at::date, type, COALESCE(category, ''), currency_id,
+               SUM(amount::numeric), COUNT(*)
+        FROM transactions
+        WHERE NOT is_deleted
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS transactions_daily_totals ON transactions")
+    op.execute("DROP FUNCTION IF EXISTS transactions_daily_totals()")
+    op.drop_table("transaction_daily_totals")
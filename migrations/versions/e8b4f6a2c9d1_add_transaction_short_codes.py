@@ -0,0 +1,145 @@
+"""Add per-user transaction sequence numbers for short codes
+
+Revision ID: e8b4f6a2c9d1
+Revises: d5e9a3c4b1f0
+Create Date: 2026-10-18 16:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b4f6a2c9d1"
+down_revision: Union[str, Sequence[str], None] = "d5e9a3c4b1f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Users numbered per backfill transaction.
+BACKFILL_BATCH_USERS = 1000
+
+
+def _is_hypertable(bind) -> bool:
+    return bind.scalar(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')"
+    )) and bind.scalar(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM timescaledb_information.hypertables "
+        "WHERE hypertable_name = 'transactions')"
+    ))
+
+
+def _backfill(bind) -> None:
+    """Number existing transactions per user, a batch of users per transaction."""
+    user_ids = bind.scalars(sa.text("SELECT id FROM users ORDER BY id")).all()
+    for i in range(0, len(user_ids), BACKFILL_BATCH_USERS):
+        batch = user_ids[i:i + BACKFILL_BATCH_USERS]
+        # Rows are numbered in the order they happened; the counter in users
+        # is set in the same statement so the two never disagree.
+        bind.execute(sa.text("""
+            WITH n AS (
+                SELECT id, occurred_at, user_id,
+                       ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY occurred_at, id) AS seq
+                FROM transactions
+                WHERE user_id BETWEEN :first AND :last
+            ), numbered AS (
+                UPDATE transactions t SET seq = n.seq
+                FROM n
+                WHERE t.id = n.id AND t.occurred_at = n.occurred_at
+                  AND t.user_id BETWEEN :first AND :last
+            )
+            UPDATE users u SET tx_seq = m.seq
+            FROM (SELECT user_id, MAX(seq) AS seq FROM n GROUP BY user_id) m
+            WHERE u.id = m.user_id
+        """).bindparams(first=batch[0], last=batch[-1]))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    hypertable = _is_hypertable(bind)
+    op.add_column("users", sa.Column("tx_seq", sa.BigInteger(), server_default="0", nullable=False))
+    op.add_column("transactions", sa.Column("seq", sa.BigInteger(), nullable=True))
+
+    # Batches commit on their own so the backfill never holds row locks on the
+    # whole table. Run it with the bot stopped: rows inserted before the
+    # trigger below exists would have no number and fail SET NOT NULL.
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        if hypertable:
+            # Updating compressed chunks decompresses them row batch by row
+            # batch; doing it up front, one chunk per transaction, is far
+            # cheaper. The compression policy recompresses them afterwards.
+            chunks = bind.scalars(sa.text(
+                "SELECT format('%I.%I', chunk_schema, chunk_name) "
+                "FROM timescaledb_information.chunks "
+                "WHERE hypertable_name = 'transactions' AND is_compressed"
+            )).all()
+            for chunk in chunks:
+                bind.execute(sa.text(
+                    "SELECT decompress_chunk(CAST(:chunk AS regclass), if_compressed => true)"
+                ).bindparams(chunk=chunk))
+        _backfill(bind)
+
+    op.alter_column("transactions", "seq", nullable=False)
+
+    # The users row lock taken by the UPDATE serializes numbering per user, so
+    # concurrent inserts for one user never share a number. Single and
+    # multi-row inserts are covered alike.
+    op.execute("""
+        CREATE FUNCTION transactions_assign_seq() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF NEW.seq IS NULL THEN
+                UPDATE users SET tx_seq = tx_seq + 1 WHERE id = NEW.user_id
+                RETURNING tx_seq INTO NEW.seq;
+            END IF;
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER transactions_assign_seq
+        BEFORE INSERT ON transactions
+        FOR EACH ROW EXECUTE FUNCTION transactions_assign_seq()
+    """)
+
+    with op.get_context().autocommit_block():
+        if hypertable:
+            # A unique index on a hypertable must include occurred_at, which
+            # would make it useless for seq; users.tx_seq keeps seq unique there.
+            # Hypertables do not support CONCURRENTLY; building one chunk per
+            # transaction only locks the chunk being indexed.
+            op.execute(
+                "CREATE INDEX IF NOT EXISTS ix_transactions_user_seq_active "
+                "ON transactions (user_id, seq) "
+                "WITH (timescaledb.transaction_per_chunk) "
+                "WHERE NOT is_deleted"
+            )
+        else:
+            op.create_index(
+                "ix_transactions_user_seq_active",
+                "transactions",
+                ["user_id", "seq"],
+                unique=True,
+                postgresql_where=sa.text("NOT is_deleted"),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_transactions_user_seq_active",
+            table_name="transactions",
+            postgresql_concurrently=not _is_hypertable(op.get_bind()),
+            if_exists=True,
+        )
+    op.execute("DROP TRIGGER IF EXISTS transactions_assign_seq ON transactions")
+    op.execute("DROP FUNCTION IF EXISTS transactions_assign_seq()")
+    op.drop_column("transactions", "seq")
+    op.drop_column("users", "tx_seq")
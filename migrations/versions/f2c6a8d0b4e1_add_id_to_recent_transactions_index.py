@@ -0,0 +1,65 @@
+"""Add id to the recent-transactions index for keyset pagination
+
+Revision ID: f2c6a8d0b4e1
+Revises: ffda234ad8f6
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c6a8d0b4e1"
+down_revision: Union[str, Sequence[str], None] = "ffda234ad8f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_hypertable(bind) -> bool:
+    return bind.scalar(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')"
+    )) and bind.scalar(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM timescaledb_information.hypertables "
+        "WHERE hypertable_name = 'transactions')"
+    ))
+
+
+def _swap_index(create: str, columns: str, drop: str) -> None:
+    """Build index ``create`` on ``columns``, then drop index ``drop``, without blocking writes."""
+    # CONCURRENTLY cannot run inside a transaction block. TimescaleDB does not
+    # support it on hypertables; there the index is built one chunk per
+    # transaction instead, which only locks the chunk being indexed.
+    with op.get_context().autocommit_block():
+        if _is_hypertable(op.get_bind()):
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS {create} ON transactions ({columns}) "
+                "WITH (timescaledb.transaction_per_chunk) WHERE NOT is_deleted"
+            )
+            op.drop_index(drop, table_name="transactions", if_exists=True)
+        else:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {create} ON transactions ({columns}) "
+                "WHERE NOT is_deleted"
+            )
+            op.drop_index(drop, table_name="transactions", postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _swap_index(
+        "ix_transactions_user_occurred_id_active",
+        "user_id, occurred_at DESC, id DESC",
+        "ix_transactions_user_occurred_active",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _swap_index(
+        "ix_transactions_user_occurred_active",
+        "user_id, occurred_at DESC",
+        "ix_transactions_user_occurred_id_active",
+    )